@@ -0,0 +1,94 @@
+"""
+Concurrency benchmark for the simulated booking engine.
+
+Registers synthetic flight and hotel offers, then books them from many
+threads at once:
+
+    python benchmarks/bench_booking.py --package multi_agent_agent --bookings 5000 --threads 64
+
+Reports throughput and checks that references are unique, no offer was
+oversold, retried idempotency keys did not book twice, and every booking
+reached the ledger.
+"""
+import argparse
+import importlib
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--package", default="multi_agent_agent", choices=["multi_agent_agent", "multi_tool_agent"])
+    parser.add_argument("--bookings", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--flights", type=int, default=200, help="Number of distinct flight offers")
+    parser.add_argument("--seats", type=int, default=9, help="Seats available per flight offer")
+    parser.add_argument("--retry-rate", type=float, default=0.2, help="Fraction of requests sent twice")
+    args = parser.parse_args()
+
+    os.environ.setdefault("BOOKING_LEDGER_PATH", os.path.join(tempfile.mkdtemp(), "bookings.sqlite3"))
+    # Synthetic offers cannot be re-priced with Amadeus
+    os.environ.setdefault("BOOKING_CONFIRM_PRICES", "false")
+    registry = importlib.import_module(f"{args.package}.services.offer_registry").get_offer_registry()
+    booking = importlib.import_module(f"{args.package}.services.booking_service")
+    service = booking.get_booking_service()
+
+    for i in range(args.flights):
+        registry.register("flight", f"F{i}", {
+            "price": 200.0, "price_per_traveler": 100.0, "travelers": 2, "currency": "EUR",
+            "seats_available": args.seats, "last_ticketing_date": None
+        })
+
+    requests = []
+    for i in range(args.bookings):
+        request = {
+            "flight_id": f"F{random.randrange(args.flights)}",
+            "guests": random.randint(1, 2),
+            "idempotency_key": f"req-{i}"
+        }
+        requests.append(request)
+        if random.random() < args.retry_rate:
+            requests.append(dict(request))
+    random.shuffle(requests)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        results = list(pool.map(lambda r: service.book(**r), requests))
+    elapsed = time.perf_counter() - started
+    service.ledger.flush()
+
+    confirmed = [r for r in results if r.get("status") == "confirmed" and not r.get("idempotent_replay")]
+    replays = [r for r in results if r.get("idempotent_replay")]
+    sold_out = [r for r in results if "error" in r]
+    refs = {r["booking_reference"] for r in confirmed}
+    keys = {r["idempotency_key"] for r in confirmed}
+    seats_sold = sum(r["guests"] for r in confirmed)
+    with sqlite3.connect(service.ledger.path) as conn:
+        ledger_rows = conn.execute("SELECT COUNT(*) FROM bookings").fetchone()[0]
+
+    print(f"Requests:        {len(requests)} ({len(requests) - args.bookings} retries) on {args.threads} threads")
+    print(f"Elapsed:         {elapsed:.2f}s ({len(requests) / elapsed:.0f} req/s)")
+    print(f"Confirmed:       {len(confirmed)}  replays: {len(replays)}  sold out: {len(sold_out)}")
+    print(f"Seats sold:      {seats_sold} of {args.flights * args.seats}")
+    print(f"Ledger rows:     {ledger_rows}")
+
+    checks = {
+        "unique references": len(refs) == len(confirmed),
+        "one booking per idempotency key": len(keys) == len(confirmed),
+        "no overselling": seats_sold <= args.flights * args.seats,
+        "ledger complete": ledger_rows == len(confirmed),
+    }
+    for name, ok in checks.items():
+        print(f"  {'ok  ' if ok else 'FAIL'} {name}")
+    sys.exit(0 if all(checks.values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Decode-time and memory benchmark for the JSON codecs.
+
+Encodes large synthetic responses, then decodes them with every installed
+codec (and msgspec with the service schemas), and finally decodes and parses
+them the way the services used to (stdlib, untyped) and do now (JSON_CODEC,
+typed):
+
+    python benchmarks/bench_codec.py
+    python benchmarks/bench_codec.py --flight-offers 250 --hotels 2000 --forecast-days 14
+
+Peak is the traced memory while decoding; retained is what the decoded
+document keeps alive afterwards.
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_parsers import memory_of_call, time_per_call  # noqa: E402
+from standin_server import Generator, parse_args as standin_args  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--package", default="multi_agent_agent", choices=["multi_agent_agent", "multi_tool_agent"])
+    parser.add_argument("--flight-offers", type=int, default=250)
+    parser.add_argument("--hotels", type=int, default=2000)
+    parser.add_argument("--forecast-days", type=int, default=14)
+    parser.add_argument("--repeat", type=int, default=5, help="Timed loops per measurement")
+    args = parser.parse_args()
+
+    for key in ("AMADEUS_API_KEY", "AMADEUS_SECRET_KEY", "WEATHER_API_KEY"):
+        os.environ.setdefault(key, "benchmark")
+    package = __import__(f"{args.package}.services", fromlist=["*"])
+    codec_module = __import__(f"{args.package}.services.codec", fromlist=["*"])
+    schemas = __import__(f"{args.package}.services.schemas", fromlist=["*"])
+
+    generator = Generator(standin_args(["--flight-offers", str(args.flight_offers), "--hotels", str(args.hotels)]))
+    cases: List[Tuple[str, bytes, Any, Callable[[Any], Any]]] = [
+        (f"flights[{args.flight_offers}]",
+         json.dumps(generator.flight_offers({"adults": "2"})).encode(),
+         schemas.FlightOffersResponse, package.FlightService()._parse_flight_offers),
+        (f"hotels[{args.hotels}]",
+         json.dumps(generator.hotels({"cityCode": "PAR"})).encode(),
+         schemas.HotelsResponse, package.HotelService()._parse_hotels),
+        (f"forecast[{args.forecast_days}]",
+         json.dumps(generator.forecast({"q": "Paris", "days": str(args.forecast_days)})).encode(),
+         schemas.ForecastResponse, package.WeatherService()._parse_forecast),
+    ]
+
+    codecs = {}
+    for name in ("stdlib", "orjson", "msgspec"):
+        try:
+            codecs[name] = codec_module.create_codec(name)
+        except ValueError:
+            print(f"({name} not installed)")
+    configured = codec_module.create_codec(os.getenv("JSON_CODEC", "auto"))
+
+    def measure(fn: Callable[[bytes], Any], data: bytes) -> Dict[str, float]:
+        samples = time_per_call(fn, data, args.repeat)
+        return {"ms": min(samples), **memory_of_call(fn, data)}
+
+    print(f"\n{'payload':<16} {'decoder':<28} {'ms':>9} {'speedup':>8} {'peak KiB':>10} {'retained KiB':>13}")
+    for label, data, schema, parse in cases:
+        rows = {}
+        for name, codec in codecs.items():
+            rows[name] = measure(lambda d, c=codec: c.decode(d), data)
+        if "msgspec" in codecs:
+            rows["msgspec typed"] = measure(lambda d: codecs["msgspec"].decode(d, schema), data)
+        rows["before: stdlib+parse"] = measure(lambda d: parse(json.loads(d)), data)
+        rows[f"now: {configured.name} typed+parse"] = measure(lambda d: parse(configured.decode(d, schema)), data)
+
+        print(f"{label:<16} ({len(data) / 1024:.0f} KiB)")
+        for name, row in rows.items():
+            reference = rows["before: stdlib+parse"] if "parse" in name else rows["stdlib"]
+            print(f"{'':<16} {name:<28} {row['ms']:>9.3f} {reference['ms'] / row['ms']:>7.2f}x "
+                  f"{row['peak_kb']:>10.1f} {row['retained_kb']:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Buffered versus streamed parsing of flight-offer responses.
+
+Feeds a synthetic flight-offers body to FlightService both ways: decoded
+whole and then simplified (`_parse_flight_offers`), and decoded offer by
+offer as the chunks arrive (`iter_flight_offers`), read to the end or
+stopped after the first --top offers. No request is sent:
+
+    python benchmarks/bench_flight_stream.py
+    python benchmarks/bench_flight_stream.py --flight-offers 250 1000 --top 10 --chunk-size 16384
+    python benchmarks/bench_flight_stream.py --dictionaries first
+
+Peak is the traced memory while parsing, on top of the body itself (which
+a live streamed request never holds whole); retained includes the raw
+offers kept by the offer registry for pricing.
+"""
+import argparse
+import json
+import os
+import sys
+from contextlib import closing
+from itertools import islice
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_parsers import memory_of_call, time_per_call  # noqa: E402
+from standin_server import Generator, parse_args as standin_args  # noqa: E402
+
+
+def build_body(offers: int, dictionaries: str) -> bytes:
+    """A flight-offers response body with the dictionaries before or after the offers."""
+    response = Generator(standin_args(["--flight-offers", str(offers)])).flight_offers({"adults": "2"})
+    if dictionaries == "first":
+        response = {"dictionaries": response.pop("dictionaries"), **response}
+    return json.dumps(response).encode()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--package", default="multi_agent_agent", choices=["multi_agent_agent", "multi_tool_agent"])
+    parser.add_argument("--flight-offers", type=int, nargs="+", default=[50, 250, 1000])
+    parser.add_argument("--top", type=int, default=10, help="Offers read before stopping early")
+    parser.add_argument("--chunk-size", type=int, default=65536)
+    parser.add_argument("--dictionaries", choices=["first", "last"], default="last",
+                        help="Where the dictionaries are in the body (Amadeus sends them last)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed loops per measurement")
+    args = parser.parse_args()
+
+    for key in ("AMADEUS_API_KEY", "AMADEUS_SECRET_KEY", "WEATHER_API_KEY"):
+        os.environ.setdefault(key, "benchmark")
+    services = __import__(f"{args.package}.services", fromlist=["*"])
+    codec = __import__(f"{args.package}.services.codec", fromlist=["*"]).get_codec()
+    schemas = __import__(f"{args.package}.services.schemas", fromlist=["*"])
+
+    service = services.FlightService()
+    body = b""
+
+    def chunks(*_args: Any, **_kwargs: Any):
+        for start in range(0, len(body), args.chunk_size):
+            yield body[start:start + args.chunk_size]
+
+    service._stream_request = chunks
+
+    def streamed(limit):
+        def run(_body: bytes) -> List[Dict[str, Any]]:
+            with closing(service.iter_flight_offers("NYC", "PAR", "2026-12-01", 2)) as offers:
+                return list(islice(offers, limit))
+        return run
+
+    variants: Dict[str, Callable[[bytes], Any]] = {
+        f"buffered ({codec.name})": lambda data: service._parse_flight_offers(codec.decode(data, schemas.FlightOffersResponse)),
+        "streamed": streamed(None),
+        f"streamed, top {args.top}": streamed(args.top),
+    }
+
+    print(f"{'offers':>7} {'body KiB':>9}  {'variant':<22} {'ms':>9} {'peak KiB':>10} {'retained KiB':>13}")
+    for offers in args.flight_offers:
+        body = build_body(offers, args.dictionaries)
+        expected = variants[f"buffered ({codec.name})"](body)
+        assert variants["streamed"](body) == expected, "streamed offers differ from buffered ones"
+        for name, variant in variants.items():
+            variant(body)  # warm up
+            ms = min(time_per_call(variant, body, args.repeat))
+            memory = memory_of_call(variant, body)
+            print(f"{offers:>7} {len(body) / 1024:>9.0f}  {name:<22} {ms:>9.3f} "
+                  f"{memory['peak_kb']:>10.1f} {memory['retained_kb']:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Price normalization: converting a column of offers at once (convert_many)
+versus converting them one by one.
+
+Builds synthetic offer prices in a mix of currencies, converts them to
+--currency both ways with the stand-in rate table (loaded from a file, as
+when offline) and checks both give the same amounts, to the cent:
+
+    python benchmarks/bench_fx.py
+    python benchmarks/bench_fx.py --offers 1000 100000 --currency GBP
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+from typing import Any, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_parsers import time_per_call  # noqa: E402
+from standin_server import FX_RATES  # noqa: E402
+
+
+def build_prices(count: int) -> Tuple[List[str], List[str]]:
+    """`count` price strings, as offers carry them, in the stand-in currencies, mostly EUR and USD."""
+    rng = random.Random(count)
+    codes = list(FX_RATES)
+    weights = [8, 6] + [1] * (len(codes) - 2)
+    return [f"{rng.uniform(40, 2500):.2f}" for _ in range(count)], rng.choices(codes, weights, k=count)
+
+
+def one_by_one(fx: Any, columns: Tuple[List[str], List[str]], target: str) -> List[Optional[float]]:
+    """Look up both rates and divide per offer, as a loop over offer dicts would."""
+    table = fx.table()
+    results = []
+    for amount, currency in zip(*columns):
+        try:
+            value = float(amount) * table.rate(target) / table.rate(currency)
+        except (TypeError, ValueError):
+            results.append(None)
+            continue
+        results.append(round(value, 2) if not math.isnan(value) else None)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--package", default="multi_agent_agent", choices=["multi_agent_agent", "multi_tool_agent"])
+    parser.add_argument("--offers", type=int, nargs="+", default=[100, 1000, 10000, 100000])
+    parser.add_argument("--currency", default="USD", choices=sorted(FX_RATES))
+    parser.add_argument("--repeat", type=int, default=5, help="Timed loops per measurement")
+    args = parser.parse_args()
+
+    for key in ("AMADEUS_API_KEY", "AMADEUS_SECRET_KEY", "WEATHER_API_KEY"):
+        os.environ.setdefault(key, "benchmark")
+    fx_rates = __import__(f"{args.package}.services.fx_rates", fromlist=["*"])
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "fx_rates.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"base": "EUR", "date": None, "fetched_at": 0, "rates": FX_RATES}, f)
+        fx = fx_rates.FxRates("EUR", path, refresh_interval=0)
+
+    print(f"{'offers':>8} {'one by one ms':>14} {'convert_many ms':>16} {'speedup':>8}")
+    for count in args.offers:
+        columns = build_prices(count)
+        expected = one_by_one(fx, columns, args.currency)
+        converted = fx.convert_many(*columns, args.currency).tolist()
+        assert all(abs(a - b) <= 0.011 for a, b in zip(converted, expected)), "convert_many differs from converting one by one"
+
+        loop_ms = min(time_per_call(lambda c: one_by_one(fx, c, args.currency), columns, args.repeat))
+        column_ms = min(time_per_call(lambda c: fx.convert_many(*c, args.currency), columns, args.repeat))
+        print(f"{count:>8} {loop_ms:>14.3f} {column_ms:>16.3f} {loop_ms / column_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
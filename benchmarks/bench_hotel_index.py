@@ -0,0 +1,89 @@
+"""
+Working-set hotel queries: linear scan versus the amenity bitset index.
+
+Builds synthetic hotel lists with the stand-in server's generator and runs
+a few multi-filter follow-up queries both ways: the per-hotel scan with
+string comparisons that WorkingSet.query_hotels used to do, and
+HotelIndex.select. Both must return the same hotels:
+
+    python benchmarks/bench_hotel_index.py
+    python benchmarks/bench_hotel_index.py --hotels 2000 20000 --hotel-amenities 8
+"""
+import argparse
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_parsers import time_per_call  # noqa: E402
+from standin_server import Generator, parse_args as standin_args  # noqa: E402
+
+QUERIES = {
+    "pool+spa, 4★+": {"amenities": ["SWIMMING_POOL", "SPA"], "min_rating": 4},
+    "wifi, 3★+, <5km": {"amenities": ["WIFI"], "min_rating": 3, "max_distance": 5},
+    "2 chains": {"chain_codes": None},  # filled with the two most common chains
+    "5★": {"min_rating": 5},
+}
+
+
+def scan(hotels: List[Dict[str, Any]], amenities: Optional[List[str]] = None, min_rating: Optional[float] = None,
+         chain_codes: Optional[List[str]] = None, max_distance: Optional[float] = None, hotel_row=None) -> List[int]:
+    """The filter loop query_hotels ran before the index, returning positions."""
+    wanted_amenities = {a.upper() for a in amenities or []}
+    wanted_chains = {c.upper() for c in chain_codes} if chain_codes else None
+    positions = []
+    for position, hotel in enumerate(hotels):
+        row = hotel_row(hotel)
+        if min_rating is not None and (row["rating"] is None or row["rating"] < min_rating):
+            continue
+        if max_distance is not None and (row["distance"] is None or row["distance"] > max_distance):
+            continue
+        if wanted_chains and (row["chainCode"] or "").upper() not in wanted_chains:
+            continue
+        if wanted_amenities and not wanted_amenities <= {a.upper() for a in row["amenities"]}:
+            continue
+        positions.append(position)
+    return positions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--package", default="multi_agent_agent", choices=["multi_agent_agent", "multi_tool_agent"])
+    parser.add_argument("--hotels", type=int, nargs="+", default=[500, 2000, 20000])
+    parser.add_argument("--hotel-amenities", type=int, default=6, help="Maximum amenities per hotel")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed loops per measurement")
+    args = parser.parse_args()
+
+    for key in ("AMADEUS_API_KEY", "AMADEUS_SECRET_KEY", "WEATHER_API_KEY"):
+        os.environ.setdefault(key, "benchmark")
+    services = __import__(f"{args.package}.services", fromlist=["*"])
+    hotel_index = __import__(f"{args.package}.services.hotel_index", fromlist=["*"])
+    working_set = __import__(f"{args.package}.services.working_set", fromlist=["*"])
+
+    print(f"{'hotels':>7}  {'query':<18} {'matches':>8} {'scan ms':>9} {'index ms':>9} {'speedup':>8}")
+    for count in args.hotels:
+        generator = Generator(standin_args(["--hotels", str(count), "--hotel-amenities", str(args.hotel_amenities)]))
+        hotels = services.HotelService()._parse_hotels(generator.hotels({"cityCode": "PAR"}))
+
+        started = time.perf_counter()
+        index = hotel_index.HotelIndex(hotels)
+        print(f"{count:>7}  {'(build index)':<18} {'':>8} {'':>9} {(time.perf_counter() - started) * 1000:>9.3f}")
+
+        chains: Dict[str, int] = {}
+        for hotel in hotels:
+            chains[hotel["chainCode"]] = chains.get(hotel["chainCode"], 0) + 1
+        common_chains = sorted(chains, key=chains.get, reverse=True)[:2]
+
+        for label, query in QUERIES.items():
+            query = {**query, "chain_codes": common_chains} if "chain_codes" in query else query
+            expected = scan(hotels, hotel_row=working_set.hotel_row, **query)
+            assert index.select(**query) == expected, f"index and scan disagree on {label}"
+            scan_ms = min(time_per_call(lambda q: scan(hotels, hotel_row=working_set.hotel_row, **q), query, args.repeat))
+            index_ms = min(time_per_call(lambda q: index.select(**q), query, args.repeat))
+            print(f"{count:>7}  {label:<18} {len(expected):>8} {scan_ms:>9.3f} {index_ms:>9.3f} {scan_ms / index_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
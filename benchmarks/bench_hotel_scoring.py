@@ -0,0 +1,87 @@
+"""
+Hotel scoring time against a budget.
+
+Scores synthetic hotels (with random prices per night for most of them)
+with hotel_scoring.rank_hotels over a prebuilt index, as the working set
+does, checks the ranking against a plain-Python reference, and fails if
+the fastest run exceeds --budget-ms:
+
+    python benchmarks/bench_hotel_scoring.py
+    python benchmarks/bench_hotel_scoring.py --hotels 5000 20000 --budget-ms 5
+"""
+import argparse
+import os
+import random
+import sys
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_parsers import time_per_call  # noqa: E402
+from standin_server import Generator, parse_args as standin_args  # noqa: E402
+
+AMENITIES = ["SWIMMING_POOL", "SPA", "WIFI"]
+
+
+def reference_scores(hotels: List[Dict[str, Any]], weights: Dict[str, float], prices: Dict[str, float],
+                     amenities: List[str], half_distance: float = 2.0) -> List[float]:
+    """The scoring formula of hotel_scoring, one hotel at a time."""
+    total_weight = sum(weights.values())
+    low, high = min(prices.values()), max(prices.values())
+    scores = []
+    for hotel in hotels:
+        distance = (hotel.get("distance") or {}).get("value")
+        rating = int(hotel["rating"]) if hotel.get("rating") else 0
+        have = {a.upper() for a in hotel.get("amenities") or []}
+        price = prices.get(hotel["hotelId"])
+        components = {
+            "distance": 1 / (1 + max(float(distance), 0) / half_distance) if distance is not None else 0.0,
+            "rating": (rating - 1) / 4 if rating else 0.0,
+            "amenities": sum(a in have for a in amenities) / len(amenities),
+            "price": ((high - price) / (high - low) if high > low else 1.0) if price is not None else 0.0
+        }
+        scores.append(sum(components[name] * weight / total_weight for name, weight in weights.items()))
+    return scores
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--package", default="multi_agent_agent", choices=["multi_agent_agent", "multi_tool_agent"])
+    parser.add_argument("--hotels", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=5.0, help="Allowed time for 5,000 hotels (scaled linearly)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed loops per measurement")
+    args = parser.parse_args()
+
+    for key in ("AMADEUS_API_KEY", "AMADEUS_SECRET_KEY", "WEATHER_API_KEY"):
+        os.environ.setdefault(key, "benchmark")
+    services = __import__(f"{args.package}.services", fromlist=["*"])
+    hotel_index = __import__(f"{args.package}.services.hotel_index", fromlist=["*"])
+    hotel_scoring = __import__(f"{args.package}.services.hotel_scoring", fromlist=["*"])
+
+    ok = True
+    print(f"{'hotels':>7} {'with prices':>12} {'ms':>9} {'budget ms':>10}")
+    for count in args.hotels:
+        generator = Generator(standin_args(["--hotels", str(count)]))
+        hotels = services.HotelService()._parse_hotels(generator.hotels({"cityCode": "PAR"}))
+        rng = random.Random(count)
+        prices = {h["hotelId"]: round(rng.uniform(60, 600), 2) for h in hotels if rng.random() < 0.8}
+        index = hotel_index.HotelIndex(hotels)
+
+        def run(_: Optional[Any]) -> List[Dict[str, Any]]:
+            return hotel_scoring.rank_hotels(hotels, args.top, amenities=AMENITIES, prices_per_night=prices, index=index)
+
+        expected = reference_scores(hotels, hotel_scoring.DEFAULT_WEIGHTS, prices, AMENITIES)
+        best = sorted(range(len(hotels)), key=lambda i: (-round(expected[i], 9), i))[:args.top]
+        ranked = run(None)
+        assert [h["hotelId"] for h in ranked] == [hotels[i]["hotelId"] for i in best], "ranking differs from the reference"
+
+        ms = min(time_per_call(run, None, args.repeat))
+        budget = args.budget_ms * max(count, 5000) / 5000
+        ok = ok and ms <= budget
+        print(f"{count:>7} {len(prices):>12} {ms:>9.3f} {budget:>10.1f}{'' if ms <= budget else '  OVER BUDGET'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Startup-cost benchmark for the agent packages.
+
+Times each import (and building the root agent) in a fresh interpreter,
+so nothing is served from an already warm sys.modules:
+
+    python benchmarks/bench_import.py --package multi_agent_agent --repeat 5
+    python benchmarks/bench_import.py --save benchmarks/import_baseline.json
+    python benchmarks/bench_import.py --compare benchmarks/import_baseline.json --max-regression 0.25
+
+Reports the median time per step. With --compare, exits non-zero when a
+step got slower than the baseline by more than --max-regression (a
+fraction) plus a small absolute allowance for timer noise.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Differences below this many milliseconds are treated as noise
+NOISE_MS = 20.0
+
+CHILD = """
+import time
+started = time.perf_counter()
+{statement}
+print(round((time.perf_counter() - started) * 1000, 3))
+"""
+
+
+def steps(package: str) -> Dict[str, str]:
+    """Statements to time, cheapest first."""
+    return {
+        "config": f"import {package}.config",
+        "observability": f"import {package}.observability",
+        "services": f"import {package}.services",
+        "tools": f"import {package}.tools",
+        "agent module": f"import {package}.agent",
+        "root agent": f"from {package}.agent import get_root_agent; get_root_agent()",
+    }
+
+
+def time_statement(statement: str) -> float:
+    """Run a statement in a new interpreter and return its duration in ms."""
+    env = dict(os.environ)
+    # Building the agents validates these; the values are never used
+    for key in ("AMADEUS_API_KEY", "AMADEUS_SECRET_KEY", "WEATHER_API_KEY"):
+        env.setdefault(key, "benchmark")
+    env.setdefault("LOG_CONSOLE_LEVEL", "WARNING")
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD.format(statement=statement)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(statement: str, top: int) -> List[str]:
+    """Return the modules with the largest cumulative import time (-X importtime)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT, capture_output=True, text=True,
+        env={**os.environ, "AMADEUS_API_KEY": "benchmark", "AMADEUS_SECRET_KEY": "benchmark",
+             "WEATHER_API_KEY": "benchmark", "LOG_CONSOLE_LEVEL": "WARNING"}
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        rows.append((int(cumulative), name))
+    rows.sort(reverse=True)
+    return [f"  {cumulative / 1000:>9.1f} ms  {name}" for cumulative, name in rows[:top]]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--package", default="multi_agent_agent", choices=["multi_agent_agent", "multi_tool_agent"])
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per step")
+    parser.add_argument("--top", type=int, default=0, help="Also list the N slowest imports of the agent module")
+    parser.add_argument("--save", help="Write the medians to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file written by --save")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="Allowed slowdown against the baseline, as a fraction")
+    args = parser.parse_args()
+
+    medians = {}
+    print(f"{'step':<16} {'median':>10} {'min':>10} {'max':>10}")
+    for name, statement in steps(args.package).items():
+        samples = [time_statement(statement) for _ in range(args.repeat)]
+        medians[name] = statistics.median(samples)
+        print(f"{name:<16} {medians[name]:>8.1f}ms {min(samples):>8.1f}ms {max(samples):>8.1f}ms")
+
+    if args.top:
+        print(f"\nSlowest imports of {args.package}.agent:")
+        print("\n".join(slowest_imports(f"import {args.package}.agent", args.top)))
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"package": args.package, "median_ms": medians}, f, indent=2)
+        print(f"\nSaved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["median_ms"]
+        failed = False
+        print(f"\nAgainst {args.compare}:")
+        for name, median in medians.items():
+            if name not in baseline:
+                continue
+            limit = baseline[name] * (1 + args.max_regression) + NOISE_MS
+            ok = median <= limit
+            failed = failed or not ok
+            print(f"  {'ok  ' if ok else 'FAIL'} {name:<16} {baseline[name]:>8.1f}ms -> {median:>8.1f}ms")
+        sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Micro-benchmarks for the upstream response parsers.
+
+Builds synthetic payloads with the stand-in server's generators at several
+sizes and measures each parser's time per call, peak traced memory while
+parsing, and the memory and blocks kept alive by the parsed result:
+
+    python benchmarks/bench_parsers.py
+    python benchmarks/bench_parsers.py --only flights --sizes 250
+    python benchmarks/bench_parsers.py --save benchmarks/baselines/parsers.json
+    python benchmarks/bench_parsers.py --compare benchmarks/baselines/parsers.json
+
+With --compare the run fails when a parser is slower than the baseline by
+more than --max-regression, or uses more memory than --max-memory-regression
+allows. Time is compared on the fastest loop of all rounds. Timings are
+only comparable on the same machine; memory figures are portable, so
+--memory-only checks just those.
+"""
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from standin_server import Generator, parse_args as standin_args  # noqa: E402
+
+# Differences below these are treated as noise
+NOISE_MS = 0.02
+NOISE_KB = 4.0
+
+
+def payloads() -> Dict[str, Tuple[str, str, Dict[int, Callable[[], Dict[str, Any]]]]]:
+    """Benchmark name -> (service class, parser method, size -> payload builder)."""
+    def generator(*argv: str) -> Generator:
+        return Generator(standin_args(list(argv)))
+
+    flight_query = {"originLocationCode": "NYC", "destinationLocationCode": "PAR", "departureDate": "2026-12-01", "adults": "2"}
+    return {
+        "flights": ("FlightService", "_parse_flight_offers", {
+            n: (lambda n=n: generator("--flight-offers", str(n)).flight_offers(flight_query)) for n in (10, 50, 250)
+        }),
+        "hotels": ("HotelService", "_parse_hotels", {
+            n: (lambda n=n: generator("--hotels", str(n)).hotels({"cityCode": "PAR"})) for n in (100, 500, 2000)
+        }),
+        "hotel_offer": ("HotelService", "_parse_hotel_offer_details", {
+            n: (lambda n=n: generator("--offer-nights", str(n), "--description-sentences", str(n)).hotel_offer("OFFER1"))
+            for n in (1, 30)
+        }),
+        "forecast": ("WeatherService", "_parse_forecast", {
+            n: (lambda n=n: generator().forecast({"q": "Paris", "days": str(n)})) for n in (3, 14)
+        }),
+        "future": ("WeatherService", "_parse_future_weather", {
+            1: lambda: generator().future({"q": "Paris", "dt": "2026-12-20"})
+        }),
+    }
+
+
+def time_per_call(parse: Callable[[Dict[str, Any]], Any], payload: Dict[str, Any], repeat: int) -> List[float]:
+    """Return `repeat` samples of milliseconds per call, each from a loop of at least ~50 ms."""
+    # Like timeit, keep collector pauses out of the samples
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _time_loops(parse, payload, repeat)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def _time_loops(parse: Callable[[Dict[str, Any]], Any], payload: Dict[str, Any], repeat: int) -> List[float]:
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            parse(payload)
+        elapsed = time.perf_counter() - started
+        if elapsed >= 0.05:
+            break
+        number *= 2
+    samples = [elapsed / number * 1000]
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            parse(payload)
+        samples.append((time.perf_counter() - started) / number * 1000)
+    return samples
+
+
+def memory_of_call(parse: Callable[[Dict[str, Any]], Any], payload: Dict[str, Any]) -> Dict[str, float]:
+    """Trace one call: peak KiB while parsing, KiB and blocks still held by the result."""
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot().filter_traces(ignore)
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        result = parse(payload)
+        current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot().filter_traces(ignore)
+    finally:
+        tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+    del result
+    return {
+        "peak_kb": round((peak - baseline) / 1024, 1),
+        "retained_kb": round((current - baseline) / 1024, 1),
+        "retained_blocks": blocks
+    }
+
+
+def run(package: str, only: Optional[List[str]], sizes: Optional[List[int]], repeat: int, rounds: int) -> Dict[str, Dict[str, Any]]:
+    services = __import__(f"{package}.services", fromlist=["*"])
+    instances: Dict[str, Any] = {}
+    cases = []
+    for name, (service_class, method, builders) in payloads().items():
+        if only and name not in only:
+            continue
+        service = instances.setdefault(service_class, getattr(services, service_class)())
+        for size, build in builders.items():
+            if not sizes or size in sizes:
+                cases.append((f"{name}[{size}]", getattr(service, method), build()))
+
+    # Whole-suite rounds, so a burst of load on the machine only spoils some samples of each case
+    samples: Dict[str, List[float]] = {key: [] for key, _, _ in cases}
+    for _ in range(rounds):
+        for key, parse, payload in cases:
+            parse(payload)  # warm up
+            samples[key].extend(time_per_call(parse, payload, repeat))
+
+    results = {}
+    for key, parse, payload in cases:
+        results[key] = row = {
+            "payload_kb": round(len(json.dumps(payload)) / 1024, 1),
+            "median_ms": round(statistics.median(samples[key]), 4),
+            "min_ms": round(min(samples[key]), 4),
+            **memory_of_call(parse, payload)
+        }
+        print(f"{key:<18} {row['payload_kb']:>9.1f} {row['median_ms']:>10.3f} {row['min_ms']:>10.3f} "
+              f"{row['peak_kb']:>10.1f} {row['retained_kb']:>10.1f} {row['retained_blocks']:>8}")
+    return results
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], args: argparse.Namespace) -> bool:
+    """Print each benchmark against the baseline; return False on any regression."""
+    ok = True
+    for key, row in results.items():
+        base = baseline.get(key)
+        if base is None:
+            print(f"  new  {key}")
+            continue
+        checks = [("peak_kb", args.max_memory_regression, NOISE_KB), ("retained_kb", args.max_memory_regression, NOISE_KB)]
+        if not args.memory_only:
+            # The fastest loop is the least disturbed by other load on the machine
+            checks.insert(0, ("min_ms", args.max_regression, NOISE_MS))
+        failed = [
+            f"{field} {base[field]} -> {row[field]}"
+            for field, allowed, noise in checks
+            if row[field] > base[field] * (1 + allowed) + noise
+        ]
+        ok = ok and not failed
+        change = (row["min_ms"] - base["min_ms"]) / base["min_ms"] * 100 if base["min_ms"] else 0.0
+        print(f"  {'FAIL' if failed else 'ok  '} {key:<18} time {change:+6.1f}%  peak {base['peak_kb']} -> {row['peak_kb']} KiB"
+              + (f"  ({'; '.join(failed)})" if failed else ""))
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--package", default="multi_agent_agent", choices=["multi_agent_agent", "multi_tool_agent"])
+    parser.add_argument("--only", nargs="*", help="Benchmarks to run (flights, hotels, hotel_offer, forecast, future)")
+    parser.add_argument("--sizes", nargs="*", type=int, help="Payload sizes to run")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed loops per benchmark and round")
+    parser.add_argument("--rounds", type=int, default=3, help="Times the whole suite is run")
+    parser.add_argument("--save", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file written by --save")
+    parser.add_argument("--max-regression", type=float, default=0.5, help="Allowed slowdown, as a fraction")
+    parser.add_argument("--max-memory-regression", type=float, default=0.1, help="Allowed memory growth, as a fraction")
+    parser.add_argument("--memory-only", action="store_true", help="Compare memory only (baseline from another machine)")
+    args = parser.parse_args()
+
+    # Parsers need a configured service; no request is ever sent
+    for key in ("AMADEUS_API_KEY", "AMADEUS_SECRET_KEY", "WEATHER_API_KEY"):
+        os.environ.setdefault(key, "benchmark")
+
+    print(f"{'benchmark':<18} {'payload':>9} {'median':>10} {'min':>10} {'peak':>10} {'retained':>10} {'blocks':>8}")
+    print(f"{'':<18} {'KiB':>9} {'ms':>10} {'ms':>10} {'KiB':>10} {'KiB':>10} {'':>8}")
+    results = run(args.package, args.only, args.sizes, args.repeat, args.rounds)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump({"package": args.package, "python": sys.version.split()[0], "results": results}, f, indent=2)
+        print(f"\nSaved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        print(f"\nAgainst {args.compare}:")
+        sys.exit(0 if compare(results, baseline, args) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Flight + hotel combinations under a budget: heap-ordered join versus the
+cartesian product.
+
+Builds synthetic flight rows (stand-in flight offers through flight_row)
+and priced hotels, then answers every objective and the Pareto set both
+ways: TripOptimizer, and building, filtering and sorting every pair. Both
+must return the same options:
+
+    python benchmarks/bench_trip_optimizer.py
+    python benchmarks/bench_trip_optimizer.py --options 100 500 --budget 1500 --limit 10
+"""
+import argparse
+import os
+import random
+import sys
+from typing import Any, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_parsers import time_per_call  # noqa: E402
+from standin_server import Generator, parse_args as standin_args  # noqa: E402
+
+
+def build_options(count: int, services: Any, working_set: Any) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """`count` flight rows and `count` hotels with a price for a 4-night stay."""
+    generator = Generator(standin_args(["--flight-offers", str(count), "--hotels", str(count)]))
+    flights = services.FlightService()._parse_flight_offers(generator.flight_offers({"adults": "1"}))
+    hotels = services.HotelService()._parse_hotels(generator.hotels({"cityCode": "PAR"}))
+    rng = random.Random(count)
+    priced = [{**hotel, "price": round(4 * rng.uniform(60, 450), 2)} for hotel in hotels]
+    return [working_set.flight_row(flight) for flight in flights], priced
+
+
+def cartesian(flights: List[Dict[str, Any]], hotels: List[Dict[str, Any]], budget: float, limit: int) -> Dict[str, List]:
+    """Every pair within budget, sorted per objective; the Pareto set by a sweep over all of them."""
+    inf = float("inf")
+    pairs = [
+        (f["price"] + h["price"], f["duration_minutes"] or inf, -(float(h["rating"] or 0)), fi, hi)
+        for fi, f in enumerate(flights) for hi, h in enumerate(hotels)
+        if f["price"] + h["price"] <= budget
+    ]
+    results = {
+        "cheapest": sorted(pairs, key=lambda p: (p[0], p[3], p[4]))[:limit],
+        "fastest": sorted(pairs, key=lambda p: (p[1], p[0], p[3], p[4]))[:limit],
+        "best_rated": sorted(pairs, key=lambda p: (p[2], p[0], p[3], p[4]))[:limit],
+    }
+    # In price order a pair can only be dominated by one before it; equal options count once
+    front: List[Tuple] = []
+    for p in sorted(pairs):
+        if not any(q[1] <= p[1] and q[2] <= p[2] for q in front):
+            front.append(p)
+    results["pareto"] = front
+    return {name: [(round(p[0], 2), p[1], p[2]) for p in found] for name, found in results.items()}
+
+
+def summarize(options: List[Dict[str, Any]]) -> List[Tuple[float, float, float]]:
+    inf = float("inf")
+    return [
+        (o["total_price"], o["flight"]["duration_minutes"] or inf, -(float(o["hotel"]["rating"] or 0)))
+        for o in options
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--package", default="multi_agent_agent", choices=["multi_agent_agent", "multi_tool_agent"])
+    parser.add_argument("--options", type=int, nargs="+", default=[50, 200, 500], help="Flights and hotels on each side")
+    parser.add_argument("--budget", type=float, default=1200.0)
+    parser.add_argument("--limit", type=int, default=5, help="Combinations per objective")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed loops per measurement")
+    args = parser.parse_args()
+
+    for key in ("AMADEUS_API_KEY", "AMADEUS_SECRET_KEY", "WEATHER_API_KEY"):
+        os.environ.setdefault(key, "benchmark")
+    services = __import__(f"{args.package}.services", fromlist=["*"])
+    working_set = __import__(f"{args.package}.services.working_set", fromlist=["*"])
+    trip_optimizer = __import__(f"{args.package}.services.trip_optimizer", fromlist=["*"])
+
+    def optimized(sides: Tuple[List, List]) -> Dict[str, List]:
+        optimizer = trip_optimizer.TripOptimizer(*sides, args.budget)
+        plans = {objective: optimizer.best(objective, args.limit) for objective in trip_optimizer.OBJECTIVES}
+        plans["pareto"] = optimizer.pareto()
+        return plans
+
+    print(f"{'options':>8} {'pairs':>8} {'in budget':>10} {'pareto':>7} {'cartesian ms':>13} {'optimizer ms':>13} {'speedup':>8}")
+    for count in args.options:
+        sides = build_options(count, services, working_set)
+        expected = cartesian(*sides, args.budget, args.limit)
+        plans = optimized(sides)
+        for name, found in expected.items():
+            assert summarize(plans[name]) == found, f"{name} differs from the cartesian product"
+        within = trip_optimizer.TripOptimizer(*sides, args.budget).count_within_budget()
+
+        cartesian_ms = min(time_per_call(lambda s: cartesian(*s, args.budget, args.limit), sides, args.repeat))
+        optimizer_ms = min(time_per_call(optimized, sides, args.repeat))
+        print(f"{count:>8} {count * count:>8} {within:>10} {len(plans['pareto']):>7} "
+              f"{cartesian_ms:>13.3f} {optimizer_ms:>13.3f} {cartesian_ms / optimizer_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Load generator for the agent HTTP server.
+
+Start a server against stubbed upstreams, then drive it:
+
+    python -m multi_agent_agent.server --stub --stub-latency 1.0 --max-concurrency 32
+    python benchmarks/loadgen.py --url http://127.0.0.1:8080 --clients 100 --requests 1000
+
+Reports throughput, time to first event, full-turn latency percentiles and
+how many requests were rejected with 429.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+from typing import Any, Dict, List
+from urllib.parse import urlsplit
+
+
+async def send_chat(host: str, port: int, message: str, session_id: str) -> Dict[str, Any]:
+    """Send one /chat request and read the streamed response to the end."""
+    started = time.perf_counter()
+    reader, writer = await asyncio.open_connection(host, port)
+    body = json.dumps({"message": message, "session_id": session_id}).encode()
+    writer.write(
+        b"POST /chat HTTP/1.1\r\n"
+        + f"Host: {host}:{port}\r\n".encode()
+        + b"Content-Type: application/json\r\n"
+        + f"Content-Length: {len(body)}\r\n\r\n".encode()
+        + body
+    )
+    await writer.drain()
+
+    status_line = await reader.readline()
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, value = line.decode("latin-1").split(":", 1)
+        headers[name.strip().lower()] = value.strip()
+
+    first_event = None
+    events = 0
+    if headers.get("transfer-encoding") == "chunked":
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            if size == 0:
+                break
+            await reader.readexactly(size + 2)
+            events += 1
+            if first_event is None:
+                first_event = time.perf_counter() - started
+    else:
+        await reader.read()
+
+    writer.close()
+    await writer.wait_closed()
+    return {
+        "status": status,
+        "events": events,
+        "ttfe": first_event,
+        "latency": time.perf_counter() - started
+    }
+
+
+async def client(host: str, port: int, requests: asyncio.Queue, results: List[Dict[str, Any]], sessions: int) -> None:
+    """Pull request numbers off the queue until it is empty."""
+    while True:
+        try:
+            n = requests.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        session_id = f"load-{n % sessions}"
+        try:
+            results.append(await send_chat(host, port, f"Plan a trip #{n}", session_id))
+        except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+            results.append({"status": 0, "error": str(e), "latency": 0.0, "ttfe": None, "events": 0})
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def summarize(results: List[Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+    ok = [r for r in results if r["status"] == 200]
+    latencies = [r["latency"] for r in ok]
+    ttfes = [r["ttfe"] for r in ok if r["ttfe"] is not None]
+    statuses: Dict[str, int] = {}
+    for r in results:
+        statuses[str(r["status"])] = statuses.get(str(r["status"]), 0) + 1
+    return {
+        "requests": len(results),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(ok) / elapsed, 2) if elapsed else 0.0,
+        "statuses": statuses,
+        "latency_s": {
+            "mean": round(statistics.mean(latencies), 4) if latencies else 0.0,
+            "p50": round(percentile(latencies, 50), 4),
+            "p95": round(percentile(latencies, 95), 4),
+            "p99": round(percentile(latencies, 99), 4)
+        },
+        "time_to_first_event_s": {
+            "p50": round(percentile(ttfes, 50), 4),
+            "p95": round(percentile(ttfes, 95), 4)
+        }
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    url = urlsplit(args.url)
+    host, port = url.hostname or "127.0.0.1", url.port or 80
+    requests: asyncio.Queue = asyncio.Queue()
+    for n in range(args.requests):
+        requests.put_nowait(n)
+    results: List[Dict[str, Any]] = []
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        client(host, port, requests, results, args.sessions) for _ in range(args.clients)
+    ))
+    return summarize(results, time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive the agent HTTP server with concurrent sessions")
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--clients", type=int, default=50, help="concurrent connections")
+    parser.add_argument("--requests", type=int, default=500, help="total turns to send")
+    parser.add_argument("--sessions", type=int, default=100, help="distinct session IDs to rotate through")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
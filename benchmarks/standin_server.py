@@ -0,0 +1,616 @@
+"""
+Local stand-in for the Amadeus, WeatherAPI and exchange rate endpoints the agent calls.
+
+Serves synthetic but schema-faithful responses with configurable latency,
+error rate and payload size, so benchmarks and load tests never touch a
+real quota:
+
+    python benchmarks/standin_server.py --port 8090 --latency lognormal --latency-ms 300 --error-rate 0.02
+    AMADEUS_BASE_URL=http://127.0.0.1:8090 WEATHER_API_BASE_URL=http://127.0.0.1:8090/v1 \\
+        FX_API_BASE_URL=http://127.0.0.1:8090 python -m multi_agent_agent.server
+
+Endpoints:
+
+    POST /v1/security/oauth2/token
+    GET  /v2/shopping/flight-offers
+    POST /v2/shopping/flight-offers  (X-HTTP-Method-Override: GET)
+    POST /v1/shopping/flight-offers/pricing
+    GET  /v1/reference-data/locations/hotels/by-city
+    GET  /v3/shopping/hotel-offers
+    GET  /v3/shopping/hotel-offers/{offer_id}
+    GET  /v1/forecast.json, /v1/future.json, /v1/current.json
+    GET  /latest  (exchange rates, with FX_API_BASE_URL pointing at the stand-in)
+    GET  /__stats  (requests, errors and bytes served per endpoint)
+
+Responses are generated from --seed and the request parameters, so the
+same request always gets the same body. Combine with CASSETTE_MODE=record
+to build a cassette without any API key.
+"""
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+CARRIERS = {"AF": "AIR FRANCE", "BA": "BRITISH AIRWAYS", "LH": "LUFTHANSA", "KL": "KLM", "IB": "IBERIA", "U2": "EASYJET"}
+AIRCRAFT = {"320": "AIRBUS A320", "321": "AIRBUS A321", "333": "AIRBUS A330-300", "738": "BOEING 737-800", "77W": "BOEING 777-300ER"}
+HUBS = ["CDG", "LHR", "FRA", "AMS", "MAD", "MUC", "ZRH"]
+CHAINS = ["HI", "MC", "AC", "RT", "BW", "HL", "IB"]
+AMENITIES = ["SWIMMING_POOL", "SPA", "FITNESS_CENTER", "AIR_CONDITIONING", "RESTAURANT", "PARKING",
+             "PETS_ALLOWED", "AIRPORT_SHUTTLE", "BUSINESS_CENTER", "DISABLED_FACILITIES", "WIFI",
+             "MEETING_ROOMS", "NO_KID_ALLOWED", "TENNIS", "GOLF", "KITCHEN", "ANIMAL_WATCHING",
+             "BABY-SITTING", "BEACH", "CASINO", "JACUZZI", "SAUNA", "SOLARIUM", "MASSAGE",
+             "VALET_PARKING", "BAR or LOUNGE", "KIDS_WELCOME", "NO_PORN_FILMS", "MINIBAR",
+             "TELEVISION", "WI-FI_IN_ROOM", "ROOM_SERVICE", "GUARDED_PARKG", "SERV_SPEC_MENU"]
+# Units per euro, roughly the ECB reference rates
+FX_RATES = {"EUR": 1.0, "USD": 1.08, "GBP": 0.85, "JPY": 162.0, "CHF": 0.95, "INR": 90.2, "AUD": 1.64, "CAD": 1.47}
+CONDITIONS = ["Sunny", "Partly cloudy", "Cloudy", "Overcast", "Mist", "Patchy rain possible",
+              "Light rain", "Moderate rain", "Heavy rain", "Light snow", "Thundery outbreaks possible"]
+
+
+def iso_duration(minutes: int) -> str:
+    return f"PT{minutes // 60}H{minutes % 60}M" if minutes % 60 else f"PT{minutes // 60}H"
+
+
+class Generator:
+    """Builds response bodies; every body depends only on the seed and the request."""
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+
+    def rng(self, *parts: Any) -> random.Random:
+        digest = hashlib.sha256(json.dumps([self.args.seed, *parts], default=str).encode()).digest()
+        return random.Random(int.from_bytes(digest[:8], "big"))
+
+    def token(self) -> Dict[str, Any]:
+        return {
+            "type": "amadeusOAuth2Token",
+            "username": "standin@example.com",
+            "application_name": "standin",
+            "client_id": "standin",
+            "token_type": "Bearer",
+            "access_token": hashlib.sha256(str(time.time()).encode()).hexdigest()[:28],
+            "expires_in": 1799,
+            "state": "approved",
+            "scope": ""
+        }
+
+    def flight_offers(self, query: Dict[str, str]) -> Dict[str, Any]:
+        origin = query.get("originLocationCode", "NYC")
+        destination = query.get("destinationLocationCode", "PAR")
+        day = query.get("departureDate", (date.today() + timedelta(days=30)).isoformat())
+        adults = int(query.get("adults", "1"))
+        count = min(int(query.get("max", self.args.flight_offers)), self.args.flight_offers)
+        rng = self.rng("flights", origin, destination, day, adults)
+        offers = [self._flight_offer(rng, str(i + 1), origin, destination, day, adults) for i in range(count)]
+        return {
+            "meta": {"count": len(offers)},
+            "data": offers,
+            "dictionaries": {
+                "locations": {code: {"cityCode": code, "countryCode": "XX"} for code in {origin, destination, *HUBS}},
+                "aircraft": AIRCRAFT,
+                "currencies": {"EUR": "EURO"},
+                "carriers": CARRIERS
+            }
+        }
+
+    def _flight_offer(self, rng: random.Random, offer_id: str, origin: str, destination: str, day: str, adults: int) -> Dict[str, Any]:
+        stops = min(rng.choice([0, 0, 1, 1, 2]), self.args.max_stops)
+        carrier = rng.choice(list(CARRIERS))
+        airports = [origin] + rng.sample(HUBS, stops) + [destination]
+        departure = datetime.fromisoformat(day) + timedelta(minutes=rng.randrange(5 * 60, 22 * 60, 5))
+        segments = []
+        for i in range(stops + 1):
+            minutes = rng.randrange(60, 9 * 60, 5)
+            arrival = departure + timedelta(minutes=minutes)
+            segments.append({
+                "departure": {"iataCode": airports[i], "terminal": str(rng.randint(1, 3)), "at": departure.isoformat()},
+                "arrival": {"iataCode": airports[i + 1], "terminal": str(rng.randint(1, 3)), "at": arrival.isoformat()},
+                "carrierCode": carrier,
+                "number": str(rng.randint(10, 9999)),
+                "aircraft": {"code": rng.choice(list(AIRCRAFT))},
+                "operating": {"carrierCode": carrier},
+                "duration": iso_duration(minutes),
+                "id": str(i + 1),
+                "numberOfStops": 0,
+                "blacklistedInEU": False
+            })
+            departure = arrival + timedelta(minutes=rng.randrange(45, 4 * 60, 5))
+        total_minutes = int((datetime.fromisoformat(segments[-1]["arrival"]["at"])
+                             - datetime.fromisoformat(segments[0]["departure"]["at"])).total_seconds() // 60)
+        per_traveler = round(rng.uniform(80, 1400), 2)
+        base = round(per_traveler * 0.85, 2)
+        return {
+            "type": "flight-offer",
+            "id": offer_id,
+            "source": "GDS",
+            "instantTicketingRequired": False,
+            "nonHomogeneous": False,
+            "oneWay": False,
+            "lastTicketingDate": (datetime.fromisoformat(day) - timedelta(days=rng.randint(1, 20))).date().isoformat(),
+            "numberOfBookableSeats": rng.randint(1, 9),
+            "itineraries": [{"duration": iso_duration(total_minutes), "segments": segments}],
+            "price": {
+                "currency": "EUR",
+                "total": f"{per_traveler * adults:.2f}",
+                "base": f"{base * adults:.2f}",
+                "fees": [{"amount": "0.00", "type": "SUPPLIER"}, {"amount": "0.00", "type": "TICKETING"}],
+                "grandTotal": f"{per_traveler * adults:.2f}"
+            },
+            "pricingOptions": {"fareType": ["PUBLISHED"], "includedCheckedBagsOnly": True},
+            "validatingAirlineCodes": [carrier],
+            "travelerPricings": [
+                {
+                    "travelerId": str(t + 1),
+                    "fareOption": "STANDARD",
+                    "travelerType": "ADULT",
+                    "price": {"currency": "EUR", "total": f"{per_traveler:.2f}", "base": f"{base:.2f}"},
+                    "fareDetailsBySegment": [
+                        {
+                            "segmentId": segment["id"],
+                            "cabin": "ECONOMY",
+                            "fareBasis": "YLOWFR",
+                            "class": "Y",
+                            "includedCheckedBags": {"quantity": 1}
+                        }
+                        for segment in segments
+                    ]
+                }
+                for t in range(adults)
+            ]
+        }
+
+    def flight_offers_search(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """POST search: one offer covers every origin-destination; filters apply before --flight-offers is capped."""
+        legs = [
+            (od.get("originLocationCode", "NYC"), od.get("destinationLocationCode", "PAR"),
+             od.get("departureDateTimeRange", {}).get("date", (date.today() + timedelta(days=30)).isoformat()))
+            for od in body.get("originDestinations", [])
+        ]
+        adults = len(body.get("travelers", [])) or 1
+        currency = body.get("currencyCode", "EUR")
+        criteria = body.get("searchCriteria", {})
+        filters = criteria.get("flightFilters", {})
+        cabin = next((c.get("cabin") for c in filters.get("cabinRestrictions", [])), None) or "ECONOMY"
+        nonstop = filters.get("connectionRestriction", {}).get("maxNumberOfConnections") == 0
+        max_price = criteria.get("maxPrice")
+        count = min(int(criteria.get("maxFlightOffers", 250)), self.args.flight_offers)
+        rng = self.rng("flight-search", legs, adults)
+        offers = []
+        for i in range(self.args.flight_offers):
+            parts = [self._flight_offer(rng, str(i + 1), origin, destination, day, adults) for origin, destination, day in legs]
+            if nonstop and any(len(part["itineraries"][0]["segments"]) > 1 for part in parts):
+                continue
+            offer = self._combine(parts, cabin, currency, adults)
+            if max_price is not None and float(offer["travelerPricings"][0]["price"]["total"]) > max_price:
+                continue
+            offers.append(offer)
+        offers = sorted(offers, key=lambda o: float(o["price"]["total"]))[:count]
+        for i, offer in enumerate(offers):
+            offer["id"] = str(i + 1)
+        locations = {code for leg in legs for code in leg[:2]}
+        return {
+            "meta": {"count": len(offers)},
+            "data": offers,
+            "dictionaries": {
+                "locations": {code: {"cityCode": code, "countryCode": "XX"} for code in {*locations, *HUBS}},
+                "aircraft": AIRCRAFT,
+                "currencies": {currency: currency},
+                "carriers": CARRIERS
+            }
+        }
+
+    @staticmethod
+    def _combine(parts: List[Dict[str, Any]], cabin: str, currency: str, adults: int) -> Dict[str, Any]:
+        """One offer flying every part, priced for the cabin, with segment IDs numbered across itineraries."""
+        factor = {"PREMIUM_ECONOMY": 1.6, "BUSINESS": 3.2, "FIRST": 5.0}.get(cabin, 1.0)
+        per_traveler = round(sum(float(p["travelerPricings"][0]["price"]["total"]) for p in parts) * factor, 2)
+        base = round(per_traveler * 0.85, 2)
+        itineraries, details = [], []
+        for part in parts:
+            segments = []
+            for segment in part["itineraries"][0]["segments"]:
+                segment = {**segment, "id": str(len(details) + 1)}
+                segments.append(segment)
+                details.append({
+                    "segmentId": segment["id"],
+                    "cabin": cabin,
+                    "fareBasis": "YLOWFR",
+                    "class": "Y",
+                    "includedCheckedBags": {"quantity": 1}
+                })
+            itineraries.append({**part["itineraries"][0], "segments": segments})
+        return {
+            **parts[0],
+            "oneWay": len(parts) == 1,
+            "lastTicketingDate": min(p["lastTicketingDate"] for p in parts),
+            "numberOfBookableSeats": min(p["numberOfBookableSeats"] for p in parts),
+            "itineraries": itineraries,
+            "price": {
+                "currency": currency,
+                "total": f"{per_traveler * adults:.2f}",
+                "base": f"{base * adults:.2f}",
+                "fees": [{"amount": "0.00", "type": "SUPPLIER"}, {"amount": "0.00", "type": "TICKETING"}],
+                "grandTotal": f"{per_traveler * adults:.2f}"
+            },
+            "travelerPricings": [
+                {
+                    "travelerId": str(t + 1),
+                    "fareOption": "STANDARD",
+                    "travelerType": "ADULT",
+                    "price": {"currency": currency, "total": f"{per_traveler:.2f}", "base": f"{base:.2f}"},
+                    "fareDetailsBySegment": details
+                }
+                for t in range(adults)
+            ]
+        }
+
+    def fx_rates(self, query: Dict[str, str]) -> Dict[str, Any]:
+        base = query.get("base", "EUR").upper()
+        per_base = FX_RATES.get(base, 1.0)
+        return {
+            "amount": 1.0,
+            "base": base,
+            "date": date.today().isoformat(),
+            "rates": {code: round(rate / per_base, 6) for code, rate in FX_RATES.items() if code != base}
+        }
+
+    def flight_pricing(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        offers = body.get("data", {}).get("flightOffers", [])
+        priced = []
+        for offer in offers:
+            rng = self.rng("pricing", offer.get("id"), offer.get("price", {}).get("total"))
+            if rng.random() < self.args.unavailable_rate:
+                continue
+            drift = 1 + rng.uniform(-self.args.price_drift, self.args.price_drift)
+            total = float(offer.get("price", {}).get("total", 0)) * drift
+            priced.append({**offer, "price": {**offer.get("price", {}), "total": f"{total:.2f}", "grandTotal": f"{total:.2f}"}})
+        return {"data": {"type": "flight-offers-pricing", "flightOffers": priced}, "dictionaries": {"locations": {}}}
+
+    def hotels(self, query: Dict[str, str]) -> Dict[str, Any]:
+        city = query.get("cityCode", "PAR")
+        rng = self.rng("hotels", city)
+        ratings = [int(r) for r in query.get("ratings", "").split(",") if r]
+        wanted = [a for a in query.get("amenities", "").split(",") if a]
+        hotels = []
+        for i in range(self.args.hotels):
+            chain = rng.choice(CHAINS)
+            hotel = {
+                "chainCode": chain,
+                "iataCode": city,
+                "dupeId": 700000000 + i,
+                "name": f"STANDIN HOTEL {city} {i + 1}",
+                "hotelId": f"{chain}{city}{i + 1:03d}",
+                "geoCode": {"latitude": round(48.85 + rng.uniform(-0.1, 0.1), 5), "longitude": round(2.35 + rng.uniform(-0.1, 0.1), 5)},
+                "address": {"countryCode": "FR", "cityName": city, "postalCode": f"75{rng.randint(1, 20):03d}", "lines": [f"{rng.randint(1, 200)} RUE DE TEST"]},
+                "distance": {"value": round(rng.uniform(0.1, float(query.get("radius", 5))), 2), "unit": query.get("radiusUnit", "KM")},
+                "amenities": sorted(rng.sample(AMENITIES, rng.randint(2, self.args.hotel_amenities))),
+                "rating": rng.randint(1, 5),
+                "lastUpdate": "2024-01-01T00:00:00"
+            }
+            if ratings and hotel["rating"] not in ratings:
+                continue
+            if wanted and not set(wanted) <= set(hotel["amenities"]):
+                continue
+            hotels.append(hotel)
+        return {"data": hotels, "meta": {"count": len(hotels), "links": {"self": f"/v1/reference-data/locations/hotels/by-city?cityCode={city}"}}}
+
+    def _location(self, q: str) -> Dict[str, Any]:
+        rng = self.rng("location", q)
+        return {
+            "name": q.title(), "region": "", "country": "Standin", "lat": round(rng.uniform(-60, 60), 2),
+            "lon": round(rng.uniform(-180, 180), 2), "tz_id": "Europe/Paris", "localtime_epoch": 0,
+            "localtime": datetime.now().strftime("%Y-%m-%d %H:%M")
+        }
+
+    def _forecast_day(self, q: str, day: date) -> Dict[str, Any]:
+        rng = self.rng("weather", q, day.isoformat())
+        low = rng.uniform(-5, 22)
+        high = low + rng.uniform(2, 12)
+        condition = rng.choice(CONDITIONS)
+        return {
+            "date": day.isoformat(),
+            "date_epoch": int(datetime.combine(day, datetime.min.time()).timestamp()),
+            "day": {
+                "maxtemp_c": round(high, 1), "mintemp_c": round(low, 1), "avgtemp_c": round((low + high) / 2, 1),
+                "maxwind_kph": round(rng.uniform(2, 50), 1), "totalprecip_mm": round(rng.uniform(0, 20), 1),
+                "totalsnow_cm": 0.0, "avghumidity": rng.randint(30, 95),
+                "daily_chance_of_rain": rng.randint(0, 100), "daily_chance_of_snow": rng.randint(0, 10),
+                "condition": {"text": condition, "icon": "//cdn.weatherapi.com/weather/64x64/day/113.png", "code": 1000},
+                "uv": round(rng.uniform(0, 10), 1)
+            },
+            "astro": {"sunrise": "06:45 AM", "sunset": "08:30 PM", "moonrise": "10:00 PM", "moonset": "09:00 AM",
+                      "moon_phase": "Waxing Gibbous", "moon_illumination": rng.randint(0, 100)},
+            "hour": [
+                {
+                    "time": f"{day.isoformat()} {hour:02d}:00",
+                    "temp_c": round(low + (high - low) * rng.random(), 1),
+                    "condition": {"text": condition, "icon": "//cdn.weatherapi.com/weather/64x64/day/113.png", "code": 1000},
+                    "wind_kph": round(rng.uniform(0, 40), 1), "humidity": rng.randint(30, 95),
+                    "chance_of_rain": rng.randint(0, 100), "chance_of_snow": 0, "uv": round(rng.uniform(0, 10), 1)
+                }
+                for hour in range(self.args.forecast_hours)
+            ]
+        }
+
+    def current(self, query: Dict[str, str]) -> Dict[str, Any]:
+        q = query.get("q", "Paris")
+        today = self._forecast_day(q, date.today())["day"]
+        return {
+            "location": self._location(q),
+            "current": {"temp_c": today["maxtemp_c"], "is_day": 1, "condition": today["condition"],
+                        "humidity": today["avghumidity"], "cloud": 40, "feelslike_c": today["maxtemp_c"], "uv": today["uv"]}
+        }
+
+    def forecast(self, query: Dict[str, str]) -> Dict[str, Any]:
+        q = query.get("q", "Paris")
+        days = min(max(int(query.get("days", "3")), 1), 14)
+        return {
+            **self.current(query),
+            "forecast": {"forecastday": [self._forecast_day(q, date.today() + timedelta(days=i)) for i in range(days)]}
+        }
+
+    def future(self, query: Dict[str, str]) -> Dict[str, Any]:
+        q = query.get("q", "Paris")
+        day = date.fromisoformat(query.get("dt", (date.today() + timedelta(days=20)).isoformat()))
+        return {"location": self._location(q), "forecast": {"forecastday": [self._forecast_day(q, day)]}}
+
+    def hotel_offer(self, offer_id: str) -> Dict[str, Any]:
+        rng = self.rng("hotel-offer", offer_id)
+        nights = rng.randint(1, self.args.offer_nights)
+        check_in = date.today() + timedelta(days=rng.randint(7, 90))
+        nightly = round(rng.uniform(60, 450), 2)
+        hotel_id = f"{rng.choice(CHAINS)}PAR{rng.randint(1, 999):03d}"
+        return {
+            "data": {
+                "type": "hotel-offers",
+                "id": offer_id,
+                "checkInDate": check_in.isoformat(),
+                "checkOutDate": (check_in + timedelta(days=nights)).isoformat(),
+                "rateCode": "RAC",
+                "room": {
+                    "type": "A1K",
+                    "typeEstimated": {"category": "STANDARD_ROOM", "beds": 1, "bedType": "KING"},
+                    "description": {"text": "Standard room, one king bed. " * self.args.description_sentences, "lang": "EN"}
+                },
+                "guests": {"adults": rng.randint(1, 2)},
+                "price": {
+                    "currency": "EUR",
+                    "base": f"{nightly * nights * 0.9:.2f}",
+                    "total": f"{nightly * nights:.2f}",
+                    "variations": {
+                        "average": {"base": f"{nightly * 0.9:.2f}"},
+                        "changes": [
+                            {
+                                "startDate": (check_in + timedelta(days=n)).isoformat(),
+                                "endDate": (check_in + timedelta(days=n + 1)).isoformat(),
+                                "total": f"{nightly:.2f}"
+                            }
+                            for n in range(nights)
+                        ]
+                    }
+                },
+                "policies": {
+                    "paymentType": "guarantee",
+                    "cancellations": [{"numberOfNights": 1, "deadline": f"{check_in.isoformat()}T12:00:00"}]
+                },
+                "hotel": {
+                    "type": "hotel",
+                    "hotelId": hotel_id,
+                    "chainCode": hotel_id[:2],
+                    "name": f"STANDIN HOTEL {hotel_id}",
+                    "rating": str(rng.randint(1, 5)),
+                    "cityCode": "PAR",
+                    "description": {"text": "A stand-in hotel near the centre. " * self.args.description_sentences, "lang": "EN"},
+                    "address": {"countryCode": "FR", "cityName": "PARIS", "postalCode": "75001", "lines": ["1 RUE DE TEST"]},
+                    "contact": {"phone": "+33 1 00 00 00 00", "email": "standin@example.com"},
+                    "amenities": sorted(rng.sample(AMENITIES, rng.randint(2, self.args.hotel_amenities)))
+                }
+            }
+        }
+
+
+    def hotel_offers(self, query: Dict[str, str]) -> Dict[str, Any]:
+        check_in = query.get("checkInDate", (date.today() + timedelta(days=30)).isoformat())
+        check_out = query.get("checkOutDate", (date.fromisoformat(check_in) + timedelta(days=1)).isoformat())
+        nights = max((date.fromisoformat(check_out) - date.fromisoformat(check_in)).days, 1)
+        adults = int(query.get("adults", "1"))
+        entries = []
+        for hotel_id in [h for h in query.get("hotelIds", "").split(",") if h]:
+            rng = self.rng("hotel-offers", hotel_id, check_in, check_out, adults)
+            if rng.random() < self.args.unavailable_rate:
+                continue
+            nightly = round(rng.uniform(60, 450) * (1 + 0.25 * (adults - 1)), 2)
+            entries.append({
+                "type": "hotel-offers",
+                "hotel": {"type": "hotel", "hotelId": hotel_id, "chainCode": hotel_id[:2], "name": f"STANDIN HOTEL {hotel_id}",
+                          "cityCode": hotel_id[2:5]},
+                "available": True,
+                "offers": [{
+                    "id": hashlib.sha256(f"{hotel_id}{check_in}{check_out}{adults}".encode()).hexdigest()[:10].upper(),
+                    "checkInDate": check_in,
+                    "checkOutDate": check_out,
+                    "rateCode": "RAC",
+                    "room": {"type": "A1K", "description": {"text": "Standard room, one king bed.", "lang": "EN"}},
+                    "guests": {"adults": adults},
+                    "price": {"currency": query.get("currency", "EUR"), "base": f"{nightly * nights * 0.9:.2f}",
+                              "total": f"{nightly * nights:.2f}"},
+                    "policies": {"paymentType": "guarantee"}
+                }]
+            })
+        return {"data": entries}
+
+
+class Latency:
+    """Draws a response delay in seconds from the configured distribution."""
+
+    def __init__(self, distribution: str, mean_ms: float, spread: float, seed: int):
+        self.distribution = distribution
+        self.mean = mean_ms / 1000
+        self.spread = spread
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self) -> float:
+        with self._lock:
+            if self.mean <= 0:
+                return 0.0
+            if self.distribution == "uniform":
+                return self._rng.uniform(self.mean * (1 - self.spread), self.mean * (1 + self.spread))
+            if self.distribution == "exponential":
+                return self._rng.expovariate(1 / self.mean)
+            if self.distribution == "lognormal":
+                # Parameterized so the mean stays at mean_ms whatever the spread
+                sigma = self.spread
+                mu = math.log(self.mean) - sigma ** 2 / 2
+                return self._rng.lognormvariate(mu, sigma)
+            return self.mean
+
+
+class Stats:
+    def __init__(self):
+        self.endpoints: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, endpoint: str, status: int, size: int) -> None:
+        with self._lock:
+            entry = self.endpoints.setdefault(endpoint, {"requests": 0, "errors": 0, "bytes": 0})
+            entry["requests"] += 1
+            entry["errors"] += status >= 400
+            entry["bytes"] += size
+
+
+def make_handler(args: argparse.Namespace) -> type:
+    generator = Generator(args)
+    latency = Latency(args.latency, args.latency_ms, args.latency_spread, args.seed)
+    errors = random.Random(args.seed + 1)
+    errors_lock = threading.Lock()
+    stats = Stats()
+
+    # (method, path with {placeholders}, builder taking query and body, upstream)
+    routes: List[Tuple[str, str, Callable[[Dict[str, str], Dict[str, Any]], Dict[str, Any]], str]] = [
+        ("POST", "/v1/security/oauth2/token", lambda q, b: generator.token(), "amadeus"),
+        ("POST", "/v1/shopping/flight-offers/pricing", lambda q, b: generator.flight_pricing(b), "amadeus"),
+        ("GET", "/v2/shopping/flight-offers", lambda q, b: generator.flight_offers(q), "amadeus"),
+        ("POST", "/v2/shopping/flight-offers", lambda q, b: generator.flight_offers_search(b), "amadeus"),
+        ("GET", "/v1/reference-data/locations/hotels/by-city", lambda q, b: generator.hotels(q), "amadeus"),
+        ("GET", "/v3/shopping/hotel-offers", lambda q, b: generator.hotel_offers(q), "amadeus"),
+        ("GET", "/v3/shopping/hotel-offers/{offer_id}", lambda q, b: generator.hotel_offer(q["offer_id"]), "amadeus"),
+        ("GET", "/forecast.json", lambda q, b: generator.forecast(q), "weather"),
+        ("GET", "/future.json", lambda q, b: generator.future(q), "weather"),
+        ("GET", "/current.json", lambda q, b: generator.current(q), "weather"),
+        ("GET", "/latest", lambda q, b: generator.fx_rates(q), "fx"),
+    ]
+    patterns = [re.compile(re.sub(r"\{(\w+)\}", r"(?P<\1>[^/]+)", path) + "$") for _, path, _, _ in routes]
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format: str, *log_args: Any) -> None:
+            if args.verbose:
+                super().log_message(format, *log_args)
+
+        def do_GET(self) -> None:
+            self._handle("GET")
+
+        def do_POST(self) -> None:
+            self._handle("POST")
+
+        def _handle(self, method: str) -> None:
+            url = urlsplit(self.path)
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            body: Dict[str, Any] = {}
+            if raw and "json" in (self.headers.get("Content-Type") or ""):
+                body = json.loads(raw)
+            override = self.headers.get("X-HTTP-Method-Override")
+
+            if url.path == "/__stats":
+                self._send(200, stats.endpoints, url.path)
+                return
+            for (route_method, suffix, build, upstream), pattern in zip(routes, patterns):
+                match = pattern.search(url.path)
+                if match and route_method == method:
+                    query.update(match.groupdict())
+                    break
+            else:
+                self._send(404, {"errors": [{"status": 404, "code": 38196, "title": "Resource not found"}]}, url.path)
+                return
+            if override and override != "GET":
+                self._send(400, {"errors": [{"status": 400, "title": "Unsupported method override"}]}, suffix)
+                return
+
+            time.sleep(latency.sample())
+            with errors_lock:
+                fail = errors.random() < args.error_rate and suffix != "/v1/security/oauth2/token"
+            if fail:
+                if upstream == "weather":
+                    payload = {"error": {"code": 9999, "message": "Internal application error."}}
+                else:
+                    payload = {"errors": [{"status": args.error_status, "code": 141, "title": "SYSTEM ERROR HAS OCCURRED"}]}
+                self._send(args.error_status, payload, suffix)
+                return
+            self._send(200, build(query, body), suffix)
+
+        def _send(self, status: int, payload: Dict[str, Any], endpoint: str) -> None:
+            data = json.dumps(payload).encode()
+            stats.add(endpoint, status, len(data))
+            self.send_response(status)
+            self.send_header("Content-Type", "application/vnd.amadeus+json" if endpoint.startswith("/v") else "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return Handler
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--latency", default="fixed", choices=["fixed", "uniform", "exponential", "lognormal"],
+                        help="Response delay distribution")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Mean response delay")
+    parser.add_argument("--latency-spread", type=float, default=0.5,
+                        help="Relative half-width for uniform, sigma for lognormal")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with --error-status")
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--flight-offers", type=int, default=50, help="Offers per flight search (capped by the max parameter)")
+    parser.add_argument("--max-stops", type=int, default=2)
+    parser.add_argument("--price-drift", type=float, default=0.0, help="Relative price change applied by the pricing endpoint")
+    parser.add_argument("--unavailable-rate", type=float, default=0.0, help="Fraction of offers the pricing and hotel offers endpoints drop")
+    parser.add_argument("--hotels", type=int, default=100, help="Hotels per city search before filters")
+    parser.add_argument("--hotel-amenities", type=int, default=12, help="Maximum amenities per hotel")
+    parser.add_argument("--offer-nights", type=int, default=7, help="Maximum nights (price changes) per hotel offer")
+    parser.add_argument("--description-sentences", type=int, default=3, help="Length of hotel and room descriptions")
+    parser.add_argument("--forecast-hours", type=int, default=24, help="Hourly entries per forecast day")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args))
+    server.daemon_threads = True
+    print(f"Stand-in upstream listening on http://{args.host}:{args.port}")
+    print(f"  AMADEUS_BASE_URL=http://{args.host}:{args.port} WEATHER_API_BASE_URL=http://{args.host}:{args.port}/v1"
+          f" FX_API_BASE_URL=http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,196 @@
 import os
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+import threading
+import time
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+from .settings import load_environment
+
+LOGGER_NAME = 'travel_agent'
+
+_setup_lock = threading.Lock()
+_listener = None
+
+
+class _InProcessQueueHandler(QueueHandler):
+    """
+    QueueHandler that enqueues records untouched.
+
+    The stock prepare() formats the message on the calling thread so the
+    record can be pickled; our queue never leaves the process, so that work
+    is left to the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
 
 def setup_logging():
-    # Create logs directory if it doesn't exist
-    logs_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'logs')
-    os.makedirs(logs_dir, exist_ok=True)
-    
-    # Configure logging
-    logger = logging.getLogger('travel_agent')
-    logger.setLevel(logging.DEBUG)
-    
-    # File handler with rotation (max 5MB per file, keep 5 backup files)
-    file_handler = RotatingFileHandler(
-        os.path.join(logs_dir, 'travel_agent.log'),
-        maxBytes=5*1024*1024,  # 5MB
-        backupCount=5
-    )
-    file_handler.setLevel(logging.DEBUG)
-    file_formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    file_handler.setFormatter(file_formatter)
-    
-    # Console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-    console_formatter = logging.Formatter(
-        '%(levelname)s: %(message)s'
+    """
+    Configure the travel_agent logger once per process.
+
+    Records go to a rotating file (LOG_FILE_LEVEL, default DEBUG) and the
+    console (LOG_CONSOLE_LEVEL, default INFO). Forked processes (pre-fork
+    workers) write to a file of their own, travel_agent.<pid>.log, since
+    several processes rotating one file lose lines. Unless LOG_QUEUE is false,
+    the logger only puts records on an in-memory queue and a background
+    listener thread formats and writes them, keeping file I/O off the
+    request path. Later calls return the already configured logger.
+    """
+    global _listener
+    logger = logging.getLogger(LOGGER_NAME)
+
+    with _setup_lock:
+        if getattr(logger, '_travel_agent_configured', False):
+            return logger
+
+        load_environment()
+
+        # Create logs directory if it doesn't exist
+        logs_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'logs')
+        os.makedirs(logs_dir, exist_ok=True)
+
+        file_level = logging.getLevelName(os.getenv('LOG_FILE_LEVEL', 'DEBUG').upper())
+        console_level = logging.getLevelName(os.getenv('LOG_CONSOLE_LEVEL', 'INFO').upper())
+
+        # File handler with rotation (max 5MB per file, keep 5 backup files)
+        file_handler = RotatingFileHandler(
+            os.path.join(logs_dir, 'travel_agent.log'),
+            maxBytes=5*1024*1024,  # 5MB
+            backupCount=5
+        )
+        file_handler.setLevel(file_level)
+        file_formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        )
+        file_handler.setFormatter(file_formatter)
+
+        # Console handler
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(console_level)
+        console_formatter = logging.Formatter(
+            '%(levelname)s: %(message)s'
+        )
+        console_handler.setFormatter(console_formatter)
+
+        # Records below every handler's level are dropped before they are built
+        logger.setLevel(min(file_level, console_level))
+
+        if os.getenv('LOG_QUEUE', 'true').lower() in ('1', 'true', 'yes'):
+            log_queue = queue.SimpleQueue()
+            _listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+            _listener.start()
+            atexit.register(_stop_listener)
+            logger.addHandler(_InProcessQueueHandler(log_queue))
+        else:
+            logger.addHandler(file_handler)
+            logger.addHandler(console_handler)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=_setup_after_fork)
+
+        logger._travel_agent_configured = True
+        return logger
+
+
+def _stop_listener():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _own_file_handler(handler: RotatingFileHandler) -> RotatingFileHandler:
+    """A copy of a file handler writing to this process's own file."""
+    base, extension = os.path.splitext(handler.baseFilename)
+    own = RotatingFileHandler(
+        f"{base}.{os.getpid()}{extension}",
+        maxBytes=handler.maxBytes,
+        backupCount=handler.backupCount,
+        delay=True
     )
-    console_handler.setFormatter(console_formatter)
-    
-    # Add handlers to logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-    
-    return logger
\ No newline at end of file
+    own.setLevel(handler.level)
+    own.setFormatter(handler.formatter)
+    return own
+
+
+def _setup_after_fork():
+    """
+    Give a forked child its own log file and, if queued, its own queue and
+    listener thread.
+
+    Threads do not survive fork(), and the queue the parent's listener was
+    waiting on is left in whatever state that wait had it in, so records a
+    pre-forked worker put there could be lost. Records the parent had queued
+    but not yet written stay with the parent, which writes them. The
+    parent's file handler is left open: closing it would flush the parent's
+    buffer a second time.
+    """
+    global _listener
+    logger = logging.getLogger(LOGGER_NAME)
+    for handler in list(logger.handlers):
+        if isinstance(handler, RotatingFileHandler):
+            logger.removeHandler(handler)
+            logger.addHandler(_own_file_handler(handler))
+    if _listener is not None:
+        log_queue = queue.SimpleQueue()
+        for handler in logger.handlers:
+            if isinstance(handler, _InProcessQueueHandler):
+                handler.queue = log_queue
+        handlers = [
+            _own_file_handler(handler) if isinstance(handler, RotatingFileHandler) else handler
+            for handler in _listener.handlers
+        ]
+        _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+
+
+class LogSampler:
+    """
+    Decides which per-item log lines to keep.
+
+    The first `first` lines of each key in every `window` seconds are
+    kept, then one in every `every`, so a loop over hundreds of results
+    logs a handful of examples instead of a line per item, while a line
+    that keeps recurring is logged again each window (window 0: never
+    start over).
+    """
+
+    def __init__(self, first: int = 5, every: int = 100, window: float = 60.0):
+        self.first = first
+        self.every = max(every, 1)
+        self.window = window
+        # key -> [window start, lines seen in the window]
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def should_log(self, key: str) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            state = self._windows.get(key)
+            if state is None or (self.window > 0 and now - state[0] >= self.window):
+                state = self._windows[key] = [now, 0]
+            n = state[1]
+            state[1] += 1
+        return n < self.first or n % self.every == 0
+
+
+_sampler = None
+
+def _get_sampler() -> LogSampler:
+    global _sampler
+    if _sampler is None:
+        with _setup_lock:
+            if _sampler is None:
+                _sampler = LogSampler(
+                    first=int(os.getenv('LOG_SAMPLE_FIRST', '5')),
+                    every=int(os.getenv('LOG_SAMPLE_EVERY', '100')),
+                    window=float(os.getenv('LOG_SAMPLE_WINDOW', '60'))
+                )
+    return _sampler
+
+def debug_sampled(logger: logging.Logger, key: str, msg: str, *args) -> None:
+    """Log a per-item debug line, subject to sampling by key."""
+    if logger.isEnabledFor(logging.DEBUG) and _get_sampler().should_log(key):
+        logger.debug(msg, *args)
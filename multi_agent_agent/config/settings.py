@@ -1,8 +1,5 @@
 import os
-from dotenv import load_dotenv
-
-# Load environment variables from .env file
-load_dotenv()
+import threading
 
 class Settings:
     """Configuration settings for the travel agent."""
@@ -11,11 +8,69 @@ class Settings:
         # Amadeus settings
         self.amadeus_api_key = os.getenv("AMADEUS_API_KEY")
         self.amadeus_secret_key = os.getenv("AMADEUS_SECRET_KEY")
-        self.amadeus_base_url = "https://test.api.amadeus.com"
+        self.amadeus_base_url = os.getenv("AMADEUS_BASE_URL", "https://test.api.amadeus.com")
         
         # Weather API settings
         self.weather_api_key = os.getenv("WEATHER_API_KEY")
-        self.weather_api_base_url = "http://api.weatherapi.com/v1"
+        self.weather_api_base_url = os.getenv("WEATHER_API_BASE_URL", "http://api.weatherapi.com/v1")
+        
+        # Search result cache settings
+        self.search_cache_ttl = float(os.getenv("SEARCH_CACHE_TTL", "900"))
+        self.search_cache_max_entries = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "256"))
+        # Upstream searches shared by every user (hotel lists, one-way flight searches, weather); 0 disables
+        self.upstream_cache_ttl = float(os.getenv("UPSTREAM_CACHE_TTL", "300"))
+        self.upstream_cache_max_entries = int(os.getenv("UPSTREAM_CACHE_MAX_ENTRIES", "256"))
+        
+        # Hotel indexes kept for working-set follow-up queries
+        self.hotel_index_max_entries = int(os.getenv("HOTEL_INDEX_MAX_ENTRIES", "128"))
+        # Offers requested per POST flight search (round trips, multi-city, filters)
+        self.flight_search_max_results = int(os.getenv("FLIGHT_SEARCH_MAX_RESULTS", "50"))
+        # Hotel IDs priced per hotel offers search request
+        self.hotel_offers_batch_size = int(os.getenv("HOTEL_OFFERS_BATCH_SIZE", "20"))
+        # Upstream calls run at once when planning or comparing trips
+        self.plan_max_workers = int(os.getenv("PLAN_MAX_WORKERS", "8"))
+        
+        # Exchange rates for normalized prices and budgets across currencies
+        self.fx_currency = os.getenv("FX_CURRENCY", "USD").upper()
+        self.fx_base_currency = os.getenv("FX_BASE_CURRENCY", "EUR").upper()
+        self.fx_api_base_url = os.getenv("FX_API_BASE_URL", "https://api.frankfurter.dev/v1")
+        self.fx_refresh_interval = float(os.getenv("FX_REFRESH_INTERVAL", "21600"))
+        self.fx_rates_path = os.getenv(
+            "FX_RATES_PATH",
+            os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "fx_rates.json")
+        )
+        
+        # Conversation context budget
+        self.context_max_tokens = int(os.getenv("CONTEXT_MAX_TOKENS", "32000"))
+        self.context_keep_turns = int(os.getenv("CONTEXT_KEEP_TURNS", "3"))
+        
+        # Offer registry used to price bookings
+        self.offer_registry_ttl = float(os.getenv("OFFER_REGISTRY_TTL", "1800"))
+        self.offer_registry_max_entries = int(os.getenv("OFFER_REGISTRY_MAX_ENTRIES", "5000"))
+        self.flight_price_confirm_max_age = float(os.getenv("FLIGHT_PRICE_CONFIRM_MAX_AGE", "300"))
+        
+        # Simulated booking ledger and inventory
+        self.booking_ledger_path = os.getenv(
+            "BOOKING_LEDGER_PATH",
+            os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "bookings.sqlite3")
+        )
+        self.booking_default_rooms = int(os.getenv("BOOKING_DEFAULT_ROOMS", "10"))
+        self.booking_confirm_prices = os.getenv("BOOKING_CONFIRM_PRICES", "true").lower() in ("1", "true", "yes")
+        
+        # JSON codec for upstream responses (auto, msgspec, orjson or stdlib)
+        self.json_codec = os.getenv("JSON_CODEC", "auto").lower()
+        # Bytes read at a time from responses decoded as they arrive
+        self.stream_chunk_size = int(os.getenv("STREAM_CHUNK_SIZE", "65536"))
+        
+        # Record/replay of upstream responses (off, record, replay or auto)
+        self.cassette_mode = os.getenv("CASSETTE_MODE", "off").lower()
+        self.cassette_dir = os.getenv(
+            "CASSETTE_DIR",
+            os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "cassettes")
+        )
+        
+        # Tracing (disabled unless a trace file is given)
+        self.trace_file = os.getenv("TRACE_FILE") or None
         
         # Validate required settings
         self._validate_settings()
@@ -33,10 +88,30 @@ class Settings:
             raise ValueError(f"Missing required environment variables: {', '.join(missing_settings)}")
 
 _settings = None
+_settings_lock = threading.Lock()
+_env_loaded = False
+
+def load_environment():
+    """
+    Load the .env file into os.environ once per process.
+
+    Called on first use rather than at import, so modules that only
+    import this package pay nothing for it.
+    """
+    global _env_loaded
+    if not _env_loaded:
+        with _settings_lock:
+            if not _env_loaded:
+                from dotenv import load_dotenv
+                load_dotenv()
+                _env_loaded = True
 
 def get_settings():
     """Get the singleton settings instance."""
     global _settings
     if _settings is None:
-        _settings = Settings()
+        load_environment()
+        with _settings_lock:
+            if _settings is None:
+                _settings = Settings()
     return _settings 
\ No newline at end of file
@@ -0,0 +1,249 @@
+import json
+import logging
+import threading
+import uuid
+from collections import OrderedDict, deque
+from typing import Any, Dict, List, Optional, Tuple
+from google.genai import types
+
+logger = logging.getLogger('travel_agent')
+
+# Rough characters-per-token ratio used to estimate prompt size without a tokenizer
+CHARS_PER_TOKEN = 4
+MAX_STORED_OUTPUTS = 512
+TRIMMED_TEXT_CHARS = 400
+
+# Keyed by (session ID, handle) so a handle only resolves in the session that produced it
+_outputs: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+_outputs_lock = threading.Lock()
+
+
+def store_tool_output(session_id: str, name: str, response: Dict[str, Any], call_id: Optional[str] = None) -> str:
+    """
+    Keep a full tool output in memory and return a handle to it.
+
+    The prompt is rebuilt from the session before every model call, so the
+    same output is compacted again each time; keying the handle on the
+    function call ID keeps it stable across calls.
+    """
+    handle = f"ctx-{call_id}" if call_id else f"ctx-{uuid.uuid4().hex[:12]}"
+    key = (session_id, handle)
+    with _outputs_lock:
+        if key in _outputs:
+            _outputs.move_to_end(key)
+            return handle
+        _outputs[key] = {"tool": name, "response": response}
+        while len(_outputs) > MAX_STORED_OUTPUTS:
+            _outputs.popitem(last=False)
+    return handle
+
+
+def get_tool_output(session_id: str, handle: str) -> Optional[Dict[str, Any]]:
+    """Return a tool output stored by store_tool_output for the same session, if still held."""
+    with _outputs_lock:
+        return _outputs.get((session_id, handle))
+
+
+def summarize_tool_output(name: str, response: Dict[str, Any]) -> str:
+    """Build a one-line summary of a tool output for compacted context."""
+    if not isinstance(response, dict):
+        return f"{name} returned {type(response).__name__}"
+    if "error" in response:
+        return f"{name} failed: {response['error']}"
+
+    if "flight_offers" in response:
+        offers = response["flight_offers"] or []
+        prices = _prices(offers)
+        carriers = sorted({
+            segment.get("carrier", {}).get("code")
+            for offer in offers for segment in offer.get("segments", [])
+            if segment.get("carrier", {}).get("code")
+        })
+        text = f"{len(offers)} flight offers"
+        if prices:
+            text += f", {min(prices):.2f}-{max(prices):.2f} {_currency(offers)}"
+        if carriers:
+            text += f", carriers {', '.join(carriers[:8])}"
+        return text
+
+    if "hotels" in response:
+        hotels = response["hotels"] or []
+        ratings = sorted({str(h.get("rating")) for h in hotels if h.get("rating")})
+        text = f"{len(hotels)} hotels"
+        if ratings:
+            text += f", ratings {', '.join(ratings)}"
+        return text
+
+    if "location" in response and "forecast" in response:
+        location = response.get("location") or {}
+        forecast = response.get("forecast")
+        days = len(forecast) if isinstance(forecast, list) else 1
+        return f"weather for {location.get('name')}, {location.get('country')} ({days} day(s))"
+
+    parts = []
+    for key, value in response.items():
+        if isinstance(value, list):
+            parts.append(f"{key}: {len(value)} items")
+        elif isinstance(value, dict):
+            parts.append(f"{key}: {len(value)} fields")
+        else:
+            parts.append(f"{key}: {str(value)[:60]}")
+    return f"{name} returned " + "; ".join(parts[:6])
+
+
+def _prices(offers: List[Dict[str, Any]]) -> List[float]:
+    prices = []
+    for offer in offers:
+        try:
+            prices.append(float(offer.get("price", {}).get("total")))
+        except (TypeError, ValueError):
+            continue
+    return prices
+
+
+def _currency(offers: List[Dict[str, Any]]) -> str:
+    for offer in offers:
+        currency = offer.get("price", {}).get("currency")
+        if currency:
+            return currency
+    return ""
+
+
+class ContextBudget:
+    """
+    Keeps an agent's prompt within a token budget.
+
+    Installed as a before_model_callback. Before every model call it
+    estimates the prompt size and, if it is over max_tokens, rewrites the
+    request (never the stored session):
+
+    1. Tool outputs older than the last keep_recent_turns user turns are
+       replaced with a one-line summary and a handle that
+       recall_tool_output can expand again.
+    2. If that is not enough, older model and user text is trimmed.
+    3. As a last resort the oldest turns are dropped.
+
+    The prompt size of every model call is logged at debug level and kept in a short
+    history for reporting.
+    """
+
+    def __init__(self, max_tokens: int = 32000, keep_recent_turns: int = 3, history_size: int = 100):
+        self.max_tokens = max_tokens
+        self.keep_recent_turns = keep_recent_turns
+        self.history = deque(maxlen=history_size)
+
+    def before_model_callback(self, callback_context, llm_request) -> None:
+        contents = llm_request.contents
+        before = self.estimate_tokens(contents)
+        compacted = trimmed = dropped = 0
+
+        if before > self.max_tokens:
+            boundary = self._recent_boundary(contents)
+            compacted = self._compact_tool_outputs(contents, boundary, callback_context.session.id)
+            if self.estimate_tokens(contents) > self.max_tokens:
+                trimmed = self._trim_text(contents, boundary)
+            if self.estimate_tokens(contents) > self.max_tokens:
+                dropped = self._drop_oldest(contents, boundary)
+
+        after = self.estimate_tokens(contents)
+        report = {
+            "agent": callback_context.agent_name,
+            "invocation_id": callback_context.invocation_id,
+            "prompt_tokens": after,
+            "tokens_before_compaction": before,
+            "contents": len(contents),
+            "compacted_tool_outputs": compacted,
+            "trimmed_messages": trimmed,
+            "dropped_messages": dropped
+        }
+        self.history.append(report)
+        logger.debug(
+            "Prompt size for %s: ~%s tokens "
+            "(before compaction ~%s, budget %s, "
+            "%s tool outputs compacted, %s trimmed, %s dropped)",
+            report['agent'], after, before, self.max_tokens, compacted, trimmed, dropped
+        )
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the most recent prompt size reports."""
+        return {"max_tokens": self.max_tokens, "turns": list(self.history)}
+
+    @staticmethod
+    def estimate_tokens(contents: List[types.Content]) -> int:
+        """Estimate the token count of a list of contents."""
+        chars = 0
+        for content in contents:
+            for part in content.parts or []:
+                if part.text:
+                    chars += len(part.text)
+                if part.function_call:
+                    chars += len(part.function_call.name or "") + len(json.dumps(part.function_call.args or {}, default=str))
+                if part.function_response:
+                    chars += len(json.dumps(part.function_response.response or {}, default=str))
+        return chars // CHARS_PER_TOKEN
+
+    def _recent_boundary(self, contents: List[types.Content]) -> int:
+        """Index of the first content that belongs to the turns kept verbatim."""
+        turn_starts = [
+            i for i, content in enumerate(contents)
+            if content.role == "user" and any(part.text for part in content.parts or [])
+        ]
+        if len(turn_starts) <= self.keep_recent_turns:
+            return 0
+        return turn_starts[-self.keep_recent_turns]
+
+    def _compact_tool_outputs(self, contents: List[types.Content], boundary: int, session_id: str) -> int:
+        compacted = 0
+        for i in range(boundary):
+            content = contents[i]
+            if not any(part.function_response for part in content.parts or []):
+                continue
+            parts = []
+            for part in content.parts:
+                response = part.function_response
+                if response is None or (response.response or {}).get("compacted"):
+                    parts.append(part)
+                    continue
+                handle = store_tool_output(session_id, response.name, response.response or {}, response.id)
+                parts.append(types.Part(function_response=types.FunctionResponse(
+                    id=response.id,
+                    name=response.name,
+                    response={
+                        "compacted": True,
+                        "summary": summarize_tool_output(response.name, response.response or {}),
+                        "handle": handle
+                    }
+                )))
+                compacted += 1
+            # Replace rather than mutate: the originals are shared with the session history
+            contents[i] = types.Content(role=content.role, parts=parts)
+        return compacted
+
+    def _trim_text(self, contents: List[types.Content], boundary: int) -> int:
+        trimmed = 0
+        for i in range(boundary):
+            content = contents[i]
+            if not any(part.text and len(part.text) > TRIMMED_TEXT_CHARS for part in content.parts or []):
+                continue
+            parts = []
+            for part in content.parts:
+                if part.text and len(part.text) > TRIMMED_TEXT_CHARS:
+                    part = types.Part(text=part.text[:TRIMMED_TEXT_CHARS] + " …[trimmed]")
+                    trimmed += 1
+                parts.append(part)
+            contents[i] = types.Content(role=content.role, parts=parts)
+        return trimmed
+
+    def _drop_oldest(self, contents: List[types.Content], boundary: int) -> int:
+        dropped = 0
+        while boundary > 0 and self.estimate_tokens(contents) > self.max_tokens:
+            del contents[0]
+            boundary -= 1
+            dropped += 1
+        # A function response must follow its call, so never start on an orphaned one
+        while contents and boundary > 0 and any(part.function_response for part in contents[0].parts or []):
+            del contents[0]
+            boundary -= 1
+            dropped += 1
+        return dropped
@@ -0,0 +1,40 @@
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .tracing import get_tracer, span, traced, current_span, ModelCallSpans
+    from .metrics import get_metrics, record_upstream_request, record_cache_lookup
+
+# Exported name -> submodule defining it; imported on first attribute access
+_EXPORTS = {
+    'get_tracer': '.tracing',
+    'span': '.tracing',
+    'traced': '.tracing',
+    'current_span': '.tracing',
+    'ModelCallSpans': '.tracing',
+    'get_metrics': '.metrics',
+    'record_upstream_request': '.metrics',
+    'record_cache_lookup': '.metrics'
+}
+
+__all__ = [
+    'get_tracer',
+    'span',
+    'traced',
+    'current_span',
+    'ModelCallSpans',
+    'get_metrics',
+    'record_upstream_request',
+    'record_cache_lookup'
+]
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
\ No newline at end of file
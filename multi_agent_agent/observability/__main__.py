@@ -0,0 +1,3 @@
+from .tracing import main
+
+main()
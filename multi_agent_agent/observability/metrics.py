@@ -0,0 +1,227 @@
+"""
+In-process metrics for upstream calls and caches.
+
+Counters and histograms are keyed by a metric name plus a set of labels
+(client class, endpoint, ...). Everything is exported either as a
+Prometheus text page or as JSON with estimated percentiles.
+"""
+import bisect
+import re
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds and size buckets in bytes
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+_ID_SEGMENT = re.compile(r"^(?=.*\d)[A-Za-z0-9_-]{8,}$")
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def endpoint_label(endpoint: str) -> str:
+    """Collapse ID-like path segments so per-offer URLs share one label."""
+    return "/".join(
+        "{id}" if _ID_SEGMENT.match(segment) and not re.match(r"^v\d+$", segment) else segment
+        for segment in endpoint.split("/")
+    )
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+class Counter:
+    """A monotonically increasing count per label set."""
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> List[Tuple[LabelKey, float]]:
+        with self._lock:
+            return list(self._values.items())
+
+
+class Histogram:
+    """Bucketed observations per label set, with sum and count."""
+
+    def __init__(self, name: str, description: str, buckets: Sequence[float]):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(buckets)
+        # Per label set: [count per bucket (+Inf last)], sum, count, max
+        self._values: Dict[LabelKey, List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0, value]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+            entry[3] = max(entry[3], value)
+
+    def samples(self) -> List[Tuple[LabelKey, List[int], float, int, float]]:
+        with self._lock:
+            return [
+                (key, list(counts), total, count, maximum)
+                for key, (counts, total, count, maximum) in self._values.items()
+            ]
+
+    def quantile(self, q: float, counts: List[int], count: int, maximum: float) -> Optional[float]:
+        """Estimate a quantile by linear interpolation inside its bucket, capped at the largest observation."""
+        if count == 0:
+            return None
+        return min(self._interpolate(q, counts, count), maximum)
+
+    def _interpolate(self, q: float, counts: List[int], count: int) -> float:
+        rank = q * count
+        seen = 0
+        lower = 0.0
+        for i, bucket_count in enumerate(counts):
+            upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+            if seen + bucket_count >= rank and bucket_count:
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+            lower = upper
+        return self.buckets[-1]
+
+
+class MetricsRegistry:
+    """Holds every counter and histogram of the process."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, description: str) -> Counter:
+        return self._get_or_create(name, lambda: Counter(name, description))
+
+    def histogram(self, name: str, description: str, buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._get_or_create(name, lambda: Histogram(name, description, buckets))
+
+    def _get_or_create(self, name: str, factory):
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    metric = self._metrics[name] = factory()
+        return metric
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            if isinstance(metric, Counter):
+                lines.append(f"# TYPE {metric.name} counter")
+                for key, value in metric.samples():
+                    lines.append(f"{metric.name}{_format_labels(key)} {_format_value(value)}")
+                continue
+            lines.append(f"# TYPE {metric.name} histogram")
+            for key, counts, total, count, _ in metric.samples():
+                cumulative = 0
+                for bound, bucket_count in zip(list(metric.buckets) + ["+Inf"], counts):
+                    cumulative += bucket_count
+                    le = bound if bound == "+Inf" else _format_value(bound)
+                    lines.append(f"{metric.name}_bucket{_format_labels(key, le=le)} {cumulative}")
+                lines.append(f"{metric.name}_sum{_format_labels(key)} {_format_value(total)}")
+                lines.append(f"{metric.name}_count{_format_labels(key)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def to_json(self) -> Dict[str, Any]:
+        """Return all metrics as a dictionary, with max and p50/p95/p99 estimates for histograms."""
+        result: Dict[str, Any] = {}
+        for metric in list(self._metrics.values()):
+            if isinstance(metric, Counter):
+                result[metric.name] = [
+                    {"labels": dict(key), "value": value} for key, value in metric.samples()
+                ]
+                continue
+            result[metric.name] = [
+                {
+                    "labels": dict(key),
+                    "count": count,
+                    "sum": total,
+                    "max": maximum,
+                    "p50": metric.quantile(0.5, counts, count, maximum),
+                    "p95": metric.quantile(0.95, counts, count, maximum),
+                    "p99": metric.quantile(0.99, counts, count, maximum)
+                }
+                for key, counts, total, count, maximum in metric.samples()
+            ]
+        return result
+
+
+def _format_labels(key: LabelKey, **extra: str) -> str:
+    pairs = list(key) + list(extra.items())
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_metrics() -> MetricsRegistry:
+    """Get the singleton metrics registry."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = MetricsRegistry()
+    return _registry
+
+
+def record_upstream_request(
+    client: str,
+    method: str,
+    endpoint: str,
+    status: Optional[int],
+    seconds: float,
+    response_bytes: Optional[int] = None,
+    decode_seconds: Optional[float] = None
+) -> None:
+    """Record one HTTP call made by an API client."""
+    metrics = get_metrics()
+    labels = {"client": client, "endpoint": endpoint_label(endpoint), "method": method}
+    status_class = f"{status // 100}xx" if status else "error"
+    metrics.counter(
+        "upstream_requests_total", "Upstream HTTP requests by status class"
+    ).inc(status_class=status_class, **labels)
+    metrics.histogram(
+        "upstream_request_duration_seconds", "Upstream HTTP request latency"
+    ).observe(seconds, **labels)
+    if response_bytes is not None:
+        metrics.histogram(
+            "upstream_response_bytes", "Upstream HTTP response body size", SIZE_BUCKETS
+        ).observe(response_bytes, **labels)
+    if decode_seconds is not None:
+        metrics.histogram(
+            "upstream_json_decode_seconds", "Time spent decoding upstream JSON responses"
+        ).observe(decode_seconds, **labels)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    """Count a cache hit or miss."""
+    get_metrics().counter(
+        "cache_lookups_total", "Cache lookups by cache and result"
+    ).inc(cache=cache, result="hit" if hit else "miss")
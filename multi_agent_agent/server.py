@@ -0,0 +1,375 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Tuple
+from .config.settings import load_environment
+from .observability.metrics import get_metrics
+
+logger = logging.getLogger('travel_agent')
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 64 * 1024
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    429: "Too Many Requests",
+    500: "Internal Server Error"
+}
+
+
+class HTTPError(Exception):
+    """Error that maps directly onto an HTTP error response."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class StubAgent:
+    """
+    Stand-in agent for load testing the server without LLM or API calls.
+
+    Each turn sleeps for a configurable time split across a few tool
+    progress events and streamed tokens, so the server sees the same
+    event shape and timing as a real multi-agent turn.
+    """
+
+    def __init__(self, latency: float = 1.0, tokens: int = 20):
+        self.latency = latency
+        self.tokens = tokens
+
+    async def astream(self, user_input: str, session_id: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        steps = ["Searching flights...", "Searching hotels...", "Checking weather..."]
+        step_delay = self.latency / 2 / len(steps)
+        for i, step in enumerate(steps, 1):
+            await asyncio.sleep(step_delay)
+            yield {"type": "progress", "text": step, "data": {"done": i, "total": len(steps)}}
+
+        token_delay = self.latency / 2 / max(self.tokens, 1)
+        words = []
+        for i in range(self.tokens):
+            await asyncio.sleep(token_delay)
+            word = f"token{i} "
+            words.append(word)
+            yield {"type": "token", "author": "stub", "text": word}
+        yield {
+            "type": "final",
+            "author": "stub",
+            "text": "".join(words),
+            "streamed": True,
+            "usage": {"total_tokens": self.tokens}
+        }
+
+
+def request_session_id(headers: Dict[str, str], payload: Any) -> Optional[str]:
+    """
+    The session a chat request continues: the X-Session-ID header, else the
+    body's session_id. The pre-fork dispatcher routes on the same rule.
+    """
+    session_id = headers.get("x-session-id")
+    if session_id:
+        return session_id
+    session_id = payload.get("session_id") if isinstance(payload, dict) else None
+    return session_id if isinstance(session_id, str) and session_id else None
+
+
+class AgentServer:
+    """
+    Multi-session HTTP server for streaming agent turns.
+
+    Turns run concurrently on one event loop. At most max_concurrency turns
+    run at once; up to max_queue more wait for a slot, and anything beyond
+    that (or anything that waits longer than queue_timeout) is rejected
+    with 429 so clients can back off.
+
+    An optional limiter (see workers.SharedLimiter) adds a rate limit and
+    LLM token budget shared with other worker processes, and
+    new_session_id replaces the uuid4 given to requests without a session
+    (pre-forked workers issue IDs that route back to themselves).
+
+    Endpoints:
+        POST /chat    {"message": ..., "session_id": ...} -> NDJSON event stream
+        GET  /health  Server load counters
+        GET  /metrics Upstream and cache metrics (Prometheus text; /metrics.json for JSON)
+    """
+
+    def __init__(
+        self,
+        agent,
+        max_concurrency: int = 16,
+        max_queue: int = 64,
+        queue_timeout: float = 30.0,
+        limiter=None,
+        new_session_id: Optional[Callable[[], str]] = None
+    ):
+        self.agent = agent
+        self.limiter = limiter
+        self.new_session_id = new_session_id or (lambda: uuid.uuid4().hex)
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._active = 0
+        self._queued = 0
+        self._stats = {"accepted": 0, "rejected": 0, "completed": 0, "failed": 0}
+
+    def stats(self) -> Dict[str, Any]:
+        """Return current load and request counters."""
+        stats = {
+            "pid": os.getpid(),
+            "active": self._active,
+            "queued": self._queued,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            **self._stats
+        }
+        if self.limiter is not None:
+            stats["limiter"] = self.limiter.stats()
+        return stats
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080, sock=None) -> asyncio.AbstractServer:
+        """Start listening, either on host/port or on an already bound socket."""
+        if sock is not None:
+            server = await asyncio.start_server(self.handle_connection, sock=sock)
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port)
+        addresses = ", ".join(str(s.getsockname()) for s in server.sockets)
+        logger.info("Agent server listening on %s (concurrency=%s, queue=%s)", addresses, self.max_concurrency, self.max_queue)
+        return server
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve a single request on a connection, then close it."""
+        try:
+            method, path, headers, body = await self._read_request(reader)
+            if path == "/health":
+                if method != "GET":
+                    raise HTTPError(405, "Use GET")
+                await self._send_json(writer, 200, self.stats())
+            elif path in ("/metrics", "/metrics.json"):
+                if method != "GET":
+                    raise HTTPError(405, "Use GET")
+                if path == "/metrics.json":
+                    await self._send_json(writer, 200, get_metrics().to_json())
+                else:
+                    await self._send_text(writer, 200, get_metrics().render_prometheus(), PROMETHEUS_CONTENT_TYPE)
+            elif path == "/chat":
+                if method != "POST":
+                    raise HTTPError(405, "Use POST")
+                await self._handle_chat(writer, headers, body)
+            else:
+                raise HTTPError(404, f"Unknown path: {path}")
+        except HTTPError as e:
+            await self._send_json(writer, e.status, {"error": e.message})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            logger.debug("Client disconnected")
+        except Exception as e:
+            logger.error("Unhandled server error: %s", e, exc_info=True)
+            try:
+                await self._send_json(writer, 500, {"error": "Internal server error"})
+            except ConnectionError:
+                pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _handle_chat(self, writer: asyncio.StreamWriter, headers: Dict[str, str], body: bytes) -> None:
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "Body must be JSON")
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "Body must be a JSON object")
+        message = payload.get("message")
+        if not isinstance(message, str) or not message.strip():
+            raise HTTPError(400, "Field 'message' is required")
+        session_id = request_session_id(headers, payload) or self.new_session_id()
+
+        if self.limiter is not None and not self.limiter.try_acquire():
+            self._stats["rejected"] += 1
+            await self._send_json(writer, 429, {"error": "Rate limit or token budget exceeded"}, {"Retry-After": "1"})
+            return
+
+        if not await self._acquire_slot():
+            self._stats["rejected"] += 1
+            await self._send_json(writer, 429, {"error": "Server is busy, retry later"}, {"Retry-After": "1"})
+            return
+
+        self._stats["accepted"] += 1
+        started = time.perf_counter()
+        try:
+            await self._send_head(writer, 200, {
+                "Content-Type": "application/x-ndjson",
+                "Transfer-Encoding": "chunked",
+                "X-Session-ID": session_id
+            })
+            try:
+                async for event in self.agent.astream(message, session_id=session_id):
+                    if event["type"] == "final" and self.limiter is not None:
+                        self.limiter.record_tokens(event.get("usage", {}).get("total_tokens", 0))
+                    await self._send_chunk(writer, json.dumps(event).encode() + b"\n")
+                self._stats["completed"] += 1
+            except ConnectionError:
+                raise
+            except Exception as e:
+                self._stats["failed"] += 1
+                logger.error("Agent turn failed for session %s: %s", session_id, e, exc_info=True)
+                await self._send_chunk(writer, json.dumps({"type": "error", "text": str(e)}).encode() + b"\n")
+            await self._send_chunk(writer, b"")
+        finally:
+            self._active -= 1
+            self._slots.release()
+            elapsed = time.perf_counter() - started
+            get_metrics().histogram("agent_turn_duration_seconds", "End-to-end agent turn latency").observe(elapsed)
+            logger.info("Session %s turn finished in %.2fs", session_id, elapsed)
+
+    async def _acquire_slot(self) -> bool:
+        """Take a turn slot, waiting in the bounded queue if necessary."""
+        if self._slots.locked():
+            if self._queued >= self.max_queue:
+                return False
+            self._queued += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                return False
+            finally:
+                self._queued -= 1
+        else:
+            await self._slots.acquire()
+        self._active += 1
+        return True
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Tuple[str, str, Dict[str, str], bytes]:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.LimitOverrunError:
+            raise HTTPError(413, "Headers too large")
+        if len(head) > MAX_HEADER_BYTES:
+            raise HTTPError(413, "Headers too large")
+
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, _ = lines[0].split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length", "0") or 0)
+        except ValueError:
+            raise HTTPError(400, "Malformed Content-Length")
+        if length < 0:
+            raise HTTPError(400, "Malformed Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, "Body too large")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target.split("?", 1)[0], headers, body
+
+    async def _send_head(self, writer: asyncio.StreamWriter, status: int, headers: Dict[str, str]) -> None:
+        lines = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        lines.append("Connection: close")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        await writer.drain()
+
+    async def _send_chunk(self, writer: asyncio.StreamWriter, data: bytes) -> None:
+        writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        await writer.drain()
+
+    async def _send_text(self, writer: asyncio.StreamWriter, status: int, text: str, content_type: str) -> None:
+        body = text.encode()
+        await self._send_head(writer, status, {
+            "Content-Type": content_type,
+            "Content-Length": str(len(body))
+        })
+        writer.write(body)
+        await writer.drain()
+
+    async def _send_json(self, writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload).encode()
+        await self._send_head(writer, status, {
+            "Content-Type": "application/json",
+            "Content-Length": str(len(body)),
+            **(headers or {})
+        })
+        writer.write(body)
+        await writer.drain()
+
+
+def build_agent(stub: bool = False, stub_latency: float = 1.0):
+    """Return the agent to serve: the real root agent or a load-test stub."""
+    if stub:
+        # The real agent module sets up logging on import; the stub has to do it here
+        from .config.logging_config import setup_logging
+        setup_logging()
+        return StubAgent(latency=stub_latency)
+    from .agent import get_root_agent
+    return get_root_agent()
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    load_environment()
+    parser = argparse.ArgumentParser(description="Serve the travel agent over HTTP")
+    parser.add_argument("--host", default=os.getenv("AGENT_SERVER_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("AGENT_SERVER_PORT", "8080")))
+    parser.add_argument("--max-concurrency", type=int, default=int(os.getenv("AGENT_SERVER_MAX_CONCURRENCY", "16")),
+                        help="agent turns allowed to run at once")
+    parser.add_argument("--max-queue", type=int, default=int(os.getenv("AGENT_SERVER_MAX_QUEUE", "64")),
+                        help="turns allowed to wait for a slot before returning 429")
+    parser.add_argument("--queue-timeout", type=float, default=30.0,
+                        help="seconds a queued turn waits before returning 429")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("AGENT_SERVER_WORKERS", "1")),
+                        help="pre-forked worker processes; sessions stick to one worker")
+    parser.add_argument("--rate-limit", type=float, default=0.0,
+                        help="agent turns per second across all workers (0 = unlimited)")
+    parser.add_argument("--token-budget", type=int, default=0,
+                        help="LLM tokens per minute across all workers (0 = unlimited)")
+    parser.add_argument("--stub", action="store_true", help="serve a stub agent for load testing")
+    parser.add_argument("--stub-latency", type=float, default=1.0, help="seconds per stub turn")
+    return parser.parse_args(argv)
+
+
+async def serve(args: argparse.Namespace) -> None:
+    agent = build_agent(args.stub, args.stub_latency)
+    limiter = None
+    if args.rate_limit or args.token_budget:
+        from .workers import SharedLimiter
+        limiter = SharedLimiter(args.rate_limit, token_budget=args.token_budget)
+    server = AgentServer(agent, args.max_concurrency, args.max_queue, args.queue_timeout, limiter=limiter)
+    listener = await server.start(args.host, args.port)
+    async with listener:
+        await listener.serve_forever()
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.workers > 1:
+        from .workers import run_prefork
+        run_prefork(args)
+        return
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        logger.info("Agent server shutting down")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,34 @@
 import requests
+import json
 import logging
-from typing import Dict, Any
+import time
+from typing import Dict, Any, Iterator, Optional
 from abc import ABC, abstractmethod
 from ..config import get_settings
+from ..observability.tracing import get_tracer, span
+from ..observability.metrics import record_cache_lookup, record_upstream_request
+from .cassette import get_cassette
+from .codec import CodecError, get_codec
+from .search_cache import get_response_cache
 
 logger = logging.getLogger('travel_agent')
 
+_SECRET_FIELDS = {"authorization", "client_secret", "key"}
+
+
+def _redact(values: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Mask credentials before a request is logged."""
+    if not isinstance(values, dict):
+        return values
+    return {k: "***" if str(k).lower() in _SECRET_FIELDS else v for k, v in values.items()}
+
 class BaseAPIClient(ABC):
     """Base class for all API clients."""
     
     def __init__(self):
         self.settings = get_settings()
         self._service_name = self.__class__.__name__
-        logger.debug(f"Initialized {self._service_name}")
+        logger.debug("Initialized %s", self._service_name)
     
     @property
     @abstractmethod
@@ -27,7 +43,9 @@ class BaseAPIClient(ABC):
         params: Dict[str, Any] = None,
         headers: Dict[str, str] = None,
         data: Dict[str, Any] = None,
-        is_form_data: bool = False
+        is_form_data: bool = False,
+        schema: Optional[Any] = None,
+        cache: bool = False
     ) -> Dict[str, Any]:
         """
         Make an HTTP request to the API.
@@ -39,52 +57,223 @@ class BaseAPIClient(ABC):
             headers: Request headers
             data: Request body data
             is_form_data: Whether to send data as form-encoded (default: False)
+            schema: Optional TypedDict from services.schemas naming the fields the caller reads
+            cache: Reuse the response from the upstream cache (see
+                search_cache.get_response_cache). Only for GET searches whose
+                results are the same for every user; never for offers or
+                prices that get booked
             
         Returns:
-            API response as dictionary
+            API response as dictionary; cached responses are shared and must
+            not be modified
         """
+        response_cache = get_response_cache() if cache and method.upper() == "GET" and not data else None
+        if response_cache is None:
+            return self._send_request(method, endpoint, params, headers, data, is_form_data, schema)
+        
+        # Credentials are left out of the key: the same query shares one entry whatever the token
+        key = " ".join([
+            self._service_name,
+            endpoint,
+            json.dumps(_redact(params) or {}, sort_keys=True, default=str),
+            getattr(schema, "__name__", "")
+        ])
+        fetched = False
+        
+        def fetch() -> Dict[str, Any]:
+            nonlocal fetched
+            fetched = True
+            return self._send_request(method, endpoint, params, headers, data, is_form_data, schema)
+        
+        payload = response_cache.get_or_compute(key, fetch)
+        record_cache_lookup("upstream", hit=not fetched)
+        return payload
+    
+    def _send_request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Dict[str, Any] = None,
+        headers: Dict[str, str] = None,
+        data: Dict[str, Any] = None,
+        is_form_data: bool = False,
+        schema: Optional[Any] = None
+    ) -> Dict[str, Any]:
+        """Send a request and decode the response (_make_request without the cache)."""
         url = f"{self.base_url}{endpoint}"
         
-        # Log request details
+        # Log request details (credentials masked)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "%s Request - Method: %s, Endpoint: %s"
+                "\nParams: %s"
+                "\nHeaders: %s"
+                "\nData: %s"
+                "\nForm Data: %s",
+                self._service_name, method, endpoint,
+                _redact(params), _redact(headers), _redact(data), is_form_data
+            )
+        
+        with span(
+            "http.request",
+            client=self._service_name,
+            method=method,
+            endpoint=endpoint
+        ) as request_span:
+            started = time.perf_counter()
+            status = response_bytes = decode_seconds = None
+            try:
+                kwargs = {
+                    "params": params or {},
+                    "headers": headers or {}
+                }
+            
+                if data:
+                    if is_form_data:
+                        kwargs["data"] = data
+                    else:
+                        kwargs["json"] = data
+            
+                cassette = get_cassette()
+                if cassette is None:
+                    response = requests.request(method=method, url=url, **kwargs)
+                else:
+                    response = cassette.request(self._service_name, method, url, endpoint, **kwargs)
+                status = response.status_code
+                response_bytes = len(response.content)
+                request_span.set(
+                    status=status,
+                    http_ms=round((time.perf_counter() - started) * 1000, 3),
+                    request_bytes=len(response.request.body or b"") if response.request is not None else None,
+                    response_bytes=response_bytes
+                )
+            
+                # Log response status
+                logger.debug(
+                    "%s Response - Status: %s"
+                    "\nURL: %s",
+                    self._service_name, response.status_code, response.url
+                )
+            
+                # Log error details if any
+                if not response.ok:
+                    logger.error(
+                        "%s Error - Status: %s"
+                        "\nResponse: %s",
+                        self._service_name, response.status_code, response.text
+                    )
+            
+                response.raise_for_status()
+                codec = get_codec()
+                decode_started = time.perf_counter()
+                payload = codec.decode(response.content, schema)
+                decode_seconds = time.perf_counter() - decode_started
+                request_span.set(json_decode_ms=round(decode_seconds * 1000, 3), codec=codec.name)
+                return payload
+            
+            except (requests.exceptions.RequestException, CodecError) as e:
+                error_msg = f"{self._service_name} API request failed: {str(e)}"
+                logger.error(error_msg, exc_info=True)
+                raise Exception(error_msg)
+            finally:
+                record_upstream_request(
+                    self._service_name,
+                    method,
+                    endpoint,
+                    status,
+                    time.perf_counter() - started,
+                    response_bytes=response_bytes,
+                    decode_seconds=decode_seconds
+                )
+
+    def _stream_request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Dict[str, Any] = None,
+        headers: Dict[str, str] = None,
+        data: Dict[str, Any] = None,
+        chunk_size: Optional[int] = None
+    ) -> Iterator[bytes]:
+        """
+        Make an HTTP request and yield the response body in chunks as it arrives.
+
+        For large responses decoded incrementally (see json_stream). The
+        request is sent on the first next(); the connection is released once
+        the body is read or the generator is closed. The http.request span
+        covers the whole body but is not made current, since the caller's
+        code runs between chunks.
+
+        Args:
+            method: HTTP method
+            endpoint: API endpoint path
+            params: Query parameters
+            headers: Request headers
+            data: JSON request body
+            chunk_size: Bytes per chunk (default: settings.stream_chunk_size)
+
+        Returns:
+            Iterator over the raw response body
+        """
+        url = f"{self.base_url}{endpoint}"
         logger.debug(
-            f"{self._service_name} Request - Method: {method}, Endpoint: {endpoint}"
-            f"\nParams: {params}"
-            f"\nHeaders: {headers}"
-            f"\nData: {data}"
-            f"\nForm Data: {is_form_data}"
+            "%s Streaming Request - Method: %s, Endpoint: %s\nParams: %s\nData: %s",
+            self._service_name, method, endpoint, _redact(params), _redact(data)
         )
-        
+
+        request_span = get_tracer().start_span(
+            "http.request",
+            client=self._service_name,
+            method=method,
+            endpoint=endpoint,
+            streamed=True
+        )
+        started = time.perf_counter()
+        status = response = None
+        response_bytes = 0
         try:
             kwargs = {
                 "params": params or {},
-                "headers": headers or {}
+                "headers": headers or {},
+                "stream": True
             }
-            
             if data:
-                if is_form_data:
-                    kwargs["data"] = data
-                else:
-                    kwargs["json"] = data
-            
-            response = requests.request(method=method, url=url, **kwargs)
-            
-            # Log response status
-            logger.debug(
-                f"{self._service_name} Response - Status: {response.status_code}"
-                f"\nURL: {response.url}"
-            )
-            
-            # Log error details if any
+                kwargs["json"] = data
+            cassette = get_cassette()
+            if cassette is None:
+                response = requests.request(method=method, url=url, **kwargs)
+            else:
+                response = cassette.request(self._service_name, method, url, endpoint, **kwargs)
+            status = response.status_code
+            request_span.set(status=status, http_ms=round((time.perf_counter() - started) * 1000, 3))
+            logger.debug("%s Response - Status: %s\nURL: %s", self._service_name, status, response.url)
+
             if not response.ok:
-                logger.error(
-                    f"{self._service_name} Error - Status: {response.status_code}"
-                    f"\nResponse: {response.text}"
-                )
-            
+                logger.error("%s Error - Status: %s\nResponse: %s", self._service_name, status, response.text)
             response.raise_for_status()
-            return response.json()
-            
+
+            for chunk in response.iter_content(chunk_size or self.settings.stream_chunk_size):
+                response_bytes += len(chunk)
+                yield chunk
+
         except requests.exceptions.RequestException as e:
+            request_span.record_error(e)
             error_msg = f"{self._service_name} API request failed: {str(e)}"
             logger.error(error_msg, exc_info=True)
-            raise Exception(error_msg) 
\ No newline at end of file
+            raise Exception(error_msg)
+        except GeneratorExit:
+            request_span.set(closed_early=True)
+            raise
+        finally:
+            if response is not None:
+                response.close()
+            request_span.set(response_bytes=response_bytes)
+            request_span.finish()
+            record_upstream_request(
+                self._service_name,
+                method,
+                endpoint,
+                status,
+                time.perf_counter() - started,
+                response_bytes=response_bytes
+            )
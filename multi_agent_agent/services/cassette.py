@@ -0,0 +1,183 @@
+"""
+Record/replay of upstream HTTP responses.
+
+With CASSETTE_MODE=record every response an API client receives is saved
+under CASSETTE_DIR; with CASSETTE_MODE=replay the same requests are served
+from disk without touching the network, so benchmarks and load tests are
+deterministic and cost no API quota. CASSETTE_MODE=auto replays what is
+recorded and records the rest.
+
+Requests are matched on client, method, endpoint, query parameters and
+body, with credentials left out so a cassette recorded with one key
+replays with any other. Tokens in recorded responses (the OAuth token
+exchange) are replaced with a fixed placeholder, which replays as the
+token, and the client ID it echoes is masked. Identical requests seen several times while recording are
+replayed in the same order.
+"""
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+import requests
+from requests.structures import CaseInsensitiveDict
+from ..config import get_settings
+
+logger = logging.getLogger('travel_agent')
+
+MODES = ("off", "record", "replay", "auto")
+
+# Left out of the match key and never written to disk
+_SECRET_FIELDS = {"authorization", "client_id", "client_secret", "key"}
+# Request headers that change the meaning of a request
+_MATCHED_HEADERS = {"x-http-method-override"}
+# Response fields replaced before a response is written
+REPLAYED_TOKEN = "cassette-token"
+_RESPONSE_SECRETS = {
+    "access_token": REPLAYED_TOKEN,
+    "refresh_token": REPLAYED_TOKEN,
+    "id_token": REPLAYED_TOKEN,
+    "client_id": "***"
+}
+
+
+class CassetteMiss(requests.exceptions.RequestException):
+    """Raised in replay mode for a request that was never recorded."""
+
+
+def _scrub(values: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    return {k: v for k, v in (values or {}).items() if str(k).lower() not in _SECRET_FIELDS}
+
+
+def _scrub_tokens(body: str) -> str:
+    """Replace tokens and client IDs in a JSON response body."""
+    if not any(field in body for field in _RESPONSE_SECRETS):
+        return body
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return body
+    if not isinstance(payload, dict):
+        return body
+    return json.dumps({k: _RESPONSE_SECRETS.get(k, v) for k, v in payload.items()})
+
+
+class Cassette:
+    """Stores and replays responses, one JSON file per distinct request."""
+
+    def __init__(self, directory: str, mode: str):
+        if mode not in MODES:
+            raise ValueError(f"Invalid cassette mode {mode!r}, expected one of {', '.join(MODES)}")
+        self.directory = directory
+        self.mode = mode
+        # Per request key: responses replayed so far, or recorded in this process
+        self._positions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def request(self, client: str, method: str, url: str, endpoint: str, **kwargs: Any) -> requests.Response:
+        """
+        Serve a request from the cassette or send it and record the response.
+
+        Args:
+            client: Name of the API client class, used as a subdirectory
+            method: HTTP method
+            url: Full request URL
+            endpoint: Endpoint path, part of the match key
+            **kwargs: Arguments for requests.request (params, headers, json, data)
+
+        Returns:
+            A requests.Response, replayed or live
+        """
+        request = self._describe(method, endpoint, kwargs)
+        key = hashlib.sha256(json.dumps(request, sort_keys=True, default=str).encode()).hexdigest()[:32]
+        path = os.path.join(self.directory, client, f"{key}.json")
+
+        if self.mode in ("replay", "auto"):
+            interactions = self._load(path)
+            if interactions:
+                with self._lock:
+                    position = self._positions.get(key, 0)
+                    self._positions[key] = position + 1
+                # Once the recorded sequence is used up, keep serving its last response
+                return self._to_response(interactions[min(position, len(interactions) - 1)], url, kwargs.get("params"))
+            if self.mode == "replay":
+                raise CassetteMiss(f"No recorded response for {method} {endpoint} (cassette {path})")
+
+        response = requests.request(method=method, url=url, **kwargs)
+        self._record(path, key, request, response)
+        return response
+
+    def _describe(self, method: str, endpoint: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        headers = {
+            k.lower(): v for k, v in (kwargs.get("headers") or {}).items()
+            if k.lower() in _MATCHED_HEADERS
+        }
+        return {
+            "method": method.upper(),
+            "endpoint": endpoint,
+            "params": _scrub(kwargs.get("params")),
+            "headers": headers,
+            "body": kwargs["json"] if "json" in kwargs else _scrub(kwargs.get("data"))
+        }
+
+    def _load(self, path: str) -> List[Dict[str, Any]]:
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)["interactions"]
+        except FileNotFoundError:
+            return []
+
+    def _record(self, path: str, key: str, request: Dict[str, Any], response: requests.Response) -> None:
+        interaction = {
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": {"Content-Type": response.headers.get("Content-Type", "application/json")},
+            "body": _scrub_tokens(response.text),
+            "recorded_at": time.time()
+        }
+        with self._lock:
+            # The first recording of a key in this process replaces older runs
+            interactions = self._load(path) if key in self._positions else []
+            interactions.append(interaction)
+            self._positions[key] = len(interactions)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"request": request, "interactions": interactions}, f, indent=1)
+            os.replace(tmp_path, path)
+        logger.debug("Recorded %s %s to %s", request["method"], request["endpoint"], path)
+
+    def _to_response(self, interaction: Dict[str, Any], url: str, params: Optional[Dict[str, Any]]) -> requests.Response:
+        prepared = requests.models.PreparedRequest()
+        prepared.prepare_url(url, params)
+        response = requests.Response()
+        response.status_code = interaction["status"]
+        response.reason = interaction.get("reason")
+        response.headers = CaseInsensitiveDict(interaction.get("headers", {}))
+        response._content = interaction["body"].encode("utf-8")
+        # As if already read, so iter_content() serves the body and close() works for streamed requests
+        response._content_consumed = True
+        response.raw = io.BytesIO(response._content)
+        response.encoding = "utf-8"
+        response.url = prepared.url
+        return response
+
+
+_cassette = None
+_cassette_lock = threading.Lock()
+
+def get_cassette() -> Optional[Cassette]:
+    """Get the singleton cassette, or None when CASSETTE_MODE is off."""
+    global _cassette
+    settings = get_settings()
+    if settings.cassette_mode == "off":
+        return None
+    if _cassette is None:
+        with _cassette_lock:
+            if _cassette is None:
+                _cassette = Cassette(settings.cassette_dir, settings.cassette_mode)
+                logger.info("Cassette %s mode, directory %s", settings.cassette_mode, settings.cassette_dir)
+    return _cassette
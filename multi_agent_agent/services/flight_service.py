@@ -1,14 +1,63 @@
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Iterator, Optional, Tuple, Union
+import hashlib
 import logging
+import time
+from contextlib import closing
 from datetime import datetime, timedelta
+from itertools import islice
 from .amadeus_client import AmadeusClient
+from .fx_rates import get_fx_rates
+from .json_stream import iter_members
+from .offer_registry import get_offer_registry
+from .search_cache import get_response_cache
+from ..observability.metrics import record_cache_lookup
+from ..observability.tracing import traced
 
 logger = logging.getLogger('travel_agent')
 
+TRAVEL_CLASSES = ("ECONOMY", "PREMIUM_ECONOMY", "BUSINESS", "FIRST")
+
+
+def _offer_key(offer: Dict[str, Any]) -> str:
+    """
+    Registry key and flight ID of a raw flight offer.
+
+    Amadeus numbers offers 1, 2, ... within each response, so its IDs
+    repeat across searches; the key is a digest of the flights, fares and
+    price instead, which stays the same only for the same offer.
+    """
+    parts = [str((offer.get("price") or {}).get("total")), str((offer.get("price") or {}).get("currency"))]
+    for itinerary in offer.get("itineraries", []):
+        for segment in itinerary.get("segments", []):
+            parts.append("{}{} {} {}".format(
+                segment.get("carrierCode"), segment.get("number"),
+                (segment.get("departure") or {}).get("iataCode"), (segment.get("departure") or {}).get("at")
+            ))
+        parts.append("|")
+    for pricing in offer.get("travelerPricings", []):
+        parts.append(str(pricing.get("travelerType")))
+        parts.extend(
+            "{}{}".format(fare.get("fareBasis"), fare.get("class"))
+            for fare in pricing.get("fareDetailsBySegment", [])
+        )
+    return hashlib.blake2b(" ".join(parts).encode(), digest_size=8).hexdigest()
+
+
 class FlightService(AmadeusClient):
     """Service for flight-related operations."""
     
-    def search_flights(self, origin: str, destination: str, date: str, adults: int = 1) -> List[Dict[str, Any]]:
+    # Flight offers the pricing endpoint accepts in one request
+    PRICING_BATCH_SIZE = 6
+    
+    @traced()
+    def search_flights(
+        self,
+        origin: str,
+        destination: str,
+        date: str,
+        adults: int = 1,
+        max_results: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
         """
         Search for flight offers for a specific date.
         
@@ -17,77 +66,422 @@ class FlightService(AmadeusClient):
             destination: Destination airport IATA code
             date: Departure date in YYYY-MM-DD format
             adults: Number of adult passengers
+            max_results: Keep only the first offers (Amadeus returns the cheapest first)
             
         Returns:
-            List of simplified flight offers
+            List of simplified flight offers, each with its price also in
+            FX_CURRENCY (normalized_price, see fx_rates). Offers are shared
+            through the upstream cache for UPSTREAM_CACHE_TTL seconds, so
+            repeated searches (such as a plan after a destination
+            comparison) reuse them; they must not be modified.
+        """
+        def search() -> List[Dict[str, Any]]:
+            with closing(self.iter_flight_offers(origin, destination, date, adults)) as offers:
+                results = list(islice(offers, max_results))
+            get_fx_rates().normalize(results)
+            return results
+
+        try:
+            results = self._cached_search(f"FlightService search {origin} {destination} {date} {adults} {max_results}", search)
+            logger.info("Found %s flight offers", len(results))
+            return list(results)
+        except Exception as e:
+            logger.error("Failed to search flights: %s", e, exc_info=True)
+            raise
+
+    @staticmethod
+    def _cached_search(key: str, search) -> List[Dict[str, Any]]:
+        """Offers of a search from the upstream cache, searching again once any has left the offer registry."""
+        cache = get_response_cache()
+        if cache is None:
+            return search()
+        cached = cache.get(key)
+        if cached is not None:
+            registry = get_offer_registry()
+            if all(registry.get("flight", offer["id"]) is not None for offer in cached):
+                record_cache_lookup("upstream", hit=True)
+                return cached
+            # Offers that can no longer be booked are searched again
+            results = search()
+            cache.put(key, results)
+            record_cache_lookup("upstream", hit=False)
+            return results
+        fetched = False
+
+        def fetch() -> List[Dict[str, Any]]:
+            nonlocal fetched
+            fetched = True
+            return search()
+
+        results = cache.get_or_compute(key, fetch)
+        record_cache_lookup("upstream", hit=not fetched)
+        return results
+    
+    def iter_flight_offers(self, origin: str, destination: str, date: str, adults: int = 1) -> Iterator[Dict[str, Any]]:
+        """
+        Search for flight offers, yielding each simplified offer as soon as it is read.
+
+        The response is decoded incrementally (see json_stream), so memory
+        holds one offer of the body at a time and a caller that needs only
+        the first few can stop early by closing the generator. Each yielded
+        offer is registered for pricing and booking.
+
+        Carrier and aircraft names come from the response dictionaries. When
+        these precede the offers, names are filled in at once; when they come
+        last (as Amadeus sends them), already yielded offers are updated in
+        place at the end of the body. A caller that stops early still gets
+        the names: the rest of the body is then read for them, skipping the
+        remaining offers.
+
+        Args:
+            origin: Origin airport IATA code
+            destination: Destination airport IATA code
+            date: Departure date in YYYY-MM-DD format
+            adults: Number of adult passengers
+
+        Returns:
+            Iterator over simplified flight offers
         """
-        logger.info(f"Searching flights from {origin} to {destination} on {date}")
+        logger.info("Searching flights from %s to %s on %s", origin, destination, date)
         params = {
             "originLocationCode": origin,
             "destinationLocationCode": destination,
             "departureDate": date,
             "adults": adults
         }
-        
+        yield from self._iter_offers(self._stream_request("GET", "/v2/shopping/flight-offers", params))
+
+    @traced()
+    def search_flight_offers(
+        self,
+        origin_destinations: List[Dict[str, str]],
+        adults: int = 1,
+        travel_class: Optional[str] = None,
+        nonstop: bool = False,
+        max_price: Optional[float] = None,
+        currency: Optional[str] = None,
+        max_results: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Search round-trip and multi-city flight offers with one POST request.
+
+        Every origin-destination is priced together, so a round trip comes
+        back as round-trip fares rather than two one-way searches. Cabin,
+        non-stop, price and result-count criteria are applied upstream, which
+        keeps the response small. Each offer's segments carry the index of the
+        origin-destination they fly when there is more than one.
+
+        Args:
+            origin_destinations: Flights in travel order, each {"origin", "destination", "date"}
+                                 (IATA codes, date in YYYY-MM-DD format)
+            adults: Number of adult passengers
+            travel_class: ECONOMY, PREMIUM_ECONOMY, BUSINESS or FIRST for all flights
+            nonstop: Only offers without connections
+            max_price: Maximum price per traveler
+            currency: Currency code for prices (default: the Amadeus default, EUR)
+            max_results: Number of offers requested (default: settings.flight_search_max_results)
+
+        Returns:
+            List of simplified flight offers, cheapest first, with normalized_price
+
+        Raises:
+            ValueError: For no origin-destinations or an unknown travel class
+        """
+        if not origin_destinations:
+            raise ValueError("At least one origin-destination is required")
+        if travel_class is not None and travel_class.upper() not in TRAVEL_CLASSES:
+            raise ValueError(f"Unknown travel class {travel_class!r}, expected one of {list(TRAVEL_CLASSES)}")
+        logger.info(
+            "Searching flights %s",
+            ", ".join(f"{od['origin']}-{od['destination']} on {od['date']}" for od in origin_destinations)
+        )
+        body = self._search_body(origin_destinations, adults, travel_class, nonstop, max_price, currency, max_results)
         try:
-            response = self._make_request("GET", "/v2/shopping/flight-offers", params)
-            offers = self._parse_flight_offers(response)
-            logger.info(f"Found {len(offers)} flight offers")
-            return offers
+            stream = self._stream_request(
+                "POST", "/v2/shopping/flight-offers", data=body, headers={"X-HTTP-Method-Override": "GET"}
+            )
+            with closing(self._iter_offers(stream)) as offers:
+                results = list(offers)
+            get_fx_rates().normalize(results)
+            logger.info("Found %s flight offers", len(results))
+            return results
         except Exception as e:
-            logger.error(f"Failed to search flights: {str(e)}", exc_info=True)
+            logger.error("Failed to search flights: %s", e, exc_info=True)
             raise
+
+    def _search_body(
+        self,
+        origin_destinations: List[Dict[str, str]],
+        adults: int,
+        travel_class: Optional[str],
+        nonstop: bool,
+        max_price: Optional[float],
+        currency: Optional[str],
+        max_results: Optional[int]
+    ) -> Dict[str, Any]:
+        """The flight-offers search request body for the given criteria."""
+        ids = [str(i + 1) for i in range(len(origin_destinations))]
+        flight_filters: Dict[str, Any] = {}
+        if travel_class:
+            flight_filters["cabinRestrictions"] = [
+                {"cabin": travel_class.upper(), "coverage": "MOST_SEGMENTS", "originDestinationIds": ids}
+            ]
+        if nonstop:
+            flight_filters["connectionRestriction"] = {"maxNumberOfConnections": 0}
+        criteria: Dict[str, Any] = {"maxFlightOffers": max_results or self.settings.flight_search_max_results}
+        if max_price is not None:
+            # Amadeus takes a whole amount per traveler
+            criteria["maxPrice"] = max(int(max_price), 1)
+        if flight_filters:
+            criteria["flightFilters"] = flight_filters
+        body: Dict[str, Any] = {
+            "originDestinations": [
+                {
+                    "id": od_id,
+                    "originLocationCode": od["origin"],
+                    "destinationLocationCode": od["destination"],
+                    "departureDateTimeRange": {"date": od["date"]}
+                }
+                for od_id, od in zip(ids, origin_destinations)
+            ],
+            "travelers": [{"id": str(i + 1), "travelerType": "ADULT"} for i in range(adults)],
+            "sources": ["GDS"],
+            "searchCriteria": criteria
+        }
+        if currency:
+            body["currencyCode"] = currency.upper()
+        return body
+
+    def _iter_offers(self, stream: Iterator[bytes]) -> Iterator[Dict[str, Any]]:
+        """Decode a flight offers response body as it arrives; see iter_flight_offers."""
+        registry = get_offer_registry()
+        members = iter_members(stream, stream=("data",))
+        dictionaries = None
+        # Segments yielded before the dictionaries were read
+        unnamed: List[Dict[str, Any]] = []
+        try:
+            for key, value in members:
+                if key == "dictionaries":
+                    dictionaries = value if isinstance(value, dict) else {}
+                    self._name_segments(unnamed, dictionaries)
+                    unnamed = []
+                elif key == "data" and isinstance(value, dict):
+                    offer = self._simplify_offer(value, dictionaries or {})
+                    self._register_offer(registry, offer["id"], value)
+                    if dictionaries is None:
+                        unnamed.extend(offer["segments"])
+                    yield offer
+        except GeneratorExit:
+            if unnamed:
+                self._finish_naming(members, unnamed)
+            raise
+        finally:
+            members.close()
+    
+    def _finish_naming(self, members: Iterator[Tuple[str, Any]], unnamed: List[Dict[str, Any]]) -> None:
+        """Read the rest of a closed stream for the dictionaries, skipping the remaining offers."""
+        try:
+            for key, value in members:
+                if key == "dictionaries" and isinstance(value, dict):
+                    self._name_segments(unnamed, value)
+                    return
+        except Exception as e:
+            logger.warning("Could not read carrier and aircraft names after stopping early: %s", e)
     
+    @staticmethod
+    def _name_segments(segments: List[Dict[str, Any]], dictionaries: Dict[str, Any]) -> None:
+        """Fill in carrier and aircraft names of simplified segments."""
+        carriers = dictionaries.get("carriers", {})
+        aircrafts = dictionaries.get("aircraft", {})
+        for segment in segments:
+            segment["carrier"]["name"] = carriers.get(segment["carrier"]["code"])
+            segment["aircraft"]["name"] = aircrafts.get(segment["aircraft"]["code"])
+    
+    @traced()
     def _parse_flight_offers(self, response: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Parse and simplify flight offers response."""
+        """Parse and simplify a fully decoded flight offers response."""
         offers = []
-        carriers = response.get("dictionaries", {}).get("carriers", {})
-        aircrafts = response.get("dictionaries", {}).get("aircraft", {})
-        currencies = response.get("dictionaries", {}).get("currencies", {})
+        registry = get_offer_registry()
+        dictionaries = response.get("dictionaries", {})
 
         for offer in response.get("data", []):
-            simplified_offer = {
-                "id": offer.get("id"),
-                "price": {
-                    "total": offer.get("price", {}).get("total"),
-                    "currency": offer.get("price", {}).get("currency")
-                },
-                "seats_available": offer.get("numberOfBookableSeats"),
-                "last_ticketing_date": offer.get("lastTicketingDate")
-            }
-            
-            # Process segments
-            segments = []
-            for itinerary in offer.get("itineraries", []):
-                for segment in itinerary.get("segments", []):
-                    carrier_code = segment.get("carrierCode")
-                    aircraft_code = segment.get("aircraft", {}).get("code")
-                    
-                    segments.append({
-                        "departure": {
-                            "airport": segment.get("departure", {}).get("iataCode"),
-                            "terminal": segment.get("departure", {}).get("terminal"),
-                            "time": segment.get("departure", {}).get("at")
-                        },
-                        "arrival": {
-                            "airport": segment.get("arrival", {}).get("iataCode"),
-                            "terminal": segment.get("arrival", {}).get("terminal"),
-                            "time": segment.get("arrival", {}).get("at")
-                        },
-                        "carrier": {
-                            "code": carrier_code,
-                            "name": carriers.get(carrier_code)
-                        },
-                        "flight_number": segment.get("number"),
-                        "aircraft": {
-                            "code": aircraft_code,
-                            "name": aircrafts.get(aircraft_code)
-                        },
-                        "duration": segment.get("duration"),
-                        "stops": segment.get("numberOfStops", 0)
-                    })
-            
-            simplified_offer["segments"] = segments
-            offers.append(simplified_offer)
+            offers.append(self._simplify_offer(offer, dictionaries))
+            self._register_offer(registry, offers[-1]["id"], offer)
         
-        return offers 
\ No newline at end of file
+        return offers
+    
+    @staticmethod
+    def _simplify_offer(offer: Dict[str, Any], dictionaries: Dict[str, Any]) -> Dict[str, Any]:
+        """Simplify one flight offer, naming carriers and aircraft from the response dictionaries."""
+        carriers = dictionaries.get("carriers", {})
+        aircrafts = dictionaries.get("aircraft", {})
+        simplified_offer = {
+            "id": _offer_key(offer),
+            "price": {
+                "total": offer.get("price", {}).get("total"),
+                "currency": offer.get("price", {}).get("currency")
+            },
+            "seats_available": offer.get("numberOfBookableSeats"),
+            "last_ticketing_date": offer.get("lastTicketingDate")
+        }
+        
+        # Process segments
+        segments = []
+        itineraries = offer.get("itineraries", [])
+        for index, itinerary in enumerate(itineraries):
+            for segment in itinerary.get("segments", []):
+                carrier_code = segment.get("carrierCode")
+                aircraft_code = segment.get("aircraft", {}).get("code")
+                
+                segments.append({
+                    "departure": {
+                        "airport": segment.get("departure", {}).get("iataCode"),
+                        "terminal": segment.get("departure", {}).get("terminal"),
+                        "time": segment.get("departure", {}).get("at")
+                    },
+                    "arrival": {
+                        "airport": segment.get("arrival", {}).get("iataCode"),
+                        "terminal": segment.get("arrival", {}).get("terminal"),
+                        "time": segment.get("arrival", {}).get("at")
+                    },
+                    "carrier": {
+                        "code": carrier_code,
+                        "name": carriers.get(carrier_code)
+                    },
+                    "flight_number": segment.get("number"),
+                    "aircraft": {
+                        "code": aircraft_code,
+                        "name": aircrafts.get(aircraft_code)
+                    },
+                    "duration": segment.get("duration"),
+                    "stops": segment.get("numberOfStops", 0)
+                })
+                if len(itineraries) > 1:
+                    segments[-1]["itinerary"] = index
+        
+        simplified_offer["segments"] = segments
+        return simplified_offer
+    
+    @traced()
+    def confirm_prices(self, offer_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Confirm the current price of previously searched flight offers.
+
+        Offers are sent to the Amadeus pricing endpoint several at a time
+        (grouped by traveler count, up to PRICING_BATCH_SIZE per request).
+        If a batch is rejected, its offers are retried one by one so a single
+        stale offer does not fail the others. Confirmed prices replace the
+        cached ones in the offer registry; offers confirmed less than
+        flight_price_confirm_max_age seconds ago are not sent again.
+
+        Args:
+            offer_ids: Flight offer IDs returned by search_flights
+
+        Returns:
+            Dictionary mapping each offer ID to its confirmation result
+        """
+        registry = get_offer_registry()
+        results: Dict[str, Dict[str, Any]] = {}
+        groups: Dict[int, List[Dict[str, Any]]] = {}
+        now = time.time()
+
+        for offer_id in dict.fromkeys(str(i) for i in offer_ids):
+            record = registry.get("flight", offer_id)
+            if record is None or not record.get("raw"):
+                results[offer_id] = {"confirmed": False, "error": "Unknown or expired offer; search flights again"}
+                continue
+            if record.get("confirmed_at") and now - record["confirmed_at"] < self.settings.flight_price_confirm_max_age:
+                results[offer_id] = self._confirmation(record, record["price"])
+                continue
+            groups.setdefault(record["travelers"], []).append({**record, "key": offer_id})
+
+        for records in groups.values():
+            for start in range(0, len(records), self.PRICING_BATCH_SIZE):
+                batch = records[start:start + self.PRICING_BATCH_SIZE]
+                try:
+                    results.update(self._price_batch(registry, batch))
+                except Exception as e:
+                    if len(batch) == 1:
+                        results[batch[0]["key"]] = {"confirmed": False, "error": str(e)}
+                        continue
+                    logger.warning("Pricing batch of %s offers failed, retrying individually: %s", len(batch), e)
+                    for record in batch:
+                        try:
+                            results.update(self._price_batch(registry, [record]))
+                        except Exception as single_error:
+                            results[record["key"]] = {"confirmed": False, "error": str(single_error)}
+
+        logger.info(
+            "Confirmed prices for %s/%s flight offers",
+            sum(1 for r in results.values() if r.get("confirmed")), len(results)
+        )
+        return results
+
+    @traced()
+    def _price_batch(self, registry, records: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Price one batch of offers with a single pricing request."""
+        # Offers from different searches can share an Amadeus ID, so they
+        # are renumbered for the request and matched back by position
+        response = self._make_request(
+            "POST",
+            "/v1/shopping/flight-offers/pricing",
+            data={
+                "data": {
+                    "type": "flight-offers-pricing",
+                    "flightOffers": [{**record["raw"], "id": str(i + 1)} for i, record in enumerate(records)]
+                }
+            },
+            headers={"X-HTTP-Method-Override": "GET"}
+        )
+        priced = {
+            str(offer.get("id")): offer
+            for offer in response.get("data", {}).get("flightOffers", [])
+        }
+
+        results = {}
+        for i, record in enumerate(records):
+            offer_id = record["key"]
+            offer = priced.get(str(i + 1))
+            if offer is None:
+                results[offer_id] = {"confirmed": False, "unavailable": True, "error": "Offer is no longer available"}
+                continue
+            if offer.get("numberOfBookableSeats") is None:
+                offer = {**offer, "numberOfBookableSeats": record.get("seats_available")}
+            updated = self._register_offer(registry, offer_id, offer, confirmed=True)
+            if updated is None:
+                results[offer_id] = {"confirmed": False, "error": "Pricing response had no usable price"}
+                continue
+            results[offer_id] = self._confirmation(updated, record["price"])
+        return results
+
+    @staticmethod
+    def _confirmation(record: Dict[str, Any], previous_price: float) -> Dict[str, Any]:
+        return {
+            "confirmed": True,
+            "price": record["price"],
+            "price_per_traveler": record["price_per_traveler"],
+            "currency": record["currency"],
+            "previous_price": previous_price,
+            "price_changed": abs(record["price"] - previous_price) >= 0.005
+        }
+
+    def _register_offer(self, registry, offer_id: str, offer: Dict[str, Any], confirmed: bool = False) -> Optional[Dict[str, Any]]:
+        """Record the bookable price of an offer under its flight ID so bookings can use it."""
+        try:
+            total = float(offer.get("price", {}).get("total"))
+        except (TypeError, ValueError):
+            return None
+        travelers = len(offer.get("travelerPricings", [])) or 1
+        record = {
+            "price": total,
+            "price_per_traveler": round(total / travelers, 2),
+            "travelers": travelers,
+            "currency": offer.get("price", {}).get("currency"),
+            "seats_available": offer.get("numberOfBookableSeats"),
+            "last_ticketing_date": offer.get("lastTicketingDate"),
+            "confirmed_at": time.time() if confirmed else None,
+            # The full offer is what the pricing endpoint expects back
+            "raw": offer
+        }
+        registry.register("flight", offer_id, record, expires_on=offer.get("lastTicketingDate"))
+        return record
\ No newline at end of file
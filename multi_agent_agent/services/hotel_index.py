@@ -0,0 +1,214 @@
+"""
+Compact columnar index over a list of simplified hotels.
+
+Amenities become one integer bitmask per hotel; star ratings, chains and
+cities become small integers. For each amenity, rating, chain and city
+the index also keeps an inverted bitset of the hotels that have it (bit i
+is hotel i), so a query such as "pool AND spa AND rating >= 4 in PAR" is
+a handful of AND/OR operations on Python ints, not a scan comparing
+strings. Only the distance limit is checked per candidate.
+
+Indexes are immutable once built; get_hotel_index caches them per stored
+working-set result so follow-up queries reuse the same one.
+"""
+import logging
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+from ..config import get_settings
+from .hotel_service import HotelAmenities
+
+logger = logging.getLogger('travel_agent')
+
+# Fixed bits for the amenities Amadeus documents; other strings get the next free bits per index
+AMENITY_BITS: Dict[str, int] = {amenity.value.upper(): 1 << i for i, amenity in enumerate(HotelAmenities)}
+AMENITY_BITS.update({amenity.name: AMENITY_BITS[amenity.value.upper()] for amenity in HotelAmenities})
+
+
+def _positions(bits: int) -> List[int]:
+    """Indexes of the set bits, lowest first."""
+    text = bin(bits)[:1:-1]
+    positions = []
+    position = text.find("1")
+    while position != -1:
+        positions.append(position)
+        position = text.find("1", position + 1)
+    return positions
+
+
+def _bitset(positions: List[int], size: int) -> int:
+    """An int with the given bits set, built in one pass rather than one OR per bit."""
+    if not positions:
+        return 0
+    digits = bytearray(b"0" * size)
+    for position in positions:
+        digits[size - 1 - position] = 0x31  # "1"
+    return int(digits, 2)
+
+
+def _rating(value: Any) -> int:
+    try:
+        rating = int(float(value))
+    except (TypeError, ValueError):
+        return 0
+    return rating if 1 <= rating <= 5 else 0
+
+
+class HotelIndex:
+    """Bitmask and inverted-index view of a list of simplified hotels (see module docstring)."""
+
+    def __init__(self, hotels: List[Dict[str, Any]]):
+        self.size = len(hotels)
+        self.amenity_bits = dict(AMENITY_BITS)
+        self._next_amenity_bit = 1 << len(HotelAmenities)
+        self.chain_ids: Dict[str, int] = {}
+        self.city_ids: Dict[str, int] = {}
+
+        # Columns: per hotel, amenity mask, rating (0 = unknown), chain and city ids (0 = none), distance
+        self.amenities: List[int] = []
+        self.ratings = array("B")
+        self.chains = array("H")
+        self.cities = array("H")
+        self.distances = array("d")
+
+        # Inverted indexes: value -> bitset of hotel positions
+        postings: Dict[Any, List[int]] = {}
+        for position, hotel in enumerate(hotels):
+            self._add(position, hotel, postings)
+        bitsets = {key: _bitset(positions, self.size) for key, positions in postings.items()}
+        self._by_amenity = {bit: bits for (kind, bit), bits in bitsets.items() if kind == "amenity"}
+        self._by_rating = [bitsets.get(("rating", rating), 0) for rating in range(6)]
+        self._by_chain = {chain: bits for (kind, chain), bits in bitsets.items() if kind == "chain"}
+        self._by_city = {city: bits for (kind, city), bits in bitsets.items() if kind == "city"}
+        self._all = (1 << self.size) - 1
+
+    def _add(self, position: int, hotel: Dict[str, Any], postings: Dict[Any, List[int]]) -> None:
+        mask = 0
+        for amenity in hotel.get("amenities") or []:
+            key = str(amenity).upper()
+            amenity_bit = self.amenity_bits.get(key)
+            if amenity_bit is None:
+                amenity_bit = self.amenity_bits[key] = self._next_amenity_bit
+                self._next_amenity_bit <<= 1
+            mask |= amenity_bit
+        self.amenities.append(mask)
+        while mask:
+            amenity_bit = mask & -mask
+            postings.setdefault(("amenity", amenity_bit), []).append(position)
+            mask ^= amenity_bit
+
+        rating = _rating(hotel.get("rating"))
+        self.ratings.append(rating)
+        postings.setdefault(("rating", rating), []).append(position)
+
+        chain = self._intern(self.chain_ids, hotel.get("chainCode"))
+        self.chains.append(chain)
+        if chain:
+            postings.setdefault(("chain", chain), []).append(position)
+
+        city = self._intern(self.city_ids, hotel.get("iataCode"))
+        self.cities.append(city)
+        if city:
+            postings.setdefault(("city", city), []).append(position)
+
+        try:
+            self.distances.append(float((hotel.get("distance") or {}).get("value")))
+        except (TypeError, ValueError):
+            self.distances.append(float("nan"))
+
+    @staticmethod
+    def _intern(ids: Dict[str, int], value: Any) -> int:
+        if not value:
+            return 0
+        key = str(value).upper()
+        if key not in ids:
+            ids[key] = len(ids) + 1
+        return ids[key]
+
+    def _any_of(self, postings: Dict[int, int], ids: Dict[str, int], values: Iterable[str]) -> int:
+        bits = 0
+        for value in values:
+            bits |= postings.get(ids.get(str(value).upper(), 0), 0)
+        return bits
+
+    def select(
+        self,
+        amenities: Optional[Iterable[str]] = None,
+        min_rating: Optional[float] = None,
+        chain_codes: Optional[Iterable[str]] = None,
+        city_codes: Optional[Iterable[str]] = None,
+        max_distance: Optional[float] = None
+    ) -> List[int]:
+        """
+        Positions of the hotels matching every given filter, in list order.
+
+        Args:
+            amenities: Amenities every hotel must have (enum names or Amadeus values)
+            min_rating: Minimum star rating; hotels without a rating never match
+            chain_codes: Allowed 2-letter chain codes
+            city_codes: Allowed IATA city codes
+            max_distance: Maximum distance from the city centre; hotels without one never match
+
+        Returns:
+            List of positions in the indexed hotel list
+        """
+        bits = self._all
+        for amenity in amenities or []:
+            bits &= self.hotels_with(amenity)
+        if min_rating is not None:
+            wanted = 0
+            for rating in range(1, 6):
+                if rating >= min_rating:
+                    wanted |= self._by_rating[rating]
+            bits &= wanted
+        if chain_codes:
+            bits &= self._any_of(self._by_chain, self.chain_ids, chain_codes)
+        if city_codes:
+            bits &= self._any_of(self._by_city, self.city_ids, city_codes)
+
+        positions = _positions(bits)
+        if max_distance is not None:
+            distances = self.distances
+            # NaN (unknown distance) compares False
+            positions = [p for p in positions if distances[p] <= max_distance]
+        return positions
+
+    def hotels_with(self, amenity: str) -> int:
+        """Bitset of the hotels listing an amenity (enum name or Amadeus value)."""
+        amenity_bit = self.amenity_bits.get(str(amenity).upper())
+        return self._by_amenity.get(amenity_bit, 0) if amenity_bit else 0
+
+    def has_amenity_data(self) -> bool:
+        """Whether any hotel lists amenities (Amadeus leaves them out unless filtered on)."""
+        return bool(self._by_amenity)
+
+
+_indexes: "OrderedDict[str, HotelIndex]" = OrderedDict()
+_indexes_lock = threading.Lock()
+
+def get_hotel_index(key: Optional[str], hotels: List[Dict[str, Any]]) -> HotelIndex:
+    """
+    Get the cached index for a stored hotel list, building it on first use.
+
+    Args:
+        key: Identifier of the stored list (None disables caching)
+        hotels: The stored hotels, used when the index is not cached
+
+    Returns:
+        HotelIndex over `hotels`
+    """
+    if key is not None:
+        with _indexes_lock:
+            index = _indexes.get(key)
+            if index is not None and index.size == len(hotels):
+                _indexes.move_to_end(key)
+                return index
+    index = HotelIndex(hotels)
+    logger.debug("Built hotel index over %s hotels (%s amenities)", index.size, index._next_amenity_bit.bit_length() - 1)
+    if key is not None:
+        with _indexes_lock:
+            _indexes[key] = index
+            while len(_indexes) > get_settings().hotel_index_max_entries:
+                _indexes.popitem(last=False)
+    return index
@@ -0,0 +1,231 @@
+"""
+Weighted hotel scoring with NumPy.
+
+Every hotel gets a score between 0 and 1, the weighted mean of four
+components that are each between 0 and 1:
+
+- distance: 1 / (1 + distance / half_distance), so a hotel half_distance
+  away from the centre (in the search's unit) scores 0.5
+- rating: (stars - 1) / 4
+- amenities: the share of the wanted amenities the hotel lists
+- price: per night, 1 for the cheapest priced hotel down to 0 for the dearest
+
+A component a hotel has no data for (no rating, distance or price)
+scores 0 for that hotel. A component no hotel can be scored on (no
+amenities asked for, no prices known) is left out, and the remaining
+weights are rescaled to sum to 1.
+
+Columns are read straight from a HotelIndex (see hotel_index), so ranking
+the cached hotels of a search is a few array operations and one partial
+sort, not a pass over dicts.
+"""
+import logging
+from typing import Any, Dict, List, Optional
+import numpy as np
+from .hotel_index import HotelIndex
+
+logger = logging.getLogger('travel_agent')
+
+DEFAULT_WEIGHTS = {"distance": 0.35, "rating": 0.3, "amenities": 0.2, "price": 0.15}
+
+
+def _bool_column(bits: int, size: int) -> np.ndarray:
+    """Unpack a bitset (bit i = hotel i) into a boolean array."""
+    data = np.frombuffer(bits.to_bytes((size + 7) // 8, "little"), dtype=np.uint8)
+    return np.unpackbits(data, count=size, bitorder="little").view(bool)
+
+
+class HotelScorer:
+    """Ranks indexed hotels on distance, rating, amenity match and price per night."""
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, half_distance: float = 2.0):
+        """
+        Args:
+            weights: Weight per component (distance, rating, amenities, price);
+                     missing ones take DEFAULT_WEIGHTS, 0 turns a component off
+            half_distance: Distance from the centre that halves the distance score
+
+        Raises:
+            ValueError: For an unknown component, a negative weight or a non-positive half_distance
+        """
+        weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        unknown = set(weights) - set(DEFAULT_WEIGHTS)
+        if unknown:
+            raise ValueError(f"Unknown score components {sorted(unknown)}, expected {sorted(DEFAULT_WEIGHTS)}")
+        if any(weight < 0 for weight in weights.values()):
+            raise ValueError("Score weights cannot be negative")
+        if half_distance <= 0:
+            raise ValueError("half_distance must be positive")
+        self.weights = weights
+        self.half_distance = half_distance
+
+    def score(
+        self,
+        index: HotelIndex,
+        amenities: Optional[List[str]] = None,
+        prices: Optional[np.ndarray] = None
+    ) -> Dict[str, Any]:
+        """
+        Score every hotel of an index.
+
+        Args:
+            index: HotelIndex over the hotels
+            amenities: Amenities the traveller wants
+            prices: Price per night per hotel, in index order (NaN when unknown)
+
+        Returns:
+            Dictionary with total (array of scores), components (name -> array
+            of unweighted scores) and weights (the rescaled weights used)
+        """
+        size = index.size
+        components: Dict[str, np.ndarray] = {}
+
+        distance = np.frombuffer(index.distances, dtype=np.float64) if size else np.zeros(0)
+        with np.errstate(invalid="ignore"):
+            components["distance"] = np.nan_to_num(1.0 / (1.0 + np.maximum(distance, 0.0) / self.half_distance))
+
+        ratings = np.frombuffer(index.ratings, dtype=np.uint8) if size else np.zeros(0, dtype=np.uint8)
+        components["rating"] = np.where(ratings > 0, (ratings.astype(np.float64) - 1.0) / 4.0, 0.0)
+
+        if amenities:
+            matched = np.zeros(size)
+            for amenity in amenities:
+                matched += _bool_column(index.hotels_with(amenity), size)
+            components["amenities"] = matched / len(amenities)
+
+        if prices is not None:
+            known = np.isfinite(prices)
+            if known.any():
+                low, high = prices[known].min(), prices[known].max()
+                relative = (high - prices) / (high - low) if high > low else np.ones(size)
+                components["price"] = np.where(known, relative, 0.0)
+
+        weights = {name: self.weights[name] for name in components if self.weights[name] > 0}
+        total_weight = sum(weights.values())
+        total = np.zeros(size)
+        for name, weight in weights.items():
+            weights[name] = weight / total_weight
+            total += components[name] * weights[name]
+        return {"total": total, "components": components, "weights": weights}
+
+    def rank(
+        self,
+        index: HotelIndex,
+        limit: int,
+        amenities: Optional[List[str]] = None,
+        prices: Optional[np.ndarray] = None,
+        positions: Optional[List[int]] = None,
+        distance_unit: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        The `limit` best hotels with their scores and an explanation of each.
+
+        Args:
+            index: HotelIndex over the hotels
+            limit: Number of hotels to return
+            amenities: Amenities the traveller wants
+            prices: Price per night per hotel, in index order (NaN when unknown)
+            positions: Only rank these hotels (e.g. from HotelIndex.select)
+            distance_unit: Unit of the distances, for the explanations
+
+        Returns:
+            Best first: position (in index order), score, components (weighted
+            contribution of each) and why (a one-line explanation)
+        """
+        scores = self.score(index, amenities, prices)
+        total = scores["total"]
+        candidates = np.arange(index.size) if positions is None else np.asarray(positions, dtype=np.intp)
+        limit = min(limit, len(candidates))
+        if limit <= 0:
+            return []
+
+        candidate_scores = total[candidates]
+        if limit < len(candidates):
+            kept = np.argpartition(-candidate_scores, limit - 1)[:limit]
+        else:
+            kept = np.arange(len(candidates))
+        # Best first; equal scores keep list order
+        kept = kept[np.lexsort((candidates[kept], -candidate_scores[kept]))]
+
+        ranked = []
+        for position in candidates[kept].tolist():
+            ranked.append({
+                "position": position,
+                "score": round(float(total[position]), 3),
+                "components": {
+                    name: round(float(scores["components"][name][position] * weight), 3)
+                    for name, weight in scores["weights"].items()
+                },
+                "why": self._explain(index, position, scores["weights"], amenities, prices, distance_unit)
+            })
+        return ranked
+
+    @staticmethod
+    def _explain(
+        index: HotelIndex,
+        position: int,
+        weights: Dict[str, float],
+        amenities: Optional[List[str]],
+        prices: Optional[np.ndarray],
+        distance_unit: Optional[str]
+    ) -> str:
+        parts = []
+        if "distance" in weights:
+            distance = index.distances[position]
+            parts.append(f"{distance:g} {distance_unit or 'KM'} from the centre" if distance == distance else "distance unknown")
+        if "rating" in weights:
+            rating = index.ratings[position]
+            parts.append(f"{rating}★" if rating else "no star rating")
+        if "amenities" in weights:
+            missing = [a for a in amenities if not index.hotels_with(a) >> position & 1]
+            have = len(amenities) - len(missing)
+            parts.append(f"{have}/{len(amenities)} wanted amenities" + (f" (no {', '.join(missing)})" if missing else ""))
+        if "price" in weights:
+            price = prices[position]
+            parts.append(f"{price:.2f} per night" if np.isfinite(price) else "no price")
+        return "; ".join(parts)
+
+
+def rank_hotels(
+    hotels: List[Dict[str, Any]],
+    limit: int = 10,
+    weights: Optional[Dict[str, float]] = None,
+    amenities: Optional[List[str]] = None,
+    prices_per_night: Optional[Dict[str, float]] = None,
+    index: Optional[HotelIndex] = None,
+    positions: Optional[List[int]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Score simplified hotels and return the best with explanations.
+
+    Args:
+        hotels: Simplified hotels (HotelService.search_hotels)
+        limit: Number of hotels to return
+        weights: Component weights (see HotelScorer)
+        amenities: Amenities the traveller wants
+        prices_per_night: Price per night by hotel ID, where offers are known
+        index: HotelIndex over `hotels`, if one is already built
+        positions: Only rank these hotels (e.g. from HotelIndex.select)
+
+    Returns:
+        Best first, each hotel with score, score_components and why added
+    """
+    index = index or HotelIndex(hotels)
+    prices = None
+    if prices_per_night:
+        prices = np.fromiter(
+            (prices_per_night.get(hotel.get("hotelId"), np.nan) for hotel in hotels),
+            dtype=np.float64,
+            count=len(hotels)
+        )
+    distance_unit = (hotels[0].get("distance") or {}).get("unit") if hotels else None
+    ranked = HotelScorer(weights).rank(index, limit, amenities, prices, positions, distance_unit)
+    return [
+        {
+            **hotels[entry["position"]],
+            "score": entry["score"],
+            "score_components": entry["components"],
+            "why": entry["why"]
+        }
+        for entry in ranked
+    ]
@@ -1,7 +1,14 @@
-from typing import Dict, List, Any, Optional, Union
+from typing import Callable, Dict, Iterable, Iterator, List, Any, Optional, Tuple, Union
+import heapq
 import logging
 from enum import Enum
+from datetime import datetime
 from .amadeus_client import AmadeusClient
+from .fx_rates import get_fx_rates
+from .offer_registry import get_offer_registry
+from .schemas import HotelOfferResponse, HotelOffersResponse, HotelsResponse
+from ..observability.tracing import traced
+from ..config.logging_config import debug_sampled
 
 logger = logging.getLogger('travel_agent')
 
@@ -53,9 +60,87 @@ class HotelAmenities(str, Enum):
     GUARDED_PARKING = "GUARDED_PARKG"
     SPECIAL_MENU = "SERV_SPEC_MENU"
 
+
+def _number(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _rating_score(hotel: Dict[str, Any]) -> Tuple:
+    # Highest rating first, then closest
+    rating = _number(hotel.get("rating"))
+    return (rating is None, -(rating or 0), *_distance_score(hotel))
+
+
+def _distance_score(hotel: Dict[str, Any]) -> Tuple:
+    distance = _number((hotel.get("distance") or {}).get("value"))
+    return (distance is None, distance or 0)
+
+
+def _name_score(hotel: Dict[str, Any]) -> Tuple:
+    return (not hotel.get("name"), (hotel.get("name") or "").casefold())
+
+
+# Lower scores rank first; missing values always rank last
+_HOTEL_SCORES: Dict[str, Callable[[Dict[str, Any]], Tuple]] = {
+    "rating": _rating_score,
+    "distance": _distance_score,
+    "name": _name_score
+}
+
+
+def _bookable(hotel: Dict[str, Any]) -> bool:
+    # Without an ID a hotel cannot be looked up for offers or booked
+    return bool(hotel.get("hotelId"))
+
+
+def top_hotels(
+    hotels: Iterable[Dict[str, Any]],
+    limit: int,
+    sort_by: str = "distance",
+    where: Optional[Callable[[Dict[str, Any]], bool]] = _bookable
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Keep the best `limit` hotels of a stream without sorting all of them.
+
+    Hotels pass through filter, score and a heap bounded at `limit`
+    entries, one at a time, so only the kept ones stay in memory.
+
+    Args:
+        hotels: Simplified hotels, e.g. from HotelService.iter_hotels
+        limit: Number of hotels to keep
+        sort_by: One of distance, rating (highest first, then closest), name
+        where: Hotels failing this predicate are dropped (default: those without an ID)
+
+    Returns:
+        The kept hotels, best first, and the number of hotels that passed the filter
+    """
+    if sort_by not in _HOTEL_SCORES:
+        raise ValueError(f"sort_by must be one of {sorted(_HOTEL_SCORES)}")
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+    score = _HOTEL_SCORES[sort_by]
+    matched = 0
+
+    def matches() -> Iterator[Dict[str, Any]]:
+        nonlocal matched
+        for hotel in hotels:
+            if where is None or where(hotel):
+                matched += 1
+                yield hotel
+
+    # The position breaks ties, so hotels never get compared and equal scores keep upstream order
+    scored = ((score(hotel), position, hotel) for position, hotel in enumerate(matches()))
+    kept = heapq.nsmallest(limit, scored)
+    return [hotel for _, _, hotel in kept], matched
+
+
 class HotelService(AmadeusClient):
     """Service for hotel-related operations."""
     
+    @traced()
     def search_hotels(
         self,
         city_code: str,
@@ -69,6 +154,30 @@ class HotelService(AmadeusClient):
         """
         Search for hotels in a city.
         
+        Takes the same arguments as iter_hotels.
+            
+        Returns:
+            List of hotels matching the criteria
+        """
+        return list(self.iter_hotels(city_code, radius, radius_unit, chain_codes, amenities, ratings, hotel_source))
+    
+    @traced()
+    def iter_hotels(
+        self,
+        city_code: str,
+        radius: int = 50,
+        radius_unit: RadiusUnit = RadiusUnit.KM,
+        chain_codes: Optional[List[str]] = None,
+        amenities: Optional[List[Union[str, HotelAmenities]]] = None,
+        ratings: Optional[List[str]] = None,
+        hotel_source: HotelSource = HotelSource.ALL
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Search for hotels in a city, simplifying them one at a time as they are consumed.
+        
+        The request is sent right away (so errors surface here); feed the
+        result to top_hotels to keep only the best few.
+        
         Args:
             city_code: IATA city or airport code (e.g., 'PAR' for Paris)
             radius: Maximum distance from city center (default: 5)
@@ -79,33 +188,33 @@ class HotelService(AmadeusClient):
             hotel_source: Source of hotel data (default: ALL)
             
         Returns:
-            List of hotels matching the criteria
+            Iterator over the hotels matching the criteria
             
         Raises:
             ValueError: If parameters are invalid
         """
-        logger.info(f"Searching hotels in {city_code} within {radius} {radius_unit}")
+        logger.info("Searching hotels in %s within %s %s", city_code, radius, radius_unit)
         
         # Validate parameters
         if not city_code or len(city_code) != 3:
-            logger.error(f"Invalid city code: {city_code}")
+            logger.error("Invalid city code: %s", city_code)
             raise ValueError("City code must be a 3-letter IATA code")
             
         if radius <= 0:
-            logger.error(f"Invalid radius: {radius}")
+            logger.error("Invalid radius: %s", radius)
             raise ValueError("Radius must be positive")
             
         if chain_codes:
             for code in chain_codes:
                 if not (isinstance(code, str) and len(code) == 2 and code.isalpha()):
-                    logger.error(f"Invalid chain code: {code}")
+                    logger.error("Invalid chain code: %s", code)
                     raise ValueError("Chain codes must be 2-letter alphabetic strings")
                     
         if ratings:
             valid_ratings = {"1", "2", "3", "4", "5"}
             invalid_ratings = [r for r in ratings if r not in valid_ratings]
             if invalid_ratings:
-                logger.error(f"Invalid ratings: {invalid_ratings}")
+                logger.error("Invalid ratings: %s", invalid_ratings)
                 raise ValueError("Ratings must be between 1 and 5")
                 
         # Build parameters
@@ -119,7 +228,7 @@ class HotelService(AmadeusClient):
         # Add optional parameters
         if chain_codes:
             params["chainCodes"] = chain_codes
-            logger.debug(f"Added chain codes filter: {chain_codes}")
+            logger.debug("Added chain codes filter: %s", chain_codes)
             
         if amenities:
             # Convert string amenities to enum values if needed
@@ -129,27 +238,29 @@ class HotelService(AmadeusClient):
                     try:
                         validated_amenities.append(HotelAmenities[amenity].value)
                     except KeyError:
-                        logger.warning(f"Invalid amenity ignored: {amenity}")
+                        logger.warning("Invalid amenity ignored: %s", amenity)
                 else:
                     validated_amenities.append(amenity.value)
             params["amenities"] = validated_amenities
-            logger.debug(f"Added amenities filter: {validated_amenities}")
+            logger.debug("Added amenities filter: %s", validated_amenities)
             
         if ratings:
             params["ratings"] = ratings
-            logger.debug(f"Added ratings filter: {ratings}")
+            logger.debug("Added ratings filter: %s", ratings)
             
         try:
-            logger.debug(f"Searching with parameters: {params}")
+            logger.debug("Searching with parameters: %s", params)
             response = self._make_request(
                 "GET",
                 "/v1/reference-data/locations/hotels/by-city",
-                params=params
+                params=params,
+                schema=HotelsResponse,
+                cache=True
             )
-            return self._parse_hotels(response)
+            return self._iter_parsed_hotels(response)
         except Exception as e:
             error_msg = str(e)
-            logger.error(f"Failed to search hotels: {error_msg}", exc_info=True)
+            logger.error("Failed to search hotels: %s", error_msg, exc_info=True)
             
             if "477" in error_msg:
                 raise ValueError("Invalid parameter format")
@@ -158,11 +269,15 @@ class HotelService(AmadeusClient):
             else:
                 raise
     
+    @traced()
     def _parse_hotels(self, response: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Parse and simplify hotels response."""
-        hotels = []
+        return list(self._iter_parsed_hotels(response))
+    
+    def _iter_parsed_hotels(self, response: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Simplify the hotels of a response one at a time."""
         data = response.get("data", [])
-        logger.debug(f"Parsing {len(data)} hotels")
+        logger.debug("Parsing %s hotels", len(data))
         
         for hotel in data:
             hotel_data = {
@@ -188,14 +303,13 @@ class HotelService(AmadeusClient):
                 "amenities": hotel.get("amenities", []),
                 "rating": hotel.get("rating")
             }
-            hotels.append(hotel_data)
-            logger.debug(
-                f"Parsed hotel {hotel_data['hotelId']}: "
-                f"{hotel_data['name']} ({hotel_data['rating']}★)"
+            debug_sampled(
+                logger, "parsed_hotel", "Parsed hotel %s: %s (%s★)",
+                hotel_data['hotelId'], hotel_data['name'], hotel_data['rating']
             )
-        
-        return hotels
+            yield hotel_data
     
+    @traced()
     def get_hotel_offer_details(self, offer_id: str) -> Dict[str, Any]:
         """
         Get detailed information about a specific hotel offer.
@@ -204,21 +318,130 @@ class HotelService(AmadeusClient):
             offer_id: The hotel offer ID from search results
             
         Returns:
-            Detailed hotel offer information
+            Detailed hotel offer information, with normalized_price
         """
-        logger.info(f"Getting details for hotel offer {offer_id}")
+        logger.info("Getting details for hotel offer %s", offer_id)
         try:
             response = self._make_request(
                 "GET", 
-                f"/v3/shopping/hotel-offers/{offer_id}"
+                f"/v3/shopping/hotel-offers/{offer_id}",
+                schema=HotelOfferResponse
             )
             details = self._parse_hotel_offer_details(response)
-            logger.info(f"Successfully retrieved details for hotel offer {offer_id}")
+            if details:
+                get_fx_rates().normalize([details])
+            logger.info("Successfully retrieved details for hotel offer %s", offer_id)
             return details
         except Exception as e:
-            logger.error(f"Failed to get hotel offer details: {str(e)}", exc_info=True)
+            logger.error("Failed to get hotel offer details: %s", e, exc_info=True)
             raise
     
+    @traced()
+    def search_hotel_offers(
+        self,
+        hotel_ids: List[str],
+        check_in: str,
+        check_out: str,
+        adults: int = 1,
+        currency: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the best available offer of each hotel for a stay.
+        
+        Hotel IDs are sent HOTEL_OFFERS_BATCH_SIZE at a time. A batch that
+        fails (e.g. none of its hotels has rooms) is logged and skipped;
+        the error is raised only if every batch fails.
+        
+        Args:
+            hotel_ids: Amadeus hotel IDs (e.g. from search_hotels)
+            check_in: Check-in date in YYYY-MM-DD format
+            check_out: Check-out date in YYYY-MM-DD format
+            adults: Number of adult guests per room
+            currency: Currency to price the offers in (default: the hotel's own)
+            
+        Returns:
+            One offer per available hotel, with offerId, hotelId, name,
+            price (total for the stay and currency), normalized_price (the
+            total in FX_CURRENCY), check_in, check_out and room
+            
+        Raises:
+            ValueError: If parameters are invalid
+        """
+        logger.info("Pricing %s hotels from %s to %s", len(hotel_ids), check_in, check_out)
+        try:
+            nights = (datetime.strptime(check_out, "%Y-%m-%d") - datetime.strptime(check_in, "%Y-%m-%d")).days
+        except (TypeError, ValueError):
+            raise ValueError("Dates must be in YYYY-MM-DD format")
+        if nights < 1:
+            raise ValueError("Check-out must be after check-in")
+        if adults < 1:
+            raise ValueError("At least one adult is required")
+        
+        batch_size = max(self.settings.hotel_offers_batch_size, 1)
+        batches = [hotel_ids[start:start + batch_size] for start in range(0, len(hotel_ids), batch_size)]
+        offers = []
+        failures = []
+        for batch in batches:
+            params = {
+                "hotelIds": ",".join(batch),
+                "checkInDate": check_in,
+                "checkOutDate": check_out,
+                "adults": adults,
+                "bestRateOnly": "true"
+            }
+            if currency:
+                params["currency"] = currency
+            try:
+                response = self._make_request(
+                    "GET",
+                    "/v3/shopping/hotel-offers",
+                    params=params,
+                    schema=HotelOffersResponse
+                )
+            except Exception as e:
+                logger.warning("Hotel offers search failed for %s hotels: %s", len(batch), e)
+                failures.append(e)
+                continue
+            offers.extend(self._parse_hotel_offers(response))
+        if failures and len(failures) == len(batches):
+            raise failures[-1]
+        get_fx_rates().normalize(offers)
+        logger.info("Priced %s of %s hotels", len(offers), len(hotel_ids))
+        return offers
+    
+    def _parse_hotel_offers(self, response: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Simplify a hotel offers search to the cheapest offer per hotel, registering each."""
+        offers = []
+        for entry in response.get("data", []):
+            hotel = entry.get("hotel", {})
+            priced = []
+            for offer in entry.get("offers") or []:
+                try:
+                    priced.append((float(offer.get("price", {}).get("total")), offer))
+                except (TypeError, ValueError):
+                    continue
+            if entry.get("available") is False or not priced:
+                continue
+            _, offer = min(priced, key=lambda item: item[0])
+            details = {
+                "offerId": offer.get("id"),
+                "hotelId": hotel.get("hotelId"),
+                "name": hotel.get("name"),
+                "price": {
+                    "total": offer.get("price", {}).get("total"),
+                    "currency": offer.get("price", {}).get("currency")
+                },
+                "check_in": offer.get("checkInDate"),
+                "check_out": offer.get("checkOutDate"),
+                "room": {
+                    "type": offer.get("room", {}).get("type"),
+                    "description": (offer.get("room", {}).get("description") or {}).get("text")
+                }
+            }
+            self._register_offer(offer, details)
+            offers.append(details)
+        return offers
+    
     def _parse_hotel_offer_details(self, response: Dict[str, Any]) -> Dict[str, Any]:
         """Parse and simplify detailed hotel offer response."""
         if not response.get("data"):
@@ -255,5 +478,33 @@ class HotelService(AmadeusClient):
             },
             "available": True
         }
-        logger.debug(f"Parsed details for hotel offer {details['offerId']}")
-        return details 
\ No newline at end of file
+        self._register_offer(offer, details)
+        logger.debug("Parsed details for hotel offer %s", details['offerId'])
+        return details
+    
+    def _register_offer(self, offer: Dict[str, Any], details: Dict[str, Any]) -> None:
+        """Record the bookable price and stay length of an offer so bookings can use it."""
+        try:
+            total = float(details["price"]["total"])
+        except (TypeError, ValueError):
+            return
+        nights = 1
+        try:
+            check_in = datetime.strptime(offer.get("checkInDate"), "%Y-%m-%d")
+            check_out = datetime.strptime(offer.get("checkOutDate"), "%Y-%m-%d")
+            nights = max((check_out - check_in).days, 1)
+        except (TypeError, ValueError):
+            logger.debug("No stay dates on hotel offer %s, assuming 1 night", details['offerId'])
+        get_offer_registry().register(
+            "hotel",
+            details["offerId"],
+            {
+                "price": total,
+                "price_per_night": round(total / nights, 2),
+                "nights": nights,
+                "currency": details["price"]["currency"],
+                "hotel_id": details["hotelId"],
+                "check_in": offer.get("checkInDate"),
+                "check_out": offer.get("checkOutDate")
+            }
+        ) 
\ No newline at end of file
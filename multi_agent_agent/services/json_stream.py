@@ -0,0 +1,141 @@
+"""
+Incremental decoding of large JSON responses.
+
+`iter_members` reads a body chunk by chunk and yields the members of its
+top-level object as each one completes. Members named in `stream` that
+hold an array are yielded one element at a time instead, so a long list
+is never held whole: only the text of the value being decoded is kept.
+
+Values are decoded with the standard library's C scanner, which reports
+where each value ends; the codecs in `codec` only decode whole documents.
+"""
+import codecs
+import json
+import re
+from json.decoder import WHITESPACE
+from typing import Any, Collection, Iterable, Iterator, Tuple
+from .codec import CodecError
+
+_decoder = json.JSONDecoder()
+# What may still follow a number cut off by the end of a chunk
+_NUMBER_TAIL = re.compile(r"[0-9.eE+-]*")
+
+
+class _Buffer:
+    """The decoded text of the body that has not been consumed yet."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, at_least: int = 1) -> bool:
+        """Read chunks until at least `at_least` more characters are buffered; False at the end of the body."""
+        added = []
+        size = 0
+        while size < at_least and not self.eof:
+            chunk = next(self._chunks, None)
+            try:
+                if chunk is None:
+                    self.eof = True
+                    text = self._utf8.decode(b"", final=True)
+                else:
+                    text = self._utf8.decode(chunk)
+            except UnicodeDecodeError as e:
+                raise CodecError(str(e)) from e
+            added.append(text)
+            size += len(text)
+        if not size:
+            return False
+        # Drop what was consumed, so the buffer never holds more than one value and a chunk
+        self.text = self.text[self.pos:] + "".join(added)
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character, or '' at the end of the body."""
+        while True:
+            self.pos = WHITESPACE.match(self.text, self.pos).end()
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, characters: str) -> str:
+        """Consume the next character, which must be one of `characters`."""
+        character = self.peek()
+        if not character or character not in characters:
+            found = repr(character) if character else "end of body"
+            raise CodecError(f"Expected one of {characters!r} at offset {self.pos}, found {found}")
+        self.pos += 1
+        return character
+
+    def value(self) -> Any:
+        """Decode the next complete value, reading more of the body as needed."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError as e:
+                # Most likely cut off by the end of the chunk; at least double the
+                # buffered text before retrying, so a long value is rescanned only a few times
+                if self.fill(max(len(self.text) - self.pos, 1)):
+                    continue
+                raise CodecError(str(e)) from e
+            # A number or literal at the end of the buffer may go on in the next chunk;
+            # "1." or "1e" decodes as 1 followed by a stray character, so check what is left
+            if self.text[end - 1] not in '"]}' and _NUMBER_TAIL.fullmatch(self.text, end) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+    def close(self) -> None:
+        close = getattr(self._chunks, "close", None)
+        if close is not None:
+            close()
+
+
+def iter_members(chunks: Iterable[bytes], stream: Collection[str] = ()) -> Iterator[Tuple[str, Any]]:
+    """
+    Yield (key, value) for each member of a JSON object as the body arrives.
+
+    Args:
+        chunks: The body, as an iterable of byte chunks of any size
+        stream: Keys whose array value is yielded element by element, as
+                (key, element) pairs, instead of as one list
+
+    Raises:
+        CodecError: If the body is not a valid JSON object
+
+    Closing the generator closes `chunks` (e.g. releasing the connection).
+    """
+    buffer = _Buffer(chunks)
+    try:
+        buffer.expect("{")
+        if buffer.peek() == "}":
+            buffer.pos += 1
+        else:
+            while True:
+                key = buffer.value()
+                if not isinstance(key, str):
+                    raise CodecError(f"Expected an object key, found {key!r}")
+                buffer.expect(":")
+                if key in stream and buffer.peek() == "[":
+                    buffer.pos += 1
+                    if buffer.peek() == "]":
+                        buffer.pos += 1
+                    else:
+                        while True:
+                            yield key, buffer.value()
+                            if buffer.expect(",]") == "]":
+                                break
+                else:
+                    yield key, buffer.value()
+                if buffer.expect(",}") == "}":
+                    break
+        if buffer.peek():
+            raise CodecError(f"Extra data after the JSON object at offset {buffer.pos}")
+    finally:
+        buffer.close()
@@ -0,0 +1,117 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+from ..config import get_settings
+from ..observability.metrics import record_cache_lookup
+
+logger = logging.getLogger('travel_agent')
+
+
+def _expiry_from_date(last_ticketing_date: Optional[str]) -> Optional[float]:
+    """Convert a 'YYYY-MM-DD' last ticketing date into an epoch expiry (end of that day, UTC)."""
+    if not last_ticketing_date:
+        return None
+    try:
+        day = datetime.strptime(last_ticketing_date[:10], "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+    return day.timestamp() + 86400
+
+
+class OfferRegistry:
+    """
+    Process-wide registry of the flight and hotel offers we have shown.
+
+    Offers are indexed by (kind, offer ID) in an ordered dict, so lookups
+    are O(1). Each entry expires at its last ticketing date (or after the
+    default TTL when there is none, whichever comes first), and the least
+    recently used entries are evicted once max_entries is reached, so
+    memory stays bounded.
+    """
+
+    def __init__(self, ttl_seconds: float = 1800, max_entries: int = 5000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expirations": 0, "evictions": 0}
+
+    def register(self, kind: str, offer_id: str, record: Dict[str, Any], expires_on: Optional[str] = None) -> None:
+        """
+        Register (or refresh) an offer.
+
+        Args:
+            kind: 'flight' or 'hotel'
+            offer_id: Offer ID as returned by Amadeus
+            record: Booking-relevant fields (price, currency, nights, ...)
+            expires_on: Optional last ticketing date in YYYY-MM-DD format
+        """
+        if not offer_id:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        ticketing_expiry = _expiry_from_date(expires_on)
+        if ticketing_expiry is not None:
+            expires_at = min(expires_at, ticketing_expiry)
+
+        key = (kind, str(offer_id))
+        now = time.time()
+        with self._lock:
+            # Opportunistically drop expired entries from the cold end
+            while self._entries:
+                oldest_expiry = next(iter(self._entries.values()))[0]
+                if oldest_expiry > now:
+                    break
+                self._entries.popitem(last=False)
+                self._stats["expirations"] += 1
+            self._entries[key] = (expires_at, record)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def get(self, kind: str, offer_id: str) -> Optional[Dict[str, Any]]:
+        """Return the registered offer, or None if unknown or expired."""
+        key = (kind, str(offer_id))
+        with self._lock:
+            record = self._get_locked(key)
+        record_cache_lookup("offer_registry", record is not None)
+        return record
+
+    def _get_locked(self, key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self._stats["misses"] += 1
+            return None
+        expires_at, record = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self._stats["expirations"] += 1
+            self._stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self._stats["hits"] += 1
+        return record
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "size": len(self._entries)}
+
+
+_offer_registry = None
+_offer_registry_lock = threading.Lock()
+
+def get_offer_registry() -> OfferRegistry:
+    """Get the singleton offer registry shared by all services."""
+    global _offer_registry
+    if _offer_registry is None:
+        with _offer_registry_lock:
+            if _offer_registry is None:
+                settings = get_settings()
+                _offer_registry = OfferRegistry(
+                    ttl_seconds=settings.offer_registry_ttl,
+                    max_entries=settings.offer_registry_max_entries
+                )
+    return _offer_registry
@@ -0,0 +1,180 @@
+"""
+Shapes of the upstream responses, limited to the fields the services read.
+
+Passing one of these as `schema` to `_make_request` lets the msgspec codec
+build only the declared fields and skip the rest of the document while
+parsing. Leaves are typed `Any` so a provider changing a number to a
+string never fails a request. Add a field here before reading it in a
+parser: with msgspec, anything undeclared is simply missing.
+"""
+from typing import Any, Dict, List, TypedDict
+
+
+# Amadeus flight offers search (GET /v2/shopping/flight-offers)
+
+class FlightDictionaries(TypedDict, total=False):
+    carriers: Dict[str, Any]
+    aircraft: Dict[str, Any]
+    currencies: Dict[str, Any]
+
+
+class FlightOffersResponse(TypedDict, total=False):
+    # Offers are kept whole: they are posted back as-is to the pricing API
+    data: List[Dict[str, Any]]
+    dictionaries: FlightDictionaries
+
+
+# Amadeus hotel list (GET /v1/reference-data/locations/hotels/by-city)
+
+class Distance(TypedDict, total=False):
+    value: Any
+    unit: Any
+
+
+class Address(TypedDict, total=False):
+    cityName: Any
+    countryCode: Any
+    stateCode: Any
+    postalCode: Any
+    lines: Any
+
+
+class GeoCode(TypedDict, total=False):
+    latitude: Any
+    longitude: Any
+
+
+class Hotel(TypedDict, total=False):
+    hotelId: Any
+    name: Any
+    iataCode: Any
+    distance: Distance
+    address: Address
+    geoCode: GeoCode
+    chainCode: Any
+    amenities: Any
+    rating: Any
+
+
+class HotelsResponse(TypedDict, total=False):
+    data: List[Hotel]
+
+
+# Amadeus hotel offer (GET /v3/shopping/hotel-offers/{offerId})
+
+class Text(TypedDict, total=False):
+    text: Any
+
+
+class OfferHotel(TypedDict, total=False):
+    hotelId: Any
+    name: Any
+    rating: Any
+    description: Text
+    address: Address
+    contact: Any
+    amenities: Any
+
+
+class OfferPrice(TypedDict, total=False):
+    total: Any
+    currency: Any
+    variations: Any
+
+
+class Room(TypedDict, total=False):
+    type: Any
+    description: Any
+
+
+class HotelOffer(TypedDict, total=False):
+    id: Any
+    checkInDate: Any
+    checkOutDate: Any
+    hotel: OfferHotel
+    price: OfferPrice
+    policies: Any
+    room: Room
+
+
+class HotelOfferResponse(TypedDict, total=False):
+    data: HotelOffer
+
+
+# Amadeus hotel offers search (GET /v3/shopping/hotel-offers)
+
+class HotelOffers(TypedDict, total=False):
+    hotel: OfferHotel
+    available: Any
+    offers: List[HotelOffer]
+
+
+class HotelOffersResponse(TypedDict, total=False):
+    data: List[HotelOffers]
+
+
+# WeatherAPI forecast, future and current (GET /forecast.json, /future.json, /current.json)
+
+class WeatherLocation(TypedDict, total=False):
+    name: Any
+    region: Any
+    country: Any
+    lat: Any
+    lon: Any
+    tz_id: Any
+    localtime: Any
+
+
+class Day(TypedDict, total=False):
+    maxtemp_c: Any
+    mintemp_c: Any
+    totalsnow_cm: Any
+    daily_chance_of_rain: Any
+    daily_chance_of_snow: Any
+    condition: Text
+    uv: Any
+
+
+class Astro(TypedDict, total=False):
+    sunrise: Any
+    sunset: Any
+    moon_phase: Any
+
+
+class ForecastDay(TypedDict, total=False):
+    # The hourly breakdown, most of the payload, is never read
+    date: Any
+    day: Day
+    astro: Astro
+
+
+class Forecast(TypedDict, total=False):
+    forecastday: List[ForecastDay]
+
+
+class Current(TypedDict, total=False):
+    temp_c: Any
+    is_day: Any
+    condition: Text
+    humidity: Any
+    cloud: Any
+    feelslike_c: Any
+    uv: Any
+
+
+class ForecastResponse(TypedDict, total=False):
+    location: WeatherLocation
+    forecast: Forecast
+
+
+class CurrentWeatherResponse(TypedDict, total=False):
+    location: WeatherLocation
+    current: Current
+
+
+# Exchange rate feed (GET /latest)
+
+class FxRatesResponse(TypedDict, total=False):
+    base: Any
+    date: Any
+    rates: Dict[str, Any]
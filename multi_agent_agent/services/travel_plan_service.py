@@ -1,18 +1,50 @@
-from typing import Dict, Any, List
-from datetime import datetime, timedelta
+from typing import Callable, Dict, Any, List, Optional, Tuple
+import contextvars
+import logging
+import math
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from functools import partial
 from .weather_service import WeatherService
 from .flight_service import FlightService
+from .fx_rates import get_fx_rates
 from .hotel_service import HotelService
-from .hotel_service import HotelSource
+from .hotel_service import HotelSource, top_hotels
+from .trip_optimizer import OBJECTIVES, TripOptimizer
+from .working_set import flight_row
+from ..config import get_settings
+from ..observability.tracing import traced
+
+logger = logging.getLogger('travel_agent')
+
+# Time allowed between landing and the next flight of an itinerary (separate tickets)
+_MIN_CONNECTION = timedelta(hours=2)
+
+
+def _amount(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _time(value: Optional[str]) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
 
 class TravelPlanService:
     """Service for collecting travel plan data for AI evaluation."""
-    
+
     def __init__(self):
         self.weather_service = WeatherService()
         self.flight_service = FlightService()
         self.hotel_service = HotelService()
-        
+
+    @traced()
     def collect_travel_data(
         self,
         origin: str,
@@ -20,80 +52,620 @@ class TravelPlanService:
         start_date: str,
         end_date: str,
         max_budget: float,
-        adults: int = 1
+        adults: int = 1,
+        limit: int = 3,
+        hotel_candidates: int = 40,
+        currency: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Collect all relevant data for AI to evaluate travel plans.
-        
+
+        Rather than handing every flight and hotel to the model, the best
+        flight + hotel combinations within max_budget are worked out here
+        (see trip_optimizer) for each objective, along with the Pareto set.
+        Hotel lists carry no prices, so `hotel_candidates` hotels (half the
+        best rated, half the closest) are priced for the stay. All prices
+        are converted to `currency` first (see fx_rates), so the budget and
+        the ranking hold whatever currency each offer came in.
+
         Args:
             origin: Origin airport IATA code
             destination: Destination airport IATA code
             start_date: Start date in YYYY-MM-DD format
             end_date: End date in YYYY-MM-DD format
-            max_budget: Maximum budget for the trip
+            max_budget: Maximum budget for the trip (outbound flight and hotel)
             adults: Number of adult travelers
-            
+            limit: Combinations to return per objective
+            hotel_candidates: Hotels to price for the stay
+            currency: Currency of max_budget and all prices (default: settings.fx_currency)
+
         Returns:
-            Dictionary containing all travel-related data for AI evaluation
+            Dictionary with trip_details, weather, options (how many flights,
+            hotels and combinations fit the budget, and currencies without
+            an exchange rate, if any) and plans (best combinations per
+            objective and the Pareto set)
+
+        Raises:
+            ValueError: If the dates or the currency are invalid
         """
-        # Get weather data
-        weather_data = self.weather_service.get_travel_recommendation(destination)
-        
-        # Get flight options
-        flight_offers = self.flight_service.search_flights(origin, destination, start_date, adults)
-        
-        # Get hotel options (using new API parameters)
-        hotel_offers = self.hotel_service.search_hotels(
-            city_code=destination,
-            radius=50,  # Default to 50km radius
-            hotel_source=HotelSource.ALL
+        nights = self._nights(start_date, end_date)
+        currency = self._plan_currency(currency)
+        (hop,), (stay,) = self._fan_out(
+            [(origin, destination, start_date)], [(destination, start_date, end_date)], adults, hotel_candidates, currency
         )
-        
-        # Calculate trip duration
-        start = datetime.strptime(start_date, "%Y-%m-%d")
-        end = datetime.strptime(end_date, "%Y-%m-%d")
-        duration = (end - start).days
-        
-        # Organize flight data
-        flight_data = []
-        for flight in flight_offers:
-            flight_data.append({
-                "carrier": flight.get("carrier"),
-                "departure_time": flight.get("departure", {}).get("time"),
-                "arrival_time": flight.get("arrival", {}).get("time"),
-                "price": flight.get("price", {}).get("total"),
-                "currency": flight.get("price", {}).get("currency", "USD"),
-                "seats_available": flight.get("seats_available"),
-                "cabin_class": flight.get("cabin_class")
-            })
-        
-        # Organize hotel data
-        hotel_data = []
-        for hotel in hotel_offers:
-            hotel_data.append({
-                "hotelId": hotel.get("hotelId"),
-                "name": hotel.get("name"),
-                "rating": hotel.get("rating"),
-                "location": {
-                    "address": hotel.get("address", {}).get("lines", []),
-                    "city": hotel.get("address", {}).get("cityName"),
-                    "distance": hotel.get("distance")
-                },
-                "amenities": hotel.get("amenities", []),
-                "geoCode": hotel.get("geoCode")
-            })
-        
+        for result in (hop, stay):
+            if "error" in result:
+                raise result["error"]
+        data = {**hop, **stay}
+
+        optimizer = TripOptimizer(data["flights"], data["hotel_options"], max_budget)
+        plans = {objective: optimizer.best(objective, limit) for objective in OBJECTIVES}
+        plans["pareto"] = optimizer.pareto(limit=max(limit * len(OBJECTIVES), 10))
+        within_budget = optimizer.count_within_budget()
+        logger.info(
+            "Trip %s-%s: %s flights x %s priced hotels, %s combinations within %s %s",
+            origin, destination, len(data["flights"]), len(data["hotel_options"]), within_budget,
+            max_budget, currency
+        )
+        options = {
+            "flights": len(data["flights"]),
+            "hotels": data["hotels"],
+            "hotels_priced": len(data["hotel_options"]),
+            "combinations_within_budget": within_budget
+        }
+        if data.get("unconverted"):
+            options["unconverted_currencies"] = data["unconverted"]
+
         return {
             "trip_details": {
                 "origin": origin,
                 "destination": destination,
                 "start_date": start_date,
                 "end_date": end_date,
-                "duration_days": duration,
+                "duration_days": nights,
+                "adults": adults,
+                "max_budget": max_budget,
+                "currency": currency
+            },
+            "weather": data["weather"],
+            "options": options,
+            "plans": plans
+        }
+
+    @traced()
+    def compare_destinations(
+        self,
+        origin: str,
+        destinations: List[str],
+        start_date: str,
+        end_date: str,
+        max_budget: float,
+        adults: int = 1,
+        hotel_candidates: int = 20,
+        currency: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Compare the same trip to several destinations in one pass.
+
+        Every upstream call for every destination runs at once (up to
+        PLAN_MAX_WORKERS), and repeated lookups are served from the upstream
+        response cache. Each destination gets one row of the comparison
+        table; a destination whose searches fail gets a row with its error
+        instead of failing the comparison. Prices are converted to
+        `currency`, so destinations priced in different currencies compare.
+
+        Args:
+            origin: Origin airport IATA code
+            destinations: Destination IATA city codes (e.g., ['LIS', 'BCN', 'ROM'])
+            start_date: Start date in YYYY-MM-DD format
+            end_date: End date in YYYY-MM-DD format
+            max_budget: Maximum budget for the trip (outbound flight and hotel)
+            adults: Number of adult travelers
+            hotel_candidates: Hotels to price per destination
+            currency: Currency of max_budget and all prices (default: settings.fx_currency)
+
+        Returns:
+            Dictionary with trip_details and comparison: one row per
+            destination (cheapest, fastest and best_rated combination within
+            budget, how many combinations fit, and a weather summary), the
+            destinations with a plan within budget first, cheapest first
+
+        Raises:
+            ValueError: If the dates, destinations or currency are invalid
+        """
+        nights = self._nights(start_date, end_date)
+        currency = self._plan_currency(currency)
+        destinations = list(dict.fromkeys(code.upper() for code in destinations))
+        if not destinations:
+            raise ValueError("At least one destination is required")
+
+        flights, stays = self._fan_out(
+            [(origin, destination, start_date) for destination in destinations],
+            [(destination, start_date, end_date) for destination in destinations],
+            adults,
+            hotel_candidates,
+            currency
+        )
+        rows = []
+        for destination, hop, stay in zip(destinations, flights, stays):
+            error = hop.get("error") or stay.get("error")
+            if error is not None:
+                rows.append({"destination": destination, "error": str(error)})
+                continue
+            data = {**hop, **stay}
+            optimizer = TripOptimizer(data["flights"], data["hotel_options"], max_budget)
+            best = {objective: optimizer.best(objective, 1) for objective in OBJECTIVES}
+            rows.append({
+                "destination": destination,
+                "combinations_within_budget": optimizer.count_within_budget(),
+                **{objective: self._summarize(found[0]) if found else None for objective, found in best.items()},
+                "weather": self._weather_summary(data["weather"], start_date, end_date)
+            })
+        rows.sort(key=lambda row: (row.get("cheapest") is None, (row.get("cheapest") or {}).get("total_price", 0)))
+        logger.info("Compared %s destinations from %s within %s %s", len(rows), origin, max_budget, currency)
+
+        return {
+            "trip_details": {
+                "origin": origin,
+                "start_date": start_date,
+                "end_date": end_date,
+                "duration_days": nights,
+                "adults": adults,
+                "max_budget": max_budget,
+                "currency": currency
+            },
+            "comparison": rows
+        }
+
+    @traced()
+    def plan_itinerary(
+        self,
+        origin: str,
+        legs: List[Dict[str, str]],
+        adults: int = 1,
+        return_to_origin: bool = True,
+        max_budget: Optional[float] = None,
+        hotel_candidates: int = 20,
+        currency: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Plan a multi-city trip: a flight into each city and a hotel for its nights.
+
+        All flight searches, hotel searches and weather requests of every leg
+        run at once (see _fan_out). Each leg then gets the cheapest flight
+        that leaves after the previous one lands and arrives by check-in
+        day, and the cheapest hotel, with every price converted to
+        `currency`. Anything that does not fit together is listed in
+        conflicts rather than silently dropped.
+
+        Args:
+            origin: Origin airport IATA code
+            legs: In travel order, each {"city": IATA city code, "start_date":
+                  arrival and check-in date, "end_date": check-out date}
+            adults: Number of adult travelers
+            return_to_origin: Also plan a flight home on the last check-out date
+            max_budget: Optional budget for all flights and hotels together
+            hotel_candidates: Hotels to price per city
+            currency: Currency of max_budget and all prices (default: settings.fx_currency)
+
+        Returns:
+            Dictionary with itinerary (the request), legs (per city: the
+            chosen flight in and hotel with alternatives, and a weather
+            summary), return_flight, totals (flights, hotels, total, nights,
+            currency and budget check) and conflicts (leg, type, message)
+
+        Raises:
+            ValueError: If the legs or the currency are invalid
+        """
+        stays = self._stays(legs)
+        currency = self._plan_currency(currency)
+        hops = [
+            (stays[i - 1][0] if i else origin.upper(), city, check_in)
+            for i, (city, check_in, _) in enumerate(stays)
+        ]
+        if return_to_origin:
+            hops.append((stays[-1][0], origin.upper(), stays[-1][2]))
+        flights, stay_data = self._fan_out(hops, stays, adults, hotel_candidates, currency)
+
+        conflicts: List[Dict[str, Any]] = []
+        planned_legs = []
+        chosen_flights: List[Dict[str, Any]] = []
+        chosen_hotels: List[Dict[str, Any]] = []
+        landed: Optional[datetime] = None
+        for i, (city, check_in, check_out) in enumerate(stays):
+            if i and check_in != stays[i - 1][2]:
+                kind = "gap" if check_in > stays[i - 1][2] else "overlap"
+                conflicts.append({
+                    "leg": i, "type": kind,
+                    "message": f"{stays[i - 1][0]} check-out is {stays[i - 1][2]} but {city} check-in is {check_in}"
+                               + (": nights without a hotel" if kind == "gap" else ": hotel nights overlap")
+                })
+            flight, landed = self._plan_hop(i, hops[i], flights[i], landed, check_in, conflicts)
+            hotel = self._plan_stay(i, city, stay_data[i], conflicts)
+            chosen_flights += [flight["chosen"]] if flight["chosen"] else []
+            chosen_hotels += [hotel["chosen"]] if hotel["chosen"] else []
+            planned_legs.append({
+                "city": city,
+                "check_in": check_in,
+                "check_out": check_out,
+                "nights": self._nights(check_in, check_out),
+                "flight": flight,
+                "hotel": hotel,
+                "weather": self._weather_summary(stay_data[i]["weather"], check_in, check_out)
+            })
+
+        return_flight = None
+        if return_to_origin:
+            return_flight, _ = self._plan_hop(len(stays), hops[-1], flights[-1], landed, None, conflicts)
+            chosen_flights += [return_flight["chosen"]] if return_flight["chosen"] else []
+
+        flight_total = sum(flight["price"] or 0 for flight in chosen_flights)
+        hotel_total = sum(_amount(hotel["price"]) for hotel in chosen_hotels)
+        totals = {
+            "flights": round(flight_total, 2),
+            "hotels": round(hotel_total, 2),
+            "total": round(flight_total + hotel_total, 2),
+            "nights": sum(leg["nights"] for leg in planned_legs),
+            "currency": currency
+        }
+        if max_budget is not None:
+            totals["max_budget"] = max_budget
+            totals["within_budget"] = totals["total"] <= max_budget
+            if not totals["within_budget"]:
+                conflicts.append({
+                    "leg": None, "type": "budget",
+                    "message": f"Cheapest plan costs {totals['total']}, {round(totals['total'] - max_budget, 2)} over budget"
+                })
+        logger.info("Planned %s legs from %s: total %s, %s conflicts", len(stays), origin, totals["total"], len(conflicts))
+
+        return {
+            "itinerary": {
+                "origin": origin.upper(),
+                "legs": [{"city": city, "start_date": start, "end_date": end} for city, start, end in stays],
                 "adults": adults,
-                "max_budget": max_budget
+                "return_to_origin": return_to_origin
             },
-            "weather": weather_data,
-            "flights": flight_data,
-            "hotels": hotel_data
-        } 
\ No newline at end of file
+            "legs": planned_legs,
+            "return_flight": return_flight,
+            "totals": totals,
+            "conflicts": conflicts
+        }
+
+    def _stays(self, legs: List[Dict[str, str]]) -> List[Tuple[str, str, str]]:
+        """Validate itinerary legs into (city, check_in, check_out), in travel order."""
+        if not legs:
+            raise ValueError("At least one leg is required")
+        stays = []
+        for i, leg in enumerate(legs):
+            city = str(leg.get("city") or "").upper()
+            if len(city) != 3 or not city.isalpha():
+                raise ValueError(f"Leg {i + 1}: city must be a 3-letter IATA code")
+            start_date, end_date = leg.get("start_date"), leg.get("end_date")
+            try:
+                self._nights(start_date, end_date)
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"Leg {i + 1}: {e}")
+            if stays and start_date < stays[-1][1]:
+                raise ValueError(f"Leg {i + 1} starts before leg {i}; list legs in travel order")
+            stays.append((city, start_date, end_date))
+        return stays
+
+    def _plan_hop(
+        self,
+        leg: int,
+        hop: Tuple[str, str, str],
+        result: Dict[str, Any],
+        landed: Optional[datetime],
+        check_in: Optional[str],
+        conflicts: List[Dict[str, Any]]
+    ) -> Tuple[Dict[str, Any], Optional[datetime]]:
+        """
+        Choose the flight of one hop: the cheapest that leaves after the
+        previous flight lands and arrives by check-in day, else the cheapest
+        that at least connects, else the cheapest, recording why.
+
+        Returns:
+            The hop (from, to, date, options, chosen, alternatives) and the
+            chosen flight's arrival time
+        """
+        origin, destination, day = hop
+        planned = {"from": origin, "to": destination, "date": day, "options": 0, "chosen": None, "alternatives": []}
+        if result.get("unconverted"):
+            conflicts.append({
+                "leg": leg, "type": "currency",
+                "message": f"{origin}-{destination} on {day}: no exchange rate for {', '.join(result['unconverted'])}; "
+                           "flights priced in it were left out"
+            })
+        if "error" in result or not result["flights"]:
+            reason = str(result["error"]) if "error" in result else "no flights found"
+            conflicts.append({"leg": leg, "type": "no_flight", "message": f"{origin}-{destination} on {day}: {reason}"})
+            return planned, landed
+
+        flights = sorted((f for f in result["flights"] if f["price"] is not None), key=lambda f: f["price"])
+
+        def connects_in_time(flight: Dict[str, Any]) -> bool:
+            departure = _time(flight["departure"])
+            return landed is None or departure is None or departure >= landed + _MIN_CONNECTION
+
+        connects = [f for f in flights if connects_in_time(f)]
+        on_time = [f for f in connects if check_in is None or (f["arrival"] or "")[:10] <= check_in]
+        candidates = on_time or connects or flights
+        if not on_time and connects:
+            conflicts.append({
+                "leg": leg, "type": "late_arrival",
+                "message": f"Every {origin}-{destination} flight on {day} lands after the {check_in} check-in day; the first night is unused"
+            })
+        elif not connects:
+            conflicts.append({
+                "leg": leg, "type": "connection",
+                "message": f"No {origin}-{destination} flight on {day} leaves {_MIN_CONNECTION.seconds // 3600}h or more "
+                           f"after the previous flight lands ({landed.isoformat()})"
+            })
+        planned.update(
+            options=len(flights),
+            chosen=self._flight_summary(candidates[0]),
+            alternatives=[self._flight_summary(f) for f in candidates[1:3]]
+        )
+        return planned, _time(candidates[0]["arrival"]) or landed
+
+    def _plan_stay(self, leg: int, city: str, result: Dict[str, Any], conflicts: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Choose the cheapest priced hotel of a stay; the best rated one is the alternative."""
+        planned = {"options": 0, "chosen": None, "alternatives": []}
+        options = [o for o in result.get("hotel_options") or [] if _amount(o["price"]) is not None]
+        if not options:
+            reason = str(result["error"]) if "error" in result else "no hotel with rooms for these dates"
+            conflicts.append({"leg": leg, "type": "no_hotel", "message": f"{city}: {reason}"})
+            return planned
+        cheapest = min(options, key=lambda o: _amount(o["price"]))
+        best_rated = min(options, key=lambda o: (-(_amount(o.get("rating")) or 0), _amount(o["price"])))
+        planned.update(
+            options=len(options),
+            chosen=self._hotel_summary(cheapest),
+            alternatives=[self._hotel_summary(best_rated)] if best_rated is not cheapest else []
+        )
+        return planned
+
+    @staticmethod
+    def _nights(start_date: str, end_date: str) -> int:
+        start = datetime.strptime(start_date, "%Y-%m-%d")
+        end = datetime.strptime(end_date, "%Y-%m-%d")
+        nights = (end - start).days
+        if nights < 1:
+            raise ValueError("End date must be after start date")
+        return nights
+
+    def _fan_out(
+        self,
+        hops: List[Tuple[str, str, str]],
+        stays: List[Tuple[str, str, str]],
+        adults: int,
+        hotel_candidates: int,
+        currency: str
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Run every flight search, hotel search and weather request at once.
+
+        Weather, flights and hotel lists go out together, and the hotels of
+        each stay are priced as soon as its list is in. Flight and hotel
+        prices are converted to `currency`. Each task runs in a copy of the
+        caller's context so its spans and progress reports land in this
+        request.
+
+        Args:
+            hops: Flight searches as (origin, destination, date)
+            stays: Hotel stays as (city, check_in, check_out)
+            adults: Number of adult travelers
+            hotel_candidates: Hotels to price per stay
+            currency: Currency to convert every price to
+
+        Returns:
+            Per hop: flights (flight_row, priced in currency) and
+            unconverted (currencies without an exchange rate, whose flights
+            were left out), or error (the exception). Per stay: weather,
+            hotels (how many were found) and hotel_options, or weather and
+            error
+        """
+        workers = max(1, min(get_settings().plan_max_workers, len(hops) + 2 * len(stays)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="travel-plan") as pool:
+            def submit(fn: Callable[..., Any], *args: Any) -> Future:
+                return pool.submit(contextvars.copy_context().run, fn, *args)
+
+            flight_futures = [
+                submit(self.flight_service.search_flights, origin, destination, day, adults)
+                for origin, destination, day in hops
+            ]
+            weather_futures = [
+                submit(self._weather, city, datetime.strptime(check_in, "%Y-%m-%d").date(), self._nights(check_in, check_out))
+                for city, check_in, check_out in stays
+            ]
+            hotel_futures = [
+                submit(partial(
+                    self.hotel_service.search_hotels,
+                    city_code=city,
+                    radius=50,  # Default to 50km radius
+                    hotel_source=HotelSource.ALL
+                ))
+                for city, _, _ in stays
+            ]
+
+            results: List[Dict[str, Any]] = []
+            offer_futures: List[Optional[Future]] = []
+            for (city, check_in, check_out), future in zip(stays, hotel_futures):
+                try:
+                    hotels = future.result()
+                except Exception as e:
+                    logger.warning("Hotel search in %s failed: %s", city, e)
+                    results.append({"error": e})
+                    offer_futures.append(None)
+                    continue
+                results.append({"hotels": len(hotels)})
+                offer_futures.append(submit(
+                    self._priced_hotels, hotels, check_in, check_out, adults, currency, hotel_candidates
+                ))
+
+            flights: List[Dict[str, Any]] = []
+            for (origin, destination, day), future in zip(hops, flight_futures):
+                try:
+                    rows = [flight_row(offer) for offer in future.result()]
+                except Exception as e:
+                    logger.warning("Flight search %s-%s on %s failed: %s", origin, destination, day, e)
+                    flights.append({"error": e})
+                    continue
+                rows, unconverted = self._in_currency(rows, currency)
+                flights.append({"flights": rows, "unconverted": unconverted})
+
+            for (city, _, _), result, future, weather in zip(stays, results, offer_futures, weather_futures):
+                if future is not None:
+                    try:
+                        result["hotel_options"] = future.result()
+                    except Exception as e:
+                        logger.warning("Hotel offers in %s failed: %s", city, e)
+                        result.clear()
+                        result["error"] = e
+                result["weather"] = weather.result()
+        return flights, results
+
+    def _weather(self, destination: str, start: date, nights: int) -> Dict[str, Any]:
+        """Forecast for the stay; WeatherAPI only forecasts 14 days out, then serves single future days."""
+        location = f"iata:{destination}"
+        days_ahead = (start - date.today()).days
+        try:
+            if days_ahead >= 14:
+                return self.weather_service.get_weather(location, date=start.isoformat())
+            return self.weather_service.get_weather(location, days=min(max(days_ahead, 0) + nights + 1, 14))
+        except Exception as e:
+            logger.warning("No weather for %s: %s", destination, e)
+            return {"error": str(e)}
+
+    def _priced_hotels(
+        self,
+        hotels: List[Dict[str, Any]],
+        check_in: str,
+        check_out: str,
+        adults: int,
+        currency: str,
+        candidates: int
+    ) -> List[Dict[str, Any]]:
+        """Price a shortlist of hotels for the stay in `currency`, as options for TripOptimizer."""
+        best_rated, _ = top_hotels(hotels, max(candidates - candidates // 2, 1), "rating")
+        closest, _ = top_hotels(hotels, max(candidates // 2, 1), "distance")
+        by_id = {hotel["hotelId"]: hotel for hotel in best_rated + closest}
+        if not by_id:
+            return []
+        options = []
+        for offer in self.hotel_service.search_hotel_offers(list(by_id), check_in, check_out, adults, currency):
+            hotel = by_id.get(offer["hotelId"], {})
+            options.append({
+                "hotelId": offer["hotelId"],
+                "offerId": offer["offerId"],
+                "name": offer["name"] or hotel.get("name"),
+                "rating": hotel.get("rating"),
+                "distance": hotel.get("distance"),
+                "price": offer["price"]["total"],
+                "currency": offer["price"]["currency"],
+                "check_in": offer["check_in"],
+                "check_out": offer["check_out"]
+            })
+        options, unconverted = self._in_currency(options, currency)
+        if unconverted:
+            logger.warning("No exchange rate for %s; left out hotel offers priced in it", ", ".join(unconverted))
+        return options
+
+    @staticmethod
+    def _plan_currency(currency: Optional[str]) -> str:
+        """The currency to plan in (default: settings.fx_currency), checked against the exchange rates."""
+        currency = (currency or get_settings().fx_currency).upper()
+        table = get_fx_rates().table()
+        if table is not None and currency not in table.index:
+            raise ValueError(f"Unknown currency {currency!r}; exchange rates cover {', '.join(table.codes)}")
+        return currency
+
+    @staticmethod
+    def _in_currency(options: List[Dict[str, Any]], currency: str) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Convert the price column of flight rows or hotel options to `currency` at once.
+
+        Every kept option's price is a float (None if the offer had no
+        usable amount); converted options keep what the offer itself costs
+        as offer_price.
+
+        Returns:
+            The options that could be converted, and the currencies of
+            those that could not (no exchange rate)
+        """
+        converted = get_fx_rates().convert_many(
+            [option["price"] for option in options], [option["currency"] for option in options], currency
+        )
+        kept, unconverted = [], set()
+        for option, price in zip(options, converted.tolist()):
+            if option["currency"] == currency or option["currency"] is None:
+                kept.append({**option, "price": _amount(option["price"])})
+            elif math.isnan(price):
+                unconverted.add(option["currency"])
+            else:
+                kept.append({
+                    **option,
+                    "price": price,
+                    "currency": currency,
+                    "offer_price": {"total": option["price"], "currency": option["currency"]}
+                })
+        return kept, sorted(unconverted)
+
+    @staticmethod
+    def _summarize(option: Dict[str, Any]) -> Dict[str, Any]:
+        """The fields of a trip option a comparison table needs."""
+        return {
+            "total_price": option["total_price"],
+            "remaining_budget": option["remaining_budget"],
+            "flight": TravelPlanService._flight_summary(option["flight"]),
+            "hotel": TravelPlanService._hotel_summary(option["hotel"])
+        }
+
+    @staticmethod
+    def _flight_summary(flight: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": flight.get("id"),
+            "carriers": flight.get("carriers"),
+            "departure": flight.get("departure"),
+            "arrival": flight.get("arrival"),
+            "stops": flight.get("stops"),
+            "duration_minutes": flight.get("duration_minutes"),
+            "price": flight.get("price"),
+            "currency": flight.get("currency"),
+            **({"offer_price": flight["offer_price"]} if flight.get("offer_price") else {})
+        }
+
+    @staticmethod
+    def _hotel_summary(hotel: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "hotelId": hotel.get("hotelId"),
+            "offerId": hotel.get("offerId"),
+            "name": hotel.get("name"),
+            "rating": hotel.get("rating"),
+            "price": hotel.get("price"),
+            "currency": hotel.get("currency"),
+            **({"offer_price": hotel["offer_price"]} if hotel.get("offer_price") else {})
+        }
+
+    @staticmethod
+    def _weather_summary(weather: Dict[str, Any], start_date: str, end_date: str) -> Dict[str, Any]:
+        """Temperature range, rain chance and usual conditions over the stay."""
+        if "error" in weather:
+            return {"error": weather["error"]}
+        forecast = weather.get("forecast") or []
+        days = [forecast] if isinstance(forecast, dict) else [
+            day for day in forecast if start_date <= (day.get("date") or "") <= end_date
+        ]
+        if not days:
+            return {"days": 0}
+        highs = [d["day"]["maxtemp_c"] for d in days if d.get("day", {}).get("maxtemp_c") is not None]
+        lows = [d["day"]["mintemp_c"] for d in days if d.get("day", {}).get("mintemp_c") is not None]
+        rain = [d["day"]["daily_chance_of_rain"] for d in days if d.get("day", {}).get("daily_chance_of_rain") is not None]
+        conditions = Counter(d["day"]["condition"] for d in days if d.get("day", {}).get("condition"))
+        return {
+            "days": len(days),
+            "max_temp_c": max(highs) if highs else None,
+            "min_temp_c": min(lows) if lows else None,
+            "max_chance_of_rain": max(rain) if rain else None,
+            "conditions": [condition for condition, _ in conditions.most_common(2)]
+        }
@@ -0,0 +1,211 @@
+"""
+Best flight + hotel combinations under a budget.
+
+A trip option is one flight offer plus one hotel offer for the whole stay;
+its cost is the sum of the two prices. With a few hundred options on each
+side there are tens of thousands of pairs, so nothing here builds them
+all. Each objective instead sorts both sides once and walks the pairs in
+objective order with a heap (the "k smallest pair sums" join): starting
+from the best flight with the best hotel, each popped pair pushes its two
+neighbours (next flight, next hotel), so returning k options touches
+O(k) pairs plus the over-budget ones on the frontier.
+
+Objectives:
+
+- cheapest: lowest total price
+- fastest: shortest flight (total segment time), then lowest total price
+- best_rated: highest hotel star rating, then lowest total price
+
+The Pareto set (no other option is at least as cheap, as fast and as well
+rated, and strictly better on one) is built from the Pareto-optimal
+flights (price, duration) and hotels (price, rating) alone, since any
+option using a dominated flight or hotel is itself dominated.
+"""
+import heapq
+import logging
+import math
+from bisect import bisect_right
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger('travel_agent')
+
+OBJECTIVES = ("cheapest", "fastest", "best_rated")
+
+
+def _price(option: Dict[str, Any]) -> Optional[float]:
+    try:
+        price = float(option.get("price"))
+    except (TypeError, ValueError):
+        return None
+    return price if math.isfinite(price) and price >= 0 else None
+
+
+def _minutes(flight: Dict[str, Any]) -> float:
+    minutes = flight.get("duration_minutes")
+    return float(minutes) if minutes else math.inf
+
+
+def _stars(hotel: Dict[str, Any]) -> float:
+    try:
+        return float(hotel.get("rating") or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class TripOptimizer:
+    """Ranks flight + hotel pairs within a budget without enumerating them all."""
+
+    def __init__(self, flights: List[Dict[str, Any]], hotels: List[Dict[str, Any]], budget: Optional[float] = None):
+        """
+        Args:
+            flights: Flight options, each with price (total for all travellers)
+                     and duration_minutes (see working_set.flight_row)
+            hotels: Hotel options, each with price (total for the stay) and rating
+            budget: Maximum total price (None for no limit)
+
+        Options without a usable price are left out, and so are options that
+        exceed the budget even with the cheapest option on the other side.
+        """
+        self.budget = math.inf if budget is None else float(budget)
+        flights = [(price, flight) for flight in flights for price in [_price(flight)] if price is not None]
+        hotels = [(price, hotel) for hotel in hotels for price in [_price(hotel)] if price is not None]
+        cheapest_flight = min((price for price, _ in flights), default=math.inf)
+        cheapest_hotel = min((price for price, _ in hotels), default=math.inf)
+
+        # Columns, one entry per remaining option
+        self.flights = [flight for price, flight in flights if price + cheapest_hotel <= self.budget]
+        self.flight_prices = [price for price, _ in flights if price + cheapest_hotel <= self.budget]
+        self.flight_minutes = [_minutes(flight) for flight in self.flights]
+        self.hotels = [hotel for price, hotel in hotels if price + cheapest_flight <= self.budget]
+        self.hotel_prices = [price for price, _ in hotels if price + cheapest_flight <= self.budget]
+        self.hotel_stars = [_stars(hotel) for hotel in self.hotels]
+        logger.debug(
+            "Trip optimizer: %s of %s flights and %s of %s hotels fit a budget of %s",
+            len(self.flights), len(flights), len(self.hotels), len(hotels), self.budget
+        )
+
+    def count_within_budget(self) -> int:
+        """Number of flight + hotel pairs that fit the budget, counted per flight by bisection."""
+        hotel_prices = sorted(self.hotel_prices)
+        return sum(bisect_right(hotel_prices, self.budget - price) for price in self.flight_prices)
+
+    def best(self, objective: str = "cheapest", limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        The `limit` best options for an objective.
+
+        Args:
+            objective: 'cheapest', 'fastest' or 'best_rated'
+            limit: Number of options to return
+
+        Returns:
+            Best first; see _option for the fields
+
+        Raises:
+            ValueError: For an unknown objective
+        """
+        fp, fm, hp, hs = self.flight_prices, self.flight_minutes, self.hotel_prices, self.hotel_stars
+        if objective == "cheapest":
+            flights = sorted(range(len(fp)), key=lambda i: (fp[i], i))
+            hotels = sorted(range(len(hp)), key=lambda j: (hp[j], j))
+            key = lambda i, j: (fp[i] + hp[j],)
+        elif objective == "fastest":
+            flights = sorted(range(len(fp)), key=lambda i: (fm[i], fp[i], i))
+            hotels = sorted(range(len(hp)), key=lambda j: (hp[j], j))
+            key = lambda i, j: (fm[i], fp[i] + hp[j])
+        elif objective == "best_rated":
+            flights = sorted(range(len(fp)), key=lambda i: (fp[i], i))
+            hotels = sorted(range(len(hp)), key=lambda j: (-hs[j], hp[j], j))
+            key = lambda i, j: (-hs[j], fp[i] + hp[j])
+        else:
+            raise ValueError(f"Unknown objective {objective!r}, expected one of {list(OBJECTIVES)}")
+        pairs = self._join(
+            flights, hotels, key, limit,
+            flights_by_price=objective != "fastest",
+            hotels_by_price=objective != "best_rated"
+        )
+        return [self._option(i, j) for i, j in pairs]
+
+    def _join(
+        self,
+        flights: List[int],
+        hotels: List[int],
+        key: Callable[[int, int], Tuple],
+        limit: int,
+        flights_by_price: bool,
+        hotels_by_price: bool
+    ) -> List[Tuple[int, int]]:
+        """
+        Heap-ordered walk over (flight rank, hotel rank) pairs.
+
+        `key` must not decrease along either list, so pairs pop in key
+        order. When a side is sorted by price, an over-budget pair's next
+        option on that side is over budget too and is not pushed; the other
+        side keeps expanding, since a later option there can be cheaper.
+        """
+        if not flights or not hotels or limit <= 0:
+            return []
+        fp, hp, budget = self.flight_prices, self.hotel_prices, self.budget
+        heap = [(key(flights[0], hotels[0]), 0, 0)]
+        seen = {(0, 0)}
+        found = []
+        while heap and len(found) < limit:
+            _, a, b = heapq.heappop(heap)
+            i, j = flights[a], hotels[b]
+            fits = fp[i] + hp[j] <= budget
+            if fits:
+                found.append((i, j))
+            elif flights_by_price and hotels_by_price:
+                break  # popped in price order: everything left is dearer
+            for next_a, next_b, by_price in ((a + 1, b, flights_by_price), (a, b + 1, hotels_by_price)):
+                if next_a < len(flights) and next_b < len(hotels) and (fits or not by_price) and (next_a, next_b) not in seen:
+                    seen.add((next_a, next_b))
+                    heapq.heappush(heap, (key(flights[next_a], hotels[next_b]), next_a, next_b))
+        return found
+
+    def pareto(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        The options no other option beats on price, flight time and hotel rating at once.
+
+        Args:
+            limit: Return at most this many (cheapest first)
+
+        Returns:
+            Cheapest first; see _option for the fields
+        """
+        fp, fm, hp, hs = self.flight_prices, self.flight_minutes, self.hotel_prices, self.hotel_stars
+        flights = self._staircase(range(len(fp)), lambda i: (fp[i], fm[i]))
+        hotels = self._staircase(range(len(hp)), lambda j: (hp[j], -hs[j]))
+        candidates = sorted(
+            ((fp[i] + hp[j], fm[i], -hs[j], i, j) for i in flights for j in hotels if fp[i] + hp[j] <= self.budget)
+        )
+        # Sorted by price, so an option is dominated only by one already kept
+        kept: List[Tuple[float, float, float, int, int]] = []
+        for candidate in candidates:
+            _, minutes, stars, _, _ = candidate
+            if not any(k[1] <= minutes and k[2] <= stars for k in kept):
+                kept.append(candidate)
+                if limit is not None and len(kept) >= limit:
+                    break
+        return [self._option(i, j) for _, _, _, i, j in kept]
+
+    @staticmethod
+    def _staircase(positions: Any, key: Callable[[int], Tuple[float, float]]) -> List[int]:
+        """Positions not dominated on a (price, other) key where lower is better on both."""
+        front = []
+        best_other = math.inf
+        for position in sorted(positions, key=key):
+            other = key(position)[1]
+            if not front or other < best_other:
+                front.append(position)
+                best_other = other
+        return front
+
+    def _option(self, i: int, j: int) -> Dict[str, Any]:
+        """One flight + hotel option: both options as given, total_price and remaining_budget."""
+        total = self.flight_prices[i] + self.hotel_prices[j]
+        return {
+            "flight": self.flights[i],
+            "hotel": self.hotels[j],
+            "total_price": round(total, 2),
+            "remaining_budget": round(self.budget - total, 2) if math.isfinite(self.budget) else None
+        }
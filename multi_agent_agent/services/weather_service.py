@@ -1,10 +1,13 @@
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 from .weatherapi_client import WeatherAPIClient
+from .schemas import CurrentWeatherResponse, ForecastResponse
+from ..observability.tracing import traced
 
 class WeatherService(WeatherAPIClient):
     """Service for weather-related operations."""
     
+    @traced()
     def get_weather(self, location: str, date: Optional[str] = None, days: int = 7, aqi: str = "no") -> Dict[str, Any]:
         """
         Get weather forecast for a location.
@@ -25,7 +28,7 @@ class WeatherService(WeatherAPIClient):
                 "q": location,
                 "dt": date
             }
-            response = self._make_request("GET", "/future.json", params)
+            response = self._make_request("GET", "/future.json", params, schema=ForecastResponse)
             return self._parse_future_weather(response)
         else:
             # For forecast within next 14 days
@@ -34,9 +37,10 @@ class WeatherService(WeatherAPIClient):
                 "days": min(max(1, days), 14),  # Ensure days is between 1 and 14
                 "aqi": aqi
             }
-            response = self._make_request("GET", "/forecast.json", params)
+            response = self._make_request("GET", "/forecast.json", params, schema=ForecastResponse)
             return self._parse_forecast(response)
     
+    @traced()
     def get_current_weather(self, location: str) -> Dict[str, Any]:
         """
         Get current weather conditions for a location.
@@ -50,7 +54,7 @@ class WeatherService(WeatherAPIClient):
             Dictionary containing current weather conditions
         """
         params = {"q": location}
-        response = self._make_request("GET", "/current.json", params)
+        response = self._make_request("GET", "/current.json", params, schema=CurrentWeatherResponse)
         return self._parse_current_weather(response)
     
     def _parse_forecast(self, response: Dict[str, Any]) -> Dict[str, Any]:
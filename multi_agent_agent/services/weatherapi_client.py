@@ -1,4 +1,4 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from .base_client import BaseAPIClient
 
 class WeatherAPIClient(BaseAPIClient):
@@ -8,10 +8,11 @@ class WeatherAPIClient(BaseAPIClient):
     def base_url(self) -> str:
         return self.settings.weather_api_base_url
     
-    def _make_request(self, method: str, endpoint: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+    def _make_request(self, method: str, endpoint: str, params: Dict[str, Any] = None, schema: Optional[Any] = None) -> Dict[str, Any]:
         """Make a request to the WeatherAPI."""
         if params is None:
             params = {}
         params["key"] = self.settings.weather_api_key
         
-        return super()._make_request(method, endpoint, params=params)
\ No newline at end of file
+        # Forecasts are the same for every user, so responses are shared through the upstream cache
+        return super()._make_request(method, endpoint, params=params, schema=schema, cache=True)
\ No newline at end of file
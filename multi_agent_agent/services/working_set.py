@@ -0,0 +1,380 @@
+from typing import Dict, List, Any, Iterable, Iterator, Optional, MutableMapping
+import logging
+import re
+import uuid
+from datetime import datetime, timezone
+from .hotel_index import get_hotel_index
+
+logger = logging.getLogger('travel_agent')
+
+FLIGHTS_KEY = "working_set:flights"
+HOTELS_KEY = "working_set:hotels"
+
+FLIGHT_SORT_KEYS = {"price", "stops", "duration", "departure"}
+HOTEL_SORT_KEYS = {"rating", "distance", "name"}
+
+_DURATION_RE = re.compile(r"^P(?:(\d+)D)?T?(?:(\d+)H)?(?:(\d+)M)?")
+
+
+def parse_duration_minutes(duration: Optional[str]) -> Optional[int]:
+    """Convert an ISO 8601 duration such as 'PT2H35M' to minutes."""
+    if not duration:
+        return None
+    match = _DURATION_RE.match(duration)
+    if not match or not any(match.groups()):
+        return None
+    days, hours, minutes = (int(g or 0) for g in match.groups())
+    return days * 1440 + hours * 60 + minutes
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _leg(segments: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Stops, times and flying time of one itinerary (outbound, return or one multi-city leg)."""
+    durations = [parse_duration_minutes(s.get("duration")) for s in segments]
+    return {
+        "stops": max(len(segments) - 1, 0) + sum(s.get("stops") or 0 for s in segments),
+        "departure": segments[0].get("departure", {}).get("time") if segments else None,
+        "arrival": segments[-1].get("arrival", {}).get("time") if segments else None,
+        "duration_minutes": sum(d for d in durations if d) if any(durations) else None
+    }
+
+
+def flight_row(offer: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Flatten a simplified flight offer into the fields follow-up queries use.
+
+    Offers with several itineraries (round trips, multi-city) are summarized
+    per itinerary in legs. Departure and arrival are those of the first leg;
+    stops and duration_minutes are the most of any leg, so "nonstop" means
+    nonstop in every direction.
+    """
+    segments = offer.get("segments", [])
+    itineraries: Dict[int, List[Dict[str, Any]]] = {}
+    for segment in segments:
+        itineraries.setdefault(segment.get("itinerary", 0), []).append(segment)
+    legs = [_leg(itineraries[index]) for index in sorted(itineraries)] or [_leg([])]
+    durations = [leg["duration_minutes"] for leg in legs if leg["duration_minutes"] is not None]
+    row = {
+        "id": offer.get("id"),
+        "price": _to_float(offer.get("price", {}).get("total")),
+        "currency": offer.get("price", {}).get("currency"),
+        "normalized_price": (offer.get("normalized_price") or {}).get("total"),
+        "stops": max(leg["stops"] for leg in legs),
+        "carriers": sorted({s.get("carrier", {}).get("code") for s in segments if s.get("carrier", {}).get("code")}),
+        "flight_numbers": [
+            f"{s.get('carrier', {}).get('code')}{s.get('flight_number')}" for s in segments
+        ],
+        "departure": legs[0]["departure"],
+        "arrival": legs[0]["arrival"],
+        "duration_minutes": max(durations) if durations else None,
+        "seats_available": offer.get("seats_available"),
+        "last_ticketing_date": offer.get("last_ticketing_date")
+    }
+    if len(legs) > 1:
+        row["legs"] = legs
+    return row
+
+
+def hotel_row(hotel: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten a simplified hotel into the fields follow-up queries use."""
+    return {
+        "hotelId": hotel.get("hotelId"),
+        "name": hotel.get("name"),
+        "rating": _to_float(hotel.get("rating")),
+        "distance": _to_float((hotel.get("distance") or {}).get("value")),
+        "distance_unit": (hotel.get("distance") or {}).get("unit"),
+        "chainCode": hotel.get("chainCode"),
+        "amenities": hotel.get("amenities") or [],
+        "city": (hotel.get("address") or {}).get("cityName")
+    }
+
+
+def cached_hotel(hotel: Dict[str, Any]) -> Dict[str, Any]:
+    """The fields of a simplified hotel that follow-up filters and ranking read, in the same shape."""
+    return {
+        "hotelId": hotel.get("hotelId"),
+        "name": hotel.get("name"),
+        "iataCode": hotel.get("iataCode"),
+        "distance": hotel.get("distance"),
+        "address": {"cityName": (hotel.get("address") or {}).get("cityName")},
+        "chainCode": hotel.get("chainCode"),
+        "amenities": hotel.get("amenities") or [],
+        "rating": hotel.get("rating")
+    }
+
+
+def collect_hotels(hotels: Iterable[Dict[str, Any]], into: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Pass a hotel stream through unchanged, adding each hotel's cached_hotel to `into`."""
+    for hotel in hotels:
+        into.append(cached_hotel(hotel))
+        yield hotel
+
+
+def _project(row: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+    if not fields:
+        return row
+    return {field: row.get(field) for field in fields if field in row}
+
+
+def _sort_value(row: Dict[str, Any], sort_by: str) -> Any:
+    value = row.get(sort_by if sort_by != "duration" else "duration_minutes")
+    # Missing values always sort last
+    return (value is None, value if value is not None else 0)
+
+
+class WorkingSet:
+    """
+    Per-session working set of the last flight and hotel results.
+
+    Results live in the ADK session state, so follow-up questions such as
+    "only nonstop" or "4-star hotels with a pool" can be answered by
+    filtering, sorting and projecting them locally instead of calling
+    Amadeus again. Queries the stored results cannot answer (different
+    route, date or city, or nothing stored yet) come back with
+    needs_search=True so the caller knows to search again.
+    """
+
+    def __init__(self, state: MutableMapping[str, Any]):
+        self.state = state
+
+    def remember_flights(self, query: Dict[str, Any], offers: List[Dict[str, Any]]) -> None:
+        """Store the latest flight search and its offers."""
+        self.state[FLIGHTS_KEY] = {
+            "query": query,
+            "results": offers,
+            "stored_at": datetime.now(timezone.utc).isoformat()
+        }
+        logger.debug("Working set stored %s flight offers for %s", len(offers), query)
+
+    def remember_hotels(self, query: Dict[str, Any], hotels: List[Dict[str, Any]]) -> None:
+        """Store the latest hotel search and its hotels."""
+        self.state[HOTELS_KEY] = {
+            "query": query,
+            "results": hotels,
+            # Names the in-process index of these results (see hotel_index)
+            "index_id": uuid.uuid4().hex,
+            "stored_at": datetime.now(timezone.utc).isoformat()
+        }
+        logger.debug("Working set stored %s hotels for %s", len(hotels), query)
+
+    def query_flights(
+        self,
+        origin: Optional[str] = None,
+        destination: Optional[str] = None,
+        date: Optional[str] = None,
+        max_price: Optional[float] = None,
+        max_stops: Optional[int] = None,
+        carriers: Optional[List[str]] = None,
+        max_duration_minutes: Optional[int] = None,
+        sort_by: str = "price",
+        fields: Optional[List[str]] = None,
+        limit: int = 10
+    ) -> Dict[str, Any]:
+        """
+        Filter, sort and project the stored flight offers.
+
+        Args:
+            origin: Expected origin of the stored search (checked, not filtered)
+            destination: Expected destination of the stored search
+            date: Expected departure date of the stored search
+            max_price: Maximum total price
+            max_stops: Maximum number of stops on any leg (0 for nonstop)
+            carriers: Allowed 2-letter carrier codes
+            max_duration_minutes: Maximum flying time of any leg
+            sort_by: One of price, stops, duration, departure
+            fields: Optional list of fields to return per offer
+            limit: Maximum number of offers to return
+
+        Returns:
+            Dictionary with matching rows, or needs_search=True with a reason
+        """
+        stored = self.state.get(FLIGHTS_KEY)
+        mismatch = self._mismatch(stored, {
+            "origin": origin, "destination": destination, "date": date
+        })
+        if mismatch:
+            return {"needs_search": True, "reason": mismatch}
+        if sort_by not in FLIGHT_SORT_KEYS:
+            return {"error": f"sort_by must be one of {sorted(FLIGHT_SORT_KEYS)}"}
+
+        wanted_carriers = {c.upper() for c in carriers} if carriers else None
+        rows = []
+        for offer in stored["results"]:
+            row = flight_row(offer)
+            if max_price is not None and (row["price"] is None or row["price"] > max_price):
+                continue
+            if max_stops is not None and row["stops"] > max_stops:
+                continue
+            if wanted_carriers and not set(row["carriers"]) <= wanted_carriers:
+                continue
+            if max_duration_minutes is not None and (
+                row["duration_minutes"] is None or row["duration_minutes"] > max_duration_minutes
+            ):
+                continue
+            rows.append(row)
+
+        rows.sort(key=lambda row: _sort_value(row, sort_by))
+        return {
+            "source": "working_set",
+            "query": stored["query"],
+            "total_cached": len(stored["results"]),
+            "total_matches": len(rows),
+            "results": [_project(row, fields) for row in rows[:limit]]
+        }
+
+    def query_hotels(
+        self,
+        city_code: Optional[str] = None,
+        min_rating: Optional[float] = None,
+        amenities: Optional[List[str]] = None,
+        max_distance: Optional[float] = None,
+        chain_codes: Optional[List[str]] = None,
+        sort_by: str = "rating",
+        fields: Optional[List[str]] = None,
+        limit: int = 10
+    ) -> Dict[str, Any]:
+        """
+        Filter, sort and project the stored hotels.
+
+        Args:
+            city_code: Expected city of the stored search (checked, not filtered)
+            min_rating: Minimum star rating
+            amenities: Amenities every hotel must have (e.g. SWIMMING_POOL)
+            max_distance: Maximum distance from the city centre
+            chain_codes: Allowed 2-letter chain codes
+            sort_by: One of rating (highest first), distance, name
+            fields: Optional list of fields to return per hotel
+            limit: Maximum number of hotels to return
+
+        Returns:
+            Dictionary with matching rows, or needs_search=True with a reason
+        """
+        stored = self.state.get(HOTELS_KEY)
+        mismatch = self._mismatch(stored, {"city_code": city_code})
+        if mismatch:
+            return {"needs_search": True, "reason": mismatch}
+        if sort_by not in HOTEL_SORT_KEYS:
+            return {"error": f"sort_by must be one of {sorted(HOTEL_SORT_KEYS)}"}
+
+        searched_ratings = stored["query"].get("ratings")
+        if min_rating is not None and searched_ratings:
+            wanted_ratings = {str(r) for r in range(1, 6) if r >= min_rating}
+            if not wanted_ratings <= {str(r) for r in searched_ratings}:
+                return {
+                    "needs_search": True,
+                    "reason": f"Cached hotels were limited to ratings {searched_ratings}; run a new search"
+                }
+
+        index = get_hotel_index(stored.get("index_id"), stored["results"])
+
+        # Amenities the stored search already filtered on hold for every hotel
+        searched_amenities = {a.upper() for a in stored["query"].get("amenities") or []}
+        wanted_amenities = {a.upper() for a in amenities or []} - searched_amenities
+        if wanted_amenities and not index.has_amenity_data():
+            return {
+                "needs_search": True,
+                "reason": "Cached hotels carry no amenity data; search again with an amenities filter"
+            }
+        wanted_chains = {c.upper() for c in chain_codes} if chain_codes else None
+        searched_chains = stored["query"].get("chain_codes")
+        if wanted_chains and searched_chains and not wanted_chains <= {c.upper() for c in searched_chains}:
+            return {
+                "needs_search": True,
+                "reason": f"Cached hotels were limited to chains {searched_chains}; run a new search"
+            }
+
+        positions = index.select(
+            amenities=wanted_amenities,
+            min_rating=min_rating,
+            chain_codes=wanted_chains,
+            max_distance=max_distance
+        )
+        rows = [hotel_row(stored["results"][position]) for position in positions]
+
+        if sort_by == "rating":
+            rows.sort(key=lambda row: (row["rating"] is None, -(row["rating"] or 0)))
+        else:
+            rows.sort(key=lambda row: _sort_value(row, sort_by))
+        return {
+            "source": "working_set",
+            "query": stored["query"],
+            "total_cached": len(stored["results"]),
+            "total_matches": len(rows),
+            "results": [_project(row, fields) for row in rows[:limit]]
+        }
+
+    def rank_hotels(
+        self,
+        city_code: Optional[str] = None,
+        amenities: Optional[List[str]] = None,
+        min_rating: Optional[float] = None,
+        max_distance: Optional[float] = None,
+        weights: Optional[Dict[str, float]] = None,
+        prices_per_night: Optional[Dict[str, float]] = None,
+        limit: int = 5
+    ) -> Dict[str, Any]:
+        """
+        Score the stored hotels and return the best, with the reason for each score.
+
+        Args:
+            city_code: Expected city of the stored search (checked, not filtered)
+            amenities: Amenities the traveller wants; scored, not required
+            min_rating: Minimum star rating (required)
+            max_distance: Maximum distance from the city centre (required)
+            weights: Component weights for distance, rating, amenities, price (see hotel_scoring)
+            prices_per_night: Price per night by hotel ID, where known
+            limit: Maximum number of hotels to return
+
+        Returns:
+            Dictionary with ranked rows, or needs_search=True with a reason
+        """
+        # NumPy is only loaded once hotels are actually ranked
+        from .hotel_scoring import rank_hotels
+
+        stored = self.state.get(HOTELS_KEY)
+        mismatch = self._mismatch(stored, {"city_code": city_code})
+        if mismatch:
+            return {"needs_search": True, "reason": mismatch}
+
+        index = get_hotel_index(stored.get("index_id"), stored["results"])
+        if amenities and not index.has_amenity_data():
+            return {
+                "needs_search": True,
+                "reason": "Cached hotels carry no amenity data; search again with an amenities filter"
+            }
+        positions = index.select(min_rating=min_rating, max_distance=max_distance)
+        try:
+            ranked = rank_hotels(
+                stored["results"], limit, weights, amenities, prices_per_night, index=index, positions=positions
+            )
+        except ValueError as e:
+            return {"error": str(e)}
+        return {
+            "source": "working_set",
+            "query": stored["query"],
+            "total_cached": len(stored["results"]),
+            "total_matches": len(positions),
+            "results": [
+                {**hotel_row(hotel), **{key: hotel[key] for key in ("score", "score_components", "why")}}
+                for hotel in ranked
+            ]
+        }
+
+    @staticmethod
+    def _mismatch(stored: Optional[Dict[str, Any]], expected: Dict[str, Optional[str]]) -> Optional[str]:
+        """Explain why the stored results cannot answer a query, if they cannot."""
+        if not stored:
+            return "No cached results in this session; run a search first"
+        for key, value in expected.items():
+            if value is None:
+                continue
+            cached = stored["query"].get(key)
+            if cached is not None and str(cached).upper() != str(value).upper():
+                return f"Cached results are for {key}={cached}, not {value}; run a new search"
+        return None
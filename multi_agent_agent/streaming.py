@@ -0,0 +1,196 @@
+import asyncio
+import contextvars
+import logging
+import queue
+import threading
+import uuid
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+from .observability.tracing import span
+
+logger = logging.getLogger('travel_agent')
+
+APP_NAME = "travel_agent"
+
+# Callback that receives progress events for the stream currently being served
+_progress_sink: contextvars.ContextVar[Optional[Callable[[Dict[str, Any]], None]]] = (
+    contextvars.ContextVar("travel_agent_progress_sink", default=None)
+)
+
+_session_service = InMemorySessionService()
+_runners: Dict[str, Runner] = {}
+_runners_lock = threading.Lock()
+
+
+def report_progress(message: str, **data: Any) -> None:
+    """
+    Report tool progress to the stream currently being served.
+
+    Tools call this with short human-readable updates such as
+    "Searching flights JFK → LHR...". It is a no-op when the agent is not
+    being streamed, so tools can call it unconditionally.
+
+    Args:
+        message: Progress text shown to the user
+        **data: Optional structured details (e.g. done=3, total=5)
+    """
+    sink = _progress_sink.get()
+    if sink is None:
+        return
+    event = {"type": "progress", "text": message}
+    if data:
+        event["data"] = data
+    sink(event)
+
+
+def _get_runner(agent) -> Runner:
+    """Get (or build) the runner used to stream an agent."""
+    with _runners_lock:
+        runner = _runners.get(agent.name)
+        if runner is None:
+            runner = Runner(app_name=APP_NAME, agent=agent, session_service=_session_service)
+            _runners[agent.name] = runner
+        return runner
+
+
+async def _ensure_session(user_id: str, session_id: str) -> None:
+    session = await _session_service.get_session(
+        app_name=APP_NAME, user_id=user_id, session_id=session_id
+    )
+    if session is None:
+        await _session_service.create_session(
+            app_name=APP_NAME, user_id=user_id, session_id=session_id
+        )
+
+
+def _convert_event(event, streamed_text: bool) -> Iterator[Dict[str, Any]]:
+    """Translate an ADK event into the stream event dictionaries we emit."""
+    for call in event.get_function_calls():
+        yield {"type": "tool_call", "author": event.author, "name": call.name, "args": dict(call.args or {})}
+    for response in event.get_function_responses():
+        yield {"type": "tool_result", "author": event.author, "name": response.name}
+
+    text = ""
+    if event.content and event.content.parts:
+        text = "".join(part.text for part in event.content.parts if part.text and not part.thought)
+    if text and event.partial:
+        yield {"type": "token", "author": event.author, "text": text}
+    elif event.is_final_response():
+        yield {"type": "final", "author": event.author, "text": text, "streamed": streamed_text}
+
+
+async def stream_agent(
+    agent,
+    user_input: str,
+    user_id: str = "user",
+    session_id: Optional[str] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run an agent turn and yield events as they arrive.
+
+    Args:
+        agent: The root agent to run
+        user_input: The user's message
+        user_id: User identifier for the session
+        session_id: Session to continue; a new one is created when omitted
+
+    Yields:
+        Event dictionaries with a "type" of "token", "tool_call",
+        "tool_result", "progress" or "final"
+    """
+    session_id = session_id or uuid.uuid4().hex
+    runner = _get_runner(agent)
+    await _ensure_session(user_id, session_id)
+
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+    done = object()
+
+    def sink(event: Dict[str, Any]) -> None:
+        # Tools may run on worker threads, so always hop back onto the loop
+        loop.call_soon_threadsafe(events.put_nowait, event)
+
+    async def pump() -> None:
+        streamed_text = False
+        total_tokens = 0
+        message = types.Content(role="user", parts=[types.Part(text=user_input)])
+        try:
+            with span("agent.turn", agent=agent.name, session_id=session_id, input_chars=len(user_input)) as turn_span:
+                async for event in runner.run_async(
+                    user_id=user_id,
+                    session_id=session_id,
+                    new_message=message,
+                    run_config=RunConfig(streaming_mode=StreamingMode.SSE)
+                ):
+                    if event.usage_metadata and not event.partial:
+                        total_tokens += event.usage_metadata.total_token_count or 0
+                    for converted in _convert_event(event, streamed_text):
+                        if converted["type"] == "token":
+                            streamed_text = True
+                        elif converted["type"] == "final":
+                            streamed_text = False
+                            converted["usage"] = {"total_tokens": total_tokens}
+                        await events.put(converted)
+                turn_span.set(total_tokens=total_tokens)
+        except Exception as e:
+            await events.put(e)
+        finally:
+            await events.put(done)
+
+    token = _progress_sink.set(sink)
+    try:
+        task = asyncio.create_task(pump())
+    finally:
+        _progress_sink.reset(token)
+
+    try:
+        while True:
+            item = await events.get()
+            if item is done:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+def iter_agent_stream(
+    agent,
+    user_input: str,
+    user_id: str = "user",
+    session_id: Optional[str] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Synchronous wrapper around stream_agent for blocking callers.
+
+    The turn runs on its own event loop in a background thread and events
+    are handed over through a queue as soon as they are produced.
+    """
+    handoff: queue.Queue = queue.Queue()
+    done = object()
+
+    async def consume() -> None:
+        async for event in stream_agent(agent, user_input, user_id=user_id, session_id=session_id):
+            handoff.put(event)
+
+    def worker() -> None:
+        try:
+            asyncio.run(consume())
+        except Exception as e:
+            handoff.put(e)
+        finally:
+            handoff.put(done)
+
+    threading.Thread(target=worker, name="agent-stream", daemon=True).start()
+    while True:
+        item = handoff.get()
+        if item is done:
+            break
+        if isinstance(item, Exception):
+            raise item
+        yield item
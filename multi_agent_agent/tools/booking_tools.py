@@ -1,62 +1,51 @@
 from typing import Dict, Any, Optional
-from datetime import datetime
+import logging
+from google.adk.tools import ToolContext
+from ..services.booking_service import get_booking_service
+from ..observability.tracing import traced
 
+logger = logging.getLogger('travel_agent')
+
+@traced("tool.simulate_booking", measure_result=True)
 def simulate_booking(
     flight_id: Optional[str] = None,
     hotel_id: Optional[str] = None,
     guests: int = 1,
-    payment_method: str = "credit_card"
+    payment_method: str = "credit_card",
+    idempotency_key: Optional[str] = None,
+    tool_context: Optional[ToolContext] = None
 ) -> Dict[str, Any]:
     """
     Simulate a travel booking process.
-    
+
+    Prices come from the offers returned by earlier searches, so only book
+    offer IDs the user has actually been shown. Calling again with the same
+    idempotency_key returns the original booking instead of booking twice.
+
     Args:
         flight_id: Optional flight offer ID to book
         hotel_id: Optional hotel offer ID to book
         guests: Number of guests (default: 1)
         payment_method: Payment method to simulate (default: credit_card)
-        
+        idempotency_key: Optional key identifying this booking request
+
     Returns:
-        Dictionary containing booking simulation results
+        Dictionary containing booking simulation results or error message
     """
-    booking_ref = f"BK{datetime.now().strftime('%Y%m%d%H%M%S')}"
-    
-    booking_items = []
-    total_price = 0.0
-    
-    if flight_id:
-        flight_price = 500.00  # Simulated price
-        booking_items.append({
-            "type": "flight",
-            "id": flight_id,
-            "price": flight_price,
-            "guests": guests
-        })
-        total_price += flight_price * guests
-    
-    if hotel_id:
-        hotel_price = 200.00  # Simulated price per night
-        nights = 1  # Simulated duration
-        booking_items.append({
-            "type": "hotel",
-            "id": hotel_id,
-            "price_per_night": hotel_price,
-            "nights": nights,
-            "guests": guests
-        })
-        total_price += hotel_price * nights * guests
-    
-    return {
-        "booking_reference": booking_ref,
-        "status": "confirmed",
-        "items": booking_items,
-        "total_price": total_price,
-        "currency": "USD",
-        "guests": guests,
-        "payment": {
-            "method": payment_method,
-            "status": "simulated",
-            "amount": total_price
-        },
-        "note": "(This is a simulated booking - no actual reservations or charges were made)"
-    } 
\ No newline at end of file
+    if idempotency_key is None and tool_context is not None:
+        # Without an explicit key, a repeated identical call in the same turn is a retry
+        idempotency_key = (
+            f"{tool_context.invocation_id}:{flight_id}:{hotel_id}:{guests}:{payment_method}"
+        )
+
+    try:
+        return get_booking_service().book(
+            flight_id=flight_id,
+            hotel_id=hotel_id,
+            guests=guests,
+            payment_method=payment_method,
+            idempotency_key=idempotency_key
+        )
+    except Exception as e:
+        logger.error("Error in simulate_booking: %s", e, exc_info=True)
+        return {"error": f"Booking failed: {str(e)}"}
@@ -1,5 +1,7 @@
 import datetime
+from ..observability.tracing import traced
 
+@traced("tool.get_current_datetime", measure_result=True)
 def get_current_datetime() -> str:
     """
     Returns the current date and time in ISO 8601 format (YYYY-MM-DDTHH:MM:SSZ).
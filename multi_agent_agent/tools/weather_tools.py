@@ -1,6 +1,9 @@
 from typing import Dict, Any, Optional
 from ..services import WeatherService
+from ..streaming import report_progress
+from ..observability.tracing import traced
 
+@traced("tool.get_weather", measure_result=True)
 def get_weather(location: str, date: Optional[str] = None, days: int = 7) -> Dict[str, Any]:
     """
     Get detailed weather data for a location.
@@ -22,6 +25,7 @@ def get_weather(location: str, date: Optional[str] = None, days: int = 7) -> Dic
         - Daily forecasts (temperature, precipitation chances, conditions)
         - Astronomical data (sunrise, sunset, moon phase)
     """
+    report_progress(f"Checking weather for {location}...")
     try:
         weather_service = WeatherService()
         return weather_service.get_weather(location, date, days)
@@ -1,52 +1,150 @@
 from google.adk.agents import Agent
 import logging
-from google.adk.tools import google_search
-from google.adk.tools import agent_tool
+import threading
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
 from .config.agent_config import AGENT_CONFIG       
+from .config import get_settings
 from .config.logging_config import setup_logging
-from .tools import (
-    get_flight_offers,
-    get_hotel_offers,
-    simulate_booking,
-    get_weather,
-    get_current_datetime
-)
+from .observability.tracing import span
+from .streaming import stream_agent, iter_agent_stream
 
 # Setup logger
 logger = setup_logging()
 
 class TravelAgent(Agent):
     def run(self, user_input: str) -> str:
-        logger.info(f"Received user input: {user_input}")
+        logger.info("Received user input: %s", user_input)
         try:
-            response = super().run(user_input)
+            with span("agent.turn", agent=self.name, input_chars=len(user_input)):
+                response = super().run(user_input)
             logger.info("Successfully processed user request")
-            logger.debug(f"Agent response: {response}")
+            logger.debug("Agent response: %s", response)
             return response
         except Exception as e:
-            logger.error(f"Error processing request: {str(e)}", exc_info=True)
+            logger.error("Error processing request: %s", e, exc_info=True)
             raise
 
-search_agent = Agent(
-    model=AGENT_CONFIG['search']['model'],
-    name='SearchAgent',
-    instruction=AGENT_CONFIG['search']['instruction'],
-    tools=[google_search],
-)
-
-root_agent = TravelAgent(
-    name="travel_services_agent",
-    model=AGENT_CONFIG['root']['model'],
-    description=AGENT_CONFIG['root']['description'],
-    instruction=AGENT_CONFIG['root']['instruction'],
-    tools=[
+    async def astream(self, user_input: str, session_id: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Run a turn and yield token, tool and progress events as they arrive."""
+        logger.info("Received user input (streaming): %s", user_input)
+        try:
+            async for event in stream_agent(self, user_input, session_id=session_id):
+                yield event
+            logger.info("Successfully streamed user request")
+        except Exception as e:
+            logger.error("Error streaming request: %s", e, exc_info=True)
+            raise
+
+    def stream(self, user_input: str, session_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Blocking iterator over the same events as astream."""
+        logger.info("Received user input (streaming): %s", user_input)
+        try:
+            yield from iter_agent_stream(self, user_input, session_id=session_id)
+            logger.info("Successfully streamed user request")
+        except Exception as e:
+            logger.error("Error streaming request: %s", e, exc_info=True)
+            raise
+
+
+def _build_agents() -> Dict[str, Any]:
+    """Build the search agent and the root agent and return them by name."""
+    from google.adk.tools import google_search
+    from .conversation_context import ContextBudget
+    from .observability.tracing import ModelCallSpans
+    from .tools import (
         get_flight_offers,
+        get_multi_city_flight_offers,
+        confirm_flight_prices,
         get_hotel_offers,
         simulate_booking,
         get_weather,
         get_current_datetime,
-        agent_tool.AgentTool(agent=search_agent)
-    ],
-)
+        CachedAgentTool,
+        recall_tool_output,
+        filter_cached_flights,
+        filter_cached_hotels,
+        rank_cached_hotels,
+        plan_trip,
+        compare_destinations,
+        plan_itinerary
+    )
+
+    # Keeps the root agent's prompt bounded as the conversation grows
+    settings = get_settings()
+    context_budget = ContextBudget(
+        max_tokens=settings.context_max_tokens,
+        keep_recent_turns=settings.context_keep_turns
+    )
+
+    # Records one span per LLM call for every agent
+    model_spans = ModelCallSpans()
+
+    search_agent = Agent(
+        model=AGENT_CONFIG['search']['model'],
+        name='SearchAgent',
+        instruction=AGENT_CONFIG['search']['instruction'],
+        tools=[google_search],
+        before_model_callback=model_spans.before_model_callback,
+        after_model_callback=model_spans.after_model_callback,
+    )
+
+    # Cached so repeated searches across the process are served once
+    search_tool = CachedAgentTool(agent=search_agent)
+
+    root_agent = TravelAgent(
+        name="travel_services_agent",
+        model=AGENT_CONFIG['root']['model'],
+        description=AGENT_CONFIG['root']['description'],
+        instruction=AGENT_CONFIG['root']['instruction'],
+        before_model_callback=[context_budget.before_model_callback, model_spans.before_model_callback],
+        after_model_callback=model_spans.after_model_callback,
+        tools=[
+            get_flight_offers,
+            get_multi_city_flight_offers,
+            get_hotel_offers,
+            filter_cached_flights,
+            filter_cached_hotels,
+            rank_cached_hotels,
+            plan_trip,
+            compare_destinations,
+            plan_itinerary,
+            confirm_flight_prices,
+            simulate_booking,
+            recall_tool_output,
+            get_weather,
+            get_current_datetime,
+            search_tool
+        ],
+    )
+
+    logger.info("Travel Services Agent initialized successfully")
+    return {
+        "root_agent": root_agent,
+        "search_agent": search_agent,
+        "search_tool": search_tool,
+        "context_budget": context_budget,
+        "model_spans": model_spans
+    }
+
+
+_agents = None
+_agents_lock = threading.Lock()
+
+def _get_agents() -> Dict[str, Any]:
+    global _agents
+    if _agents is None:
+        with _agents_lock:
+            if _agents is None:
+                _agents = _build_agents()
+    return _agents
+
+def get_root_agent() -> TravelAgent:
+    """Get the root agent, building every agent on the first call."""
+    return _get_agents()["root_agent"]
 
-logger.info("Travel Services Agent initialized successfully")
\ No newline at end of file
+def __getattr__(name):
+    # Agents are built on first access (e.g. `from .agent import root_agent`),
+    # not when this module is imported
+    if name in ("root_agent", "search_agent", "search_tool", "context_budget", "model_spans"):
+        return _get_agents()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
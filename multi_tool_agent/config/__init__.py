@@ -1,3 +1,3 @@
-from .settings import get_settings
+from .settings import get_settings, load_environment
 
-__all__ = ['get_settings'] 
\ No newline at end of file
+__all__ = ['get_settings', 'load_environment'] 
\ No newline at end of file
@@ -33,6 +33,16 @@ AGENT_CONFIG = {
             9. Only ask the user for clarification if you cannot proceed after making reasonable assumptions and using available tools.
             10. When in doubt, prefer to act and show your reasoning, rather than waiting for explicit user clarification.
             11. If you make an assumption, always explain it to the user and offer them a chance to correct it.
+            12. Older tool results may appear as a compacted summary with a handle. If you need their details, call recall_tool_output with that handle instead of repeating the search.
+            13. For a round trip, pass return_date to get_flight_offers instead of searching each direction; for several cities, call get_multi_city_flight_offers once with every flight. Pass cabin, nonstop, max price and currency wishes as search filters rather than filtering the results yourself.
+            14. For follow-ups on results you already fetched (nonstop only, under a price, an airline, star rating, amenities, distance), use filter_cached_flights or filter_cached_hotels instead of searching again. Only search again if they report needs_search.
+            15. Before presenting a final flight shortlist, confirm current prices with confirm_flight_prices, passing all shortlisted offer IDs in one call.
+            16. get_hotel_offers returns the best hotels only (10 closest by default; pass sort_by='rating' for the highest rated, or a larger limit) and total_matches, the number of hotels found. Report total_matches as the total.
+            17. To recommend hotels, call rank_cached_hotels rather than comparing them yourself; set its weights from what the user cares about, and quote each hotel's why when explaining the ranking.
+            18. When the user gives a budget for a trip (flight and hotel), call plan_trip instead of searching flights and hotels separately and combining them yourself. Present its cheapest, fastest and best_rated plans, and use the pareto plans to explain the trade-offs.
+            19. When the user weighs several destinations (e.g. 'Lisbon, Barcelona or Rome?'), call compare_destinations once with all of them instead of searching each city in turn, then narrate its comparison table.
+            20. For trips through several cities, call plan_itinerary once with every leg instead of searching each flight and hotel in turn. Point out every entry of its conflicts (late arrivals, tight connections, nights without a hotel) and suggest how to fix them.
+            21. Offers may be priced in different currencies: compare them on normalized_price (one common currency), and pass the user's currency to plan_trip, compare_destinations and plan_itinerary so budgets and totals are in it.
 
             ---
 
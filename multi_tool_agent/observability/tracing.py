@@ -0,0 +1,372 @@
+"""
+Lightweight tracing for agent turns.
+
+Spans nest through a context variable, so they follow a turn across
+asyncio tasks and the worker threads ADK runs sync tools on. Finished
+spans are written as JSON lines to the file named by TRACE_FILE; when it
+is unset, tracing is off and span() costs one attribute check.
+
+Print the critical path of the latest turn in a trace file:
+
+    python -m multi_agent_agent.observability traces.jsonl
+"""
+import argparse
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from ..config import get_settings, load_environment
+
+logger = logging.getLogger('travel_agent')
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """A timed operation within a trace."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start", "end", "attributes", "status", "_tracer")
+
+    def __init__(self, tracer: "Tracer", name: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self._tracer = tracer
+        self.name = name
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(8)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.start = time.time()
+        self.end: Optional[float] = None
+        self.attributes = attributes
+        self.status = "ok"
+
+    def set(self, **attributes: Any) -> None:
+        """Add or overwrite attributes."""
+        self.attributes.update(attributes)
+
+    def record_error(self, error: BaseException) -> None:
+        self.status = "error"
+        self.attributes["error"] = f"{type(error).__name__}: {error}"
+
+    def finish(self) -> None:
+        if self.end is None:
+            self.end = time.time()
+            self._tracer.export(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": self.start,
+            "duration_ms": round(((self.end or time.time()) - self.start) * 1000, 3),
+            "status": self.status,
+            "attributes": self.attributes
+        }
+
+
+class _NoopSpan:
+    """Stands in for a span when tracing is disabled."""
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+    def record_error(self, error: BaseException) -> None:
+        pass
+
+    def finish(self) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class FileSpanExporter:
+    """Appends finished spans to a file as JSON lines."""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            # Flush whole traces at once; a root span closes its trace
+            if span.parent_id is None:
+                self._file.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._file.flush()
+
+
+class Tracer:
+    """Creates spans and hands finished ones to an exporter."""
+
+    def __init__(self, exporter: Optional[FileSpanExporter] = None):
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Any]:
+        """Time a block as a child of the current span."""
+        if self.exporter is None:
+            yield NOOP_SPAN
+            return
+        span = Span(self, name, _current_span.get(), attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.finish()
+
+    def start_span(self, name: str, **attributes: Any) -> Any:
+        """
+        Start a span without making it current.
+
+        For operations that begin and end in different callbacks; the
+        caller must call finish() on the returned span.
+        """
+        if self.exporter is None:
+            return NOOP_SPAN
+        return Span(self, name, _current_span.get(), attributes)
+
+    def export(self, span: Span) -> None:
+        if self.exporter is None:
+            return
+        try:
+            self.exporter.export(span)
+        except Exception as e:
+            logger.warning("Failed to export span %s: %s", span.name, e)
+
+
+_tracer = None
+_tracer_lock = threading.Lock()
+
+def get_tracer() -> Tracer:
+    """Get the singleton tracer, exporting to TRACE_FILE if it is set."""
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                path = get_settings().trace_file
+                _tracer = Tracer(FileSpanExporter(path) if path else None)
+    return _tracer
+
+
+def span(name: str, **attributes: Any):
+    """Time a block as a child of the current span (see Tracer.span)."""
+    return get_tracer().span(name, **attributes)
+
+
+def current_span() -> Any:
+    """Return the active span, or a no-op span outside any trace."""
+    return _current_span.get() or NOOP_SPAN
+
+
+def traced(name: Optional[str] = None, measure_result: bool = False, **attributes: Any) -> Callable:
+    """
+    Decorator that wraps every call of a function or coroutine in a span.
+
+    The wrapper keeps the wrapped signature and docstring, so ADK still
+    builds the same tool declaration from decorated tool functions.
+
+    Args:
+        name: Span name (default: the function's qualified name)
+        measure_result: Record the JSON size of the return value as result_bytes
+        **attributes: Attributes set on every span
+    """
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name, **attributes) as active:
+                    result = await func(*args, **kwargs)
+                    if measure_result:
+                        _measure(active, result)
+                    return result
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, **attributes) as active:
+                result = func(*args, **kwargs)
+                if measure_result:
+                    _measure(active, result)
+                return result
+        return wrapper
+
+    return decorator
+
+
+def _measure(active: Any, result: Any) -> None:
+    if active is NOOP_SPAN:
+        return
+    try:
+        active.set(result_bytes=len(json.dumps(result, default=str)))
+    except (TypeError, ValueError):
+        return
+    if isinstance(result, dict) and "error" in result:
+        active.set(tool_error=str(result["error"])[:200])
+
+
+class ModelCallSpans:
+    """
+    before/after model callbacks that record one span per LLM call.
+
+    The span starts in before_model_callback and ends with the first
+    complete (non-partial) response, so it covers the model's full
+    latency, including streamed tokens.
+    """
+
+    MAX_PENDING = 1024
+
+    def __init__(self):
+        self._pending: "OrderedDict[tuple, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def before_model_callback(self, callback_context, llm_request) -> None:
+        tracer = get_tracer()
+        if not tracer.enabled:
+            return None
+        model_span = tracer.start_span(
+            "llm.generate",
+            agent=callback_context.agent_name,
+            model=llm_request.model,
+            contents=len(llm_request.contents)
+        )
+        with self._lock:
+            self._pending[(callback_context.invocation_id, callback_context.agent_name)] = model_span
+            # Calls that errored never reach the after callback
+            while len(self._pending) > self.MAX_PENDING:
+                self._pending.popitem(last=False)
+        return None
+
+    def after_model_callback(self, callback_context, llm_response) -> None:
+        if llm_response.partial:
+            return None
+        with self._lock:
+            model_span = self._pending.pop((callback_context.invocation_id, callback_context.agent_name), None)
+        if model_span is None:
+            return None
+        usage = llm_response.usage_metadata
+        if usage is not None:
+            model_span.set(
+                prompt_tokens=usage.prompt_token_count,
+                output_tokens=usage.candidates_token_count
+            )
+        if llm_response.error_code:
+            model_span.status = "error"
+            model_span.set(error=f"{llm_response.error_code}: {llm_response.error_message}")
+        model_span.finish()
+        return None
+
+
+def load_spans(path: str) -> List[Dict[str, Any]]:
+    """Read spans written by FileSpanExporter."""
+    spans = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                spans.append(json.loads(line))
+    return spans
+
+
+def critical_path(spans: List[Dict[str, Any]], root: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Return the chain of spans that determined the root span's duration.
+
+    Walking backwards from the end of a span, the child that finished last
+    is on the critical path; the walk then continues from that child's
+    start, so sequential children are all included while overlapping
+    (parallel) ones only contribute the slowest.
+    """
+    children: Dict[str, List[Dict[str, Any]]] = {}
+    for s in spans:
+        if s["parent_id"]:
+            children.setdefault(s["parent_id"], []).append(s)
+
+    path: List[Dict[str, Any]] = []
+
+    def walk(node: Dict[str, Any], depth: int) -> None:
+        entry = {**node, "depth": depth}
+        path.append(entry)
+        cursor = node["start"] + node["duration_ms"] / 1000
+        chain = []
+        for child in sorted(children.get(node["span_id"], []), key=lambda c: c["start"] + c["duration_ms"] / 1000, reverse=True):
+            child_end = child["start"] + child["duration_ms"] / 1000
+            if child_end <= cursor + 1e-6:
+                chain.append(child)
+                cursor = child["start"]
+        # Time not covered by a traced child (framework overhead, untraced work)
+        entry["self_ms"] = node["duration_ms"] - sum(child["duration_ms"] for child in chain)
+        for child in reversed(chain):
+            walk(child, depth + 1)
+
+    walk(root, 0)
+    return path
+
+
+def summarize(spans: List[Dict[str, Any]], trace_id: Optional[str] = None) -> str:
+    """Format the critical path of one trace (the latest root span by default)."""
+    roots = [s for s in spans if s["parent_id"] is None and (trace_id is None or s["trace_id"] == trace_id)]
+    if not roots:
+        return "No matching trace found"
+    root = max(roots, key=lambda s: s["start"])
+    trace_spans = [s for s in spans if s["trace_id"] == root["trace_id"]]
+
+    lines = [
+        f"Trace {root['trace_id']}: {root['name']} {root['duration_ms']:.1f} ms, {len(trace_spans)} spans",
+        "Critical path:"
+    ]
+    for s in critical_path(trace_spans, root):
+        share = s["duration_ms"] / root["duration_ms"] * 100 if root["duration_ms"] else 0
+        attrs = ", ".join(f"{k}={v}" for k, v in s["attributes"].items() if v is not None)
+        status = " [error]" if s["status"] == "error" else ""
+        lines.append(
+            f"  {'  ' * s['depth']}{s['name']:<{max(40 - 2 * s['depth'], 10)}} "
+            f"{s['duration_ms']:>10.1f} ms {share:>5.1f}% (self {s['self_ms']:>7.1f} ms){status}  {attrs[:120]}"
+        )
+
+    totals: Dict[str, float] = {}
+    for s in trace_spans:
+        totals[s["name"]] = totals.get(s["name"], 0.0) + s["duration_ms"]
+    lines.append("Time by span name (children overlap their parents):")
+    for span_name, total in sorted(totals.items(), key=lambda item: item[1], reverse=True)[:10]:
+        lines.append(f"  {span_name:<40} {total:>10.1f} ms")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    load_environment()
+    parser = argparse.ArgumentParser(description="Print the critical path of a traced turn")
+    parser.add_argument("file", nargs="?", default=os.getenv("TRACE_FILE"), help="Trace file (default: TRACE_FILE)")
+    parser.add_argument("--trace-id", help="Trace to summarize (default: the latest)")
+    args = parser.parse_args()
+    if not args.file:
+        parser.error("no trace file given and TRACE_FILE is not set")
+    print(summarize(load_spans(args.file), args.trace_id))
+
+
+if __name__ == "__main__":
+    main()
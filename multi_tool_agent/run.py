@@ -1,6 +1,28 @@
-from agent import root_agent, logger
+import argparse
+import uuid
+from agent import get_root_agent, logger
+
+def print_stream(root_agent, user_input: str, session_id: str):
+    """Print tokens and tool progress as the agent produces them."""
+    print("\nAgent: ", end="", flush=True)
+    for event in root_agent.stream(user_input, session_id=session_id):
+        if event["type"] == "token":
+            print(event["text"], end="", flush=True)
+        elif event["type"] == "progress":
+            print(f"\n  [{event['text']}]", flush=True)
+        elif event["type"] == "tool_call":
+            print(f"\n  [{event['author']} → {event['name']}]", flush=True)
+        elif event["type"] == "final" and not event["streamed"]:
+            print(event["text"], end="", flush=True)
+    print()
 
 def main():
+    parser = argparse.ArgumentParser(description="Travel Services Agent")
+    parser.add_argument("--stream", action="store_true", help="print the answer and tool progress as they arrive")
+    args = parser.parse_args()
+    session_id = uuid.uuid4().hex
+    root_agent = get_root_agent()
+    
     logger.info("Starting Travel Services Agent")
     print("Travel Services Agent")
     print("====================")
@@ -13,15 +35,18 @@ def main():
             if user_input.lower() == 'exit':
                 logger.info("User requested to exit")
                 break
-                
-            response = root_agent.run(user_input)
-            print("\nAgent:", response)
+            
+            if args.stream:
+                print_stream(root_agent, user_input, session_id)
+            else:
+                response = root_agent.run(user_input)
+                print("\nAgent:", response)
             
         except KeyboardInterrupt:
             logger.info("Received keyboard interrupt, shutting down")
             break
         except Exception as e:
-            logger.error(f"Unexpected error: {str(e)}", exc_info=True)
+            logger.error("Unexpected error: %s", e, exc_info=True)
             print(f"\nError: {str(e)}")
         print()
     
@@ -1,10 +1,25 @@
-from .base_client import BaseAPIClient
-from .amadeus_client import AmadeusClient
-from .weatherapi_client import WeatherAPIClient
-from .flight_service import FlightService
-from .hotel_service import HotelService
-from .weather_service import WeatherService
-from .travel_plan_service import TravelPlanService
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .base_client import BaseAPIClient
+    from .amadeus_client import AmadeusClient
+    from .weatherapi_client import WeatherAPIClient
+    from .flight_service import FlightService
+    from .hotel_service import HotelService
+    from .weather_service import WeatherService
+    from .travel_plan_service import TravelPlanService
+
+# Exported name -> submodule defining it; imported on first attribute access
+_EXPORTS = {
+    'BaseAPIClient': '.base_client',
+    'AmadeusClient': '.amadeus_client',
+    'WeatherAPIClient': '.weatherapi_client',
+    'FlightService': '.flight_service',
+    'HotelService': '.hotel_service',
+    'WeatherService': '.weather_service',
+    'TravelPlanService': '.travel_plan_service'
+}
 
 __all__ = [
     'BaseAPIClient',
@@ -14,4 +29,15 @@ __all__ = [
     'HotelService',
     'WeatherService',
     'TravelPlanService'
-] 
\ No newline at end of file
+]
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
\ No newline at end of file
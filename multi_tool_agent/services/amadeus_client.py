@@ -1,5 +1,7 @@
-from typing import Dict, Any
+import threading
+from typing import Dict, Any, Iterator, Optional
 from .base_client import BaseAPIClient
+from ..observability.tracing import span
 
 class AmadeusClient(BaseAPIClient):
     """Base client for Amadeus API interactions."""
@@ -7,6 +9,8 @@ class AmadeusClient(BaseAPIClient):
     def __init__(self):
         super().__init__()
         self._access_token = None
+        # Threads sharing a client (e.g. TravelPlanService fan-outs) fetch one token between them
+        self._token_lock = threading.Lock()
     
     @property
     def base_url(self) -> str:
@@ -16,7 +20,15 @@ class AmadeusClient(BaseAPIClient):
         """Get or refresh the Amadeus API access token."""
         if self._access_token:
             return self._access_token
-            
+        
+        with self._token_lock:
+            if self._access_token:
+                return self._access_token
+            with span("amadeus.token"):
+                return self._fetch_access_token()
+    
+    def _fetch_access_token(self) -> str:
+        """Request a new access token from the OAuth2 endpoint."""
         data = {
             "grant_type": "client_credentials",
             "client_id": self.settings.amadeus_api_key,
@@ -42,8 +54,24 @@ class AmadeusClient(BaseAPIClient):
         method: str, 
         endpoint: str, 
         params: Dict[str, Any] = None,
-        data: Dict[str, Any] = None
+        data: Dict[str, Any] = None,
+        headers: Dict[str, str] = None,
+        schema: Optional[Any] = None,
+        cache: bool = False
     ) -> Dict[str, Any]:
         """Make an authenticated request to the Amadeus API."""
-        headers = {"Authorization": f"Bearer {self._get_access_token()}"}
-        return super()._make_request(method, endpoint, params=params, headers=headers, data=data) 
\ No newline at end of file
+        headers = {**(headers or {}), "Authorization": f"Bearer {self._get_access_token()}"}
+        return super()._make_request(method, endpoint, params=params, headers=headers, data=data, schema=schema, cache=cache)
+
+    def _stream_request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Dict[str, Any] = None,
+        headers: Dict[str, str] = None,
+        data: Dict[str, Any] = None,
+        chunk_size: Optional[int] = None
+    ) -> Iterator[bytes]:
+        """Make an authenticated request to the Amadeus API, yielding the body as it arrives."""
+        headers = {**(headers or {}), "Authorization": f"Bearer {self._get_access_token()}"}
+        return super()._stream_request(method, endpoint, params=params, headers=headers, data=data, chunk_size=chunk_size)
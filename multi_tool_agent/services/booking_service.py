@@ -0,0 +1,455 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import secrets
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from ..config import get_settings
+from .offer_registry import get_offer_registry
+from ..observability.tracing import traced
+
+logger = logging.getLogger('travel_agent')
+
+_CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+
+class BookingIdGenerator:
+    """
+    Generates collision-free, lexicographically sortable booking IDs.
+
+    IDs follow the ULID layout: 48 bits of millisecond timestamp followed by
+    80 random bits, Crockford base32 encoded (26 characters). Within the same
+    millisecond the random part is incremented instead of redrawn, so IDs
+    from one process are strictly increasing and never repeat.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._last_random = 0
+
+    def new_id(self) -> str:
+        with self._lock:
+            now_ms = int(time.time() * 1000)
+            if now_ms <= self._last_ms:
+                now_ms = self._last_ms
+                self._last_random += 1
+                if self._last_random >= 1 << 80:
+                    # Random space for this millisecond exhausted; borrow the next one
+                    now_ms += 1
+                    self._last_random = secrets.randbits(79)
+            else:
+                # Leave headroom so increments within the millisecond never overflow
+                self._last_random = secrets.randbits(79)
+            self._last_ms = now_ms
+            value = (now_ms << 80) | self._last_random
+        chars = []
+        for _ in range(26):
+            chars.append(_CROCKFORD[value & 0x1F])
+            value >>= 5
+        return "".join(reversed(chars))
+
+
+class BookingLedger:
+    """
+    Append-only SQLite ledger of simulated bookings.
+
+    Callers enqueue records; a background thread writes them in batches (up
+    to batch_size rows per transaction, or whatever is queued after
+    flush_interval seconds). A caller that needs its record stored uses
+    write(), which has the current batch written right away and reports
+    whether it was, so concurrent bookings still share one transaction.
+    """
+
+    def __init__(self, path: str, batch_size: int = 200, flush_interval: float = 0.05):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Entries hold a record, a waiter ("done" event and "stored" result), or both
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self._readers = threading.local()
+        self._init_schema()
+        self._writer = threading.Thread(target=self._run, name="booking-ledger", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _init_schema(self) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS bookings (
+                    booking_ref TEXT PRIMARY KEY,
+                    idempotency_key TEXT UNIQUE,
+                    created_at TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    payload TEXT NOT NULL
+                )
+                """
+            )
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """Queue a booking record for the next batch."""
+        self._queue.put({"record": record})
+
+    def write(self, record: Dict[str, Any], timeout: float = 5.0) -> Optional[bool]:
+        """
+        Queue a booking record and wait until its batch is written.
+
+        Returns:
+            True once the record is stored, False if the write failed, None
+            if it is still queued after timeout seconds
+        """
+        entry = {"record": record, "done": threading.Event(), "stored": False}
+        self._queue.put(entry)
+        if not entry["done"].wait(timeout):
+            return None
+        return entry["stored"]
+
+    def find_by_idempotency_key(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a previously written booking by its idempotency key."""
+        conn = getattr(self._readers, "conn", None)
+        if conn is None:
+            conn = self._readers.conn = self._connect()
+        row = conn.execute(
+            "SELECT payload FROM bookings WHERE idempotency_key = ?", (key,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Block until everything queued so far has been written; False on timeout."""
+        entry = {"done": threading.Event(), "stored": False}
+        self._queue.put(entry)
+        return entry["done"].wait(timeout)
+
+    def _run(self) -> None:
+        conn = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            # Someone waits on the write: write what is queued now
+            flushing = "done" in batch[0]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    if flushing or remaining <= 0:
+                        batch.append(self._queue.get_nowait())
+                    else:
+                        batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+                flushing = flushing or "done" in batch[-1]
+            self._write(conn, batch)
+
+    def _write(self, conn: sqlite3.Connection, batch: List[Dict[str, Any]]) -> None:
+        records = [entry["record"] for entry in batch if "record" in entry]
+        stored = True
+        if records:
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO bookings VALUES (?, ?, ?, ?, ?)",
+                        [
+                            (
+                                r["booking_reference"],
+                                r.get("idempotency_key"),
+                                r["created_at"],
+                                r["status"],
+                                json.dumps(r)
+                            )
+                            for r in records
+                        ]
+                    )
+                logger.debug("Booking ledger wrote %s records", len(records))
+            except sqlite3.Error as e:
+                stored = False
+                logger.error("Booking ledger write failed for %s records: %s", len(records), e, exc_info=True)
+        for entry in batch:
+            if "done" in entry:
+                entry["stored"] = stored
+                entry["done"].set()
+
+
+class BookingService:
+    """
+    Simulated booking engine.
+
+    Prices come from the offer registry, with flight prices re-confirmed
+    with Amadeus just before booking (when confirm_prices is set); seat and room inventory is
+    decremented under striped per-offer locks so concurrent bookings can
+    never oversell; repeated requests with the same idempotency key return
+    the original booking; and a booking is only confirmed once it is in the
+    ledger (if it cannot be written, its reservation is released).
+
+    Idempotency keys and inventory use separate lock stripes, always taken
+    in that order, so a booking can never wait on a lock it already holds.
+    Offers are priced (which may call Amadeus) before any lock is taken.
+    """
+
+    LOCK_STRIPES = 64
+
+    def __init__(
+        self,
+        ledger: BookingLedger,
+        default_rooms: int = 10,
+        idempotency_cache_size: int = 10000,
+        confirm_prices: bool = True
+    ):
+        self.ledger = ledger
+        self.confirm_prices = confirm_prices
+        self.default_rooms = default_rooms
+        self.registry = get_offer_registry()
+        self.ids = BookingIdGenerator()
+        self._stripes = [threading.Lock() for _ in range(self.LOCK_STRIPES)]
+        self._key_stripes = [threading.Lock() for _ in range(self.LOCK_STRIPES)]
+        self._inventory: Dict[Tuple[str, str], int] = {}
+        self._recent: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._recent_lock = threading.Lock()
+        self.idempotency_cache_size = idempotency_cache_size
+
+    @traced()
+    def book(
+        self,
+        flight_id: Optional[str] = None,
+        hotel_id: Optional[str] = None,
+        guests: int = 1,
+        payment_method: str = "credit_card",
+        idempotency_key: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Book a flight and/or hotel offer.
+
+        Args:
+            flight_id: Optional flight offer ID to book
+            hotel_id: Optional hotel offer ID to book
+            guests: Number of guests
+            payment_method: Payment method to simulate
+            idempotency_key: Optional key; repeating it returns the first booking
+
+        Returns:
+            Booking confirmation, or a dictionary with an error message
+        """
+        if not flight_id and not hotel_id:
+            return {"error": "Provide a flight_id and/or hotel_id to book"}
+        if guests < 1:
+            return {"error": "Guests must be at least 1"}
+
+        if idempotency_key:
+            previous = self._find_previous(idempotency_key)
+            if previous is not None:
+                logger.info("Idempotent replay of booking %s", previous['booking_reference'])
+                return {**previous, "idempotent_replay": True}
+
+        # Pricing may call Amadeus, so it happens before any lock is taken;
+        # a concurrent retry of the same key may price the offers twice.
+        items, totals, error = self._price_items(flight_id, hotel_id, guests)
+        if error:
+            return {"error": error}
+
+        # Reserving and recording the booking happen under the key's stripe,
+        # so two concurrent requests with the same key cannot both book.
+        key_lock = self._key_stripes[self._stripe_index(idempotency_key)] if idempotency_key else None
+        if key_lock is not None:
+            key_lock.acquire()
+        try:
+            if idempotency_key:
+                previous = self._find_previous(idempotency_key)
+                if previous is not None:
+                    logger.info("Idempotent replay of booking %s", previous['booking_reference'])
+                    return {**previous, "idempotent_replay": True}
+
+            units = [(item["type"], str(item["id"]), item["_units"]) for item in items]
+            reserved, error = self._reserve(items)
+            if error:
+                return {"error": error}
+
+            total_price = round(next(iter(totals.values())), 2) if len(totals) == 1 else None
+            booking = {
+                "booking_reference": f"BK{self.ids.new_id()}",
+                "idempotency_key": idempotency_key,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "status": "confirmed",
+                "items": items,
+                "total_price": total_price,
+                "currency": next(iter(totals)) if len(totals) == 1 else None,
+                "totals_by_currency": {c: round(t, 2) for c, t in totals.items()},
+                "guests": guests,
+                "payment": {
+                    "method": payment_method,
+                    "status": "simulated",
+                    "amount": total_price
+                },
+                "note": "(This is a simulated booking - no actual reservations or charges were made)"
+            }
+            stored = self.ledger.write(booking)
+            if stored is False:
+                self._release(units)
+                logger.error("Booking %s could not be recorded; released its reservation", booking['booking_reference'])
+                return {"error": "The booking could not be recorded and nothing was booked; please try again"}
+            if stored is None:
+                # Still queued: it is kept reserved and will be written, but is not confirmed yet
+                booking = {
+                    **booking,
+                    "status": "pending",
+                    "note": "The booking is still being recorded; repeat the request with the same idempotency key to check on it"
+                }
+                logger.warning("Booking %s is not in the ledger yet", booking['booking_reference'])
+            if idempotency_key:
+                self._remember(idempotency_key, booking)
+        finally:
+            if key_lock is not None:
+                key_lock.release()
+
+        logger.info("Booked %s (%s items, reserved %s)", booking['booking_reference'], len(items), reserved)
+        return booking
+
+    def remaining(self, kind: str, offer_id: str) -> Optional[int]:
+        """Seats or rooms left for an offer, if it has been booked before."""
+        return self._inventory.get((kind, str(offer_id)))
+
+    def _price_items(self, flight_id, hotel_id, guests) -> Tuple[List[Dict[str, Any]], Dict[str, float], Optional[str]]:
+        items: List[Dict[str, Any]] = []
+        totals: Dict[str, float] = {}
+
+        if flight_id:
+            flight = self.registry.get("flight", flight_id)
+            if flight is None:
+                return items, totals, f"Flight offer {flight_id} is unknown or expired; search flights again before booking"
+            confirmation = self._confirm_flight_price(flight_id) if self.confirm_prices else {}
+            if confirmation.get("unavailable"):
+                return items, totals, f"Flight offer {flight_id} is no longer available; search flights again"
+            flight = self.registry.get("flight", flight_id) or flight
+            items.append({
+                "type": "flight",
+                "id": flight_id,
+                "price": flight["price_per_traveler"],
+                "currency": flight["currency"],
+                "guests": guests,
+                "last_ticketing_date": flight["last_ticketing_date"],
+                "price_confirmed": bool(confirmation.get("confirmed")),
+                "price_changed": bool(confirmation.get("price_changed")),
+                "_units": guests,
+                "_capacity": flight.get("seats_available")
+            })
+            totals[flight["currency"]] = totals.get(flight["currency"], 0.0) + flight["price_per_traveler"] * guests
+
+        if hotel_id:
+            hotel = self.registry.get("hotel", hotel_id)
+            if hotel is None:
+                # Not seen yet: fetching the offer details registers its price
+                from .hotel_service import HotelService
+                try:
+                    HotelService().get_hotel_offer_details(hotel_id)
+                except Exception as e:
+                    logger.error("Failed to price hotel offer %s: %s", hotel_id, e)
+                hotel = self.registry.get("hotel", hotel_id)
+            if hotel is None:
+                return items, totals, f"Hotel offer {hotel_id} is unknown or expired; search hotels again before booking"
+            items.append({
+                "type": "hotel",
+                "id": hotel_id,
+                "price_per_night": hotel["price_per_night"],
+                "nights": hotel["nights"],
+                "currency": hotel["currency"],
+                "check_in": hotel["check_in"],
+                "check_out": hotel["check_out"],
+                "guests": guests,
+                "_units": 1,
+                "_capacity": hotel.get("rooms_available", self.default_rooms)
+            })
+            totals[hotel["currency"]] = totals.get(hotel["currency"], 0.0) + hotel["price"]
+
+        return items, totals, None
+
+    def _confirm_flight_price(self, flight_id: str) -> Dict[str, Any]:
+        """Re-price a flight offer with Amadeus; fall back to the searched price on failure."""
+        from .flight_service import FlightService
+        try:
+            confirmation = FlightService().confirm_prices([flight_id]).get(str(flight_id), {})
+        except Exception as e:
+            confirmation = {"confirmed": False, "error": str(e)}
+        if not confirmation.get("confirmed") and not confirmation.get("unavailable"):
+            logger.warning("Booking flight %s at its searched price: %s", flight_id, confirmation.get('error'))
+        return confirmation
+
+    def _reserve(self, items: List[Dict[str, Any]]) -> Tuple[Dict[str, int], Optional[str]]:
+        """Decrement inventory for all items atomically, or for none of them."""
+        keys = [(item["type"], str(item["id"])) for item in items]
+        # Take stripe locks in a fixed order so two bookings can't deadlock
+        locks = sorted({self._stripe_index(f"{k[0]}:{k[1]}") for k in keys})
+        for index in locks:
+            self._stripes[index].acquire()
+        try:
+            for key, item in zip(keys, items):
+                available = self._inventory.get(key)
+                if available is None:
+                    available = item["_capacity"] if item["_capacity"] is not None else self.default_rooms
+                if available < item["_units"]:
+                    return {}, f"Not enough availability for {item['type']} {item['id']} ({available} left)"
+            reserved = {}
+            for key, item in zip(keys, items):
+                available = self._inventory.get(key)
+                if available is None:
+                    available = item["_capacity"] if item["_capacity"] is not None else self.default_rooms
+                self._inventory[key] = available - item.pop("_units")
+                item.pop("_capacity")
+                reserved[f"{key[0]}:{key[1]}"] = self._inventory[key]
+            return reserved, None
+        finally:
+            for index in reversed(locks):
+                self._stripes[index].release()
+
+    def _release(self, units: List[Tuple[str, str, int]]) -> None:
+        """Give back the inventory a booking reserved."""
+        for kind, offer_id, count in units:
+            with self._stripes[self._stripe_index(f"{kind}:{offer_id}")]:
+                self._inventory[(kind, offer_id)] += count
+
+    def _find_previous(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._recent_lock:
+            booking = self._recent.get(key)
+            if booking is not None:
+                self._recent.move_to_end(key)
+                return booking
+        return self.ledger.find_by_idempotency_key(key)
+
+    def _remember(self, key: str, booking: Dict[str, Any]) -> None:
+        with self._recent_lock:
+            self._recent[key] = booking
+            while len(self._recent) > self.idempotency_cache_size:
+                self._recent.popitem(last=False)
+
+    def _stripe_index(self, name: str) -> int:
+        return zlib.crc32(name.encode()) % self.LOCK_STRIPES
+
+
+_booking_service = None
+_booking_service_lock = threading.Lock()
+
+def get_booking_service() -> BookingService:
+    """Get the singleton booking service (and its ledger writer)."""
+    global _booking_service
+    if _booking_service is None:
+        with _booking_service_lock:
+            if _booking_service is None:
+                settings = get_settings()
+                ledger = BookingLedger(settings.booking_ledger_path)
+                atexit.register(ledger.flush)
+                _booking_service = BookingService(
+                    ledger,
+                    default_rooms=settings.booking_default_rooms,
+                    confirm_prices=settings.booking_confirm_prices
+                )
+    return _booking_service
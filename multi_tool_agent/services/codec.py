@@ -0,0 +1,143 @@
+"""
+JSON codecs for upstream responses.
+
+JSON_CODEC picks the implementation: msgspec or orjson when installed,
+the standard library otherwise (auto, the default, tries them in that
+order). Every codec decodes to plain dicts and lists. msgspec also takes
+a schema from `schemas` and then skips undeclared fields while parsing;
+the other codecs decode the whole document, which the parsers read the
+same way.
+"""
+import json
+import logging
+import threading
+from typing import Any, Dict, Optional
+from ..config import get_settings
+
+try:
+    import msgspec
+except ImportError:  # optional
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:  # optional
+    orjson = None
+
+logger = logging.getLogger('travel_agent')
+
+
+class CodecError(ValueError):
+    """Raised when a response body is not valid JSON."""
+
+
+class JsonCodec:
+    """Standard library codec; the others override loads/dumps."""
+
+    name = "stdlib"
+
+    def loads(self, data: bytes) -> Any:
+        try:
+            return json.loads(data)
+        except ValueError as e:
+            raise CodecError(str(e)) from e
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj).encode()
+
+    def decode(self, data: bytes, schema: Optional[Any] = None) -> Any:
+        """
+        Decode a response body.
+
+        Args:
+            data: Raw JSON bytes
+            schema: Optional TypedDict from `schemas` listing the fields the caller reads;
+                    codecs that cannot skip fields while parsing ignore it
+
+        Returns:
+            Decoded dicts and lists
+        """
+        return self.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    name = "orjson"
+
+    def loads(self, data: bytes) -> Any:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError as e:
+            raise CodecError(str(e)) from e
+
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+
+class MsgspecCodec(JsonCodec):
+    """msgspec codec; with a schema, undeclared fields are skipped while parsing."""
+
+    name = "msgspec"
+
+    def __init__(self):
+        self._decoder = msgspec.json.Decoder()
+        self._encoder = msgspec.json.Encoder()
+        self._typed_decoders: Dict[Any, Any] = {}
+        self._lock = threading.Lock()
+
+    def loads(self, data: bytes) -> Any:
+        try:
+            return self._decoder.decode(data)
+        except msgspec.DecodeError as e:
+            raise CodecError(str(e)) from e
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._encoder.encode(obj)
+
+    def decode(self, data: bytes, schema: Optional[Any] = None) -> Any:
+        if schema is None:
+            return self.loads(data)
+        decoder = self._typed_decoders.get(schema)
+        if decoder is None:
+            with self._lock:
+                decoder = self._typed_decoders.setdefault(schema, msgspec.json.Decoder(schema))
+        try:
+            return decoder.decode(data)
+        except msgspec.ValidationError as e:
+            # A container of an unexpected type (e.g. null instead of a list)
+            logger.debug("Response does not match %s (%s), decoding without it", schema.__name__, e)
+            return self.loads(data)
+        except msgspec.DecodeError as e:
+            raise CodecError(str(e)) from e
+
+
+_CODECS = {
+    "msgspec": (MsgspecCodec, msgspec),
+    "orjson": (OrjsonCodec, orjson),
+    "stdlib": (JsonCodec, json)
+}
+
+
+def create_codec(name: str = "auto") -> JsonCodec:
+    """Create a codec by name ('auto', 'msgspec', 'orjson' or 'stdlib')."""
+    if name == "auto":
+        name = next(n for n, (_, module) in _CODECS.items() if module is not None)
+    if name not in _CODECS:
+        raise ValueError(f"Unknown JSON codec {name!r}, expected auto, {', '.join(_CODECS)}")
+    codec_class, module = _CODECS[name]
+    if module is None:
+        raise ValueError(f"JSON codec {name!r} is not installed")
+    return codec_class()
+
+
+_codec = None
+_codec_lock = threading.Lock()
+
+def get_codec() -> JsonCodec:
+    """Get the singleton codec selected by JSON_CODEC."""
+    global _codec
+    if _codec is None:
+        with _codec_lock:
+            if _codec is None:
+                _codec = create_codec(get_settings().json_codec)
+                logger.info("Decoding upstream responses with %s", _codec.name)
+    return _codec
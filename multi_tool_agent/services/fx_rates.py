@@ -0,0 +1,300 @@
+"""
+Foreign exchange rates for comparing prices across currencies.
+
+Flight and hotel offers come back in whatever currency each provider
+prices them in, so a budget or a ranking over several of them needs one
+currency. Rates come from a daily reference rate feed (the ECB rates
+served by Frankfurter by default, see FX_API_BASE_URL) as units of each
+currency per unit of FX_BASE_CURRENCY.
+
+The table is held in memory and refreshed every FX_REFRESH_INTERVAL
+seconds by a background thread; every refresh is saved to FX_RATES_PATH.
+At start-up, and whenever the feed cannot be reached, the last saved
+table is used, so conversions keep working offline (the age of the rates
+is logged when a refresh fails). With FX_REFRESH_INTERVAL=0 the file is
+the only source.
+
+Conversions go through the base currency: amount * rate[target] /
+rate[source]. convert_many converts a whole column of prices at once:
+each distinct currency is looked up once and the column is scaled with
+NumPy, instead of a dictionary lookup and a division per offer.
+"""
+import json
+import logging
+import math
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import numpy as np
+from .base_client import BaseAPIClient
+from .schemas import FxRatesResponse
+from ..config import get_settings
+
+logger = logging.getLogger('travel_agent')
+
+# Wait before trying the feed again after a failed refresh
+_RETRY_SECONDS = 300
+
+
+def _number(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _positive(value: Any) -> bool:
+    number = _number(value)
+    return math.isfinite(number) and number > 0
+
+
+def _offer_total(offer: Dict[str, Any]) -> Any:
+    return (offer.get("price") or {}).get("total")
+
+
+def _offer_currency(offer: Dict[str, Any]) -> Optional[str]:
+    return (offer.get("price") or {}).get("currency")
+
+
+class FxRatesClient(BaseAPIClient):
+    """Client for the reference exchange rate feed."""
+
+    @property
+    def base_url(self) -> str:
+        return self.settings.fx_api_base_url
+
+    def latest(self, base: str) -> Dict[str, Any]:
+        """The latest rates as units of each currency per unit of `base`."""
+        return self._make_request("GET", "/latest", params={"base": base}, schema=FxRatesResponse)
+
+
+class FxTable:
+    """One snapshot of exchange rates, as a rate column indexed by currency code."""
+
+    def __init__(self, base: str, rates: Dict[str, float], as_of: Optional[str], fetched_at: float):
+        """
+        Args:
+            base: Currency the rates are quoted against
+            rates: Units of each currency per unit of base
+            as_of: Date the rates were published (YYYY-MM-DD)
+            fetched_at: When the rates were fetched (epoch seconds)
+        """
+        usable = {code.upper(): float(rate) for code, rate in rates.items() if _positive(rate)}
+        usable[base.upper()] = 1.0
+        self.base = base.upper()
+        self.as_of = as_of
+        self.fetched_at = fetched_at
+        self.codes = sorted(usable)
+        self.index = {code: i for i, code in enumerate(self.codes)}
+        self.rates = np.array([usable[code] for code in self.codes], dtype=float)
+
+    def rate(self, currency: Optional[str]) -> float:
+        """Units of `currency` per unit of base, NaN if unknown."""
+        i = self.index.get((currency or "").upper())
+        return float(self.rates[i]) if i is not None else math.nan
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "base": self.base,
+            "date": self.as_of,
+            "fetched_at": self.fetched_at,
+            "rates": dict(zip(self.codes, self.rates.tolist()))
+        }
+
+
+class FxRates:
+    """Keeps an exchange rate table fresh and converts prices with it."""
+
+    def __init__(
+        self,
+        base: str,
+        path: str,
+        refresh_interval: float,
+        client: Optional[FxRatesClient] = None
+    ):
+        """
+        Args:
+            base: Currency the feed quotes rates against
+            path: JSON file the table is saved to and loaded from when offline
+            refresh_interval: Seconds between refreshes (0: never fetch, use the file)
+            client: Rate feed client (default: FxRatesClient)
+        """
+        self.base = base.upper()
+        self.path = path
+        self.refresh_interval = refresh_interval
+        self.client = client
+        self._table: Optional[FxTable] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._refresher: Optional[threading.Thread] = None
+        self._attempted_at = -math.inf
+        self.load()
+
+    def table(self) -> Optional[FxTable]:
+        """
+        The current table, or None if no rates could be fetched or loaded.
+
+        The first call without a saved table fetches the rates before
+        returning (retried at most every few minutes while that fails);
+        later refreshes happen in the background.
+        """
+        if self.refresh_interval > 0:
+            if self._table is None and time.monotonic() - self._attempted_at >= _RETRY_SECONDS:
+                with self._lock:
+                    if self._table is None and time.monotonic() - self._attempted_at >= _RETRY_SECONDS:
+                        self.refresh()
+            self._ensure_refresher()
+        return self._table
+
+    def refresh(self) -> bool:
+        """Fetch the latest rates and save them; on failure keep the current table."""
+        self._attempted_at = time.monotonic()
+        try:
+            client = self.client or FxRatesClient()
+            response = client.latest(self.base)
+            table = FxTable(response.get("base") or self.base, response.get("rates") or {}, response.get("date"), time.time())
+        except Exception as e:
+            age = self.age()
+            logger.warning(
+                "Could not refresh exchange rates (%s); %s", e,
+                f"keeping rates {age / 3600:.1f}h old" if age is not None else "no rates available"
+            )
+            return False
+        if table.base != self.base or len(table.codes) < 2:
+            logger.warning("Ignoring exchange rates quoted against %s with %s currencies", table.base, len(table.codes))
+            return False
+        self._table = table
+        self._save(table)
+        logger.info("Exchange rates refreshed: %s currencies per %s as of %s", len(table.codes), table.base, table.as_of)
+        return True
+
+    def load(self) -> bool:
+        """Load the table saved by the last refresh."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                saved = json.load(f)
+            table = FxTable(saved["base"], saved["rates"], saved.get("date"), float(saved.get("fetched_at") or 0))
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning("Could not load exchange rates from %s: %s", self.path, e)
+            return False
+        if table.base != self.base:
+            logger.warning("Ignoring saved exchange rates quoted against %s, expected %s", table.base, self.base)
+            return False
+        self._table = table
+        logger.info("Loaded exchange rates as of %s from %s", table.as_of, self.path)
+        return True
+
+    def age(self) -> Optional[float]:
+        """Seconds since the current rates were fetched."""
+        return time.time() - self._table.fetched_at if self._table is not None else None
+
+    def convert(self, amount: Any, source: Optional[str], target: str) -> Optional[float]:
+        """Convert one amount, rounded to cents; None if the amount or a rate is unknown."""
+        converted = self.convert_many([amount], [source], target)[0]
+        return float(converted) if not math.isnan(converted) else None
+
+    def convert_many(self, amounts: Iterable[Any], currencies: Iterable[Optional[str]], target: str) -> np.ndarray:
+        """
+        Convert a column of amounts, each in its own currency, to `target`.
+
+        Args:
+            amounts: Amounts (numbers or numeric strings; None for unknown)
+            currencies: Currency code of each amount
+            target: Currency to convert to
+
+        Returns:
+            Converted amounts rounded to cents, NaN where the amount or a
+            rate is unknown. Amounts already in `target` are kept as they
+            are even without any rates.
+        """
+        amounts = list(amounts)
+        try:
+            values = np.asarray(amounts, dtype=float)
+        except (TypeError, ValueError):
+            # Missing or malformed amounts: parse one by one
+            values = np.array([_number(a) for a in amounts], dtype=float)
+        target = target.upper()
+        if not amounts:
+            return values
+        # Each distinct currency code is looked up once
+        unique, inverse = np.unique(np.array([c or "" for c in currencies]), return_inverse=True)
+        unique = [code.upper() for code in unique.tolist()]
+        table = self.table() if any(code != target for code in unique) else None
+        target_rate = table.rate(target) if table is not None else math.nan
+        factors = np.array([
+            1.0 if code == target else (target_rate / table.rate(code) if table is not None else math.nan)
+            for code in unique
+        ])
+        return np.round(values * factors[inverse], 2)
+
+    def normalize(
+        self,
+        items: List[Dict[str, Any]],
+        amount: Callable[[Dict[str, Any]], Any] = _offer_total,
+        currency: Callable[[Dict[str, Any]], Optional[str]] = _offer_currency,
+        target: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Add normalized_price ({total, currency}, or None if it cannot be
+        converted) to each item, converting all of them at once.
+
+        Args:
+            items: Offers to annotate in place
+            amount: Reads an item's price (default: price.total)
+            currency: Reads an item's currency (default: price.currency)
+            target: Currency to normalize to (default: settings.fx_currency)
+
+        Returns:
+            The same items
+        """
+        if not items:
+            return items
+        target = (target or get_settings().fx_currency).upper()
+        converted = self.convert_many([amount(item) for item in items], [currency(item) for item in items], target)
+        for item, value in zip(items, converted.tolist()):
+            item["normalized_price"] = {"total": value, "currency": target} if not math.isnan(value) else None
+        return items
+
+    def _save(self, table: FxTable) -> None:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            temporary = f"{self.path}.tmp"
+            with open(temporary, "w", encoding="utf-8") as f:
+                json.dump(table.to_dict(), f)
+            os.replace(temporary, self.path)
+        except OSError as e:
+            logger.warning("Could not save exchange rates to %s: %s", self.path, e)
+
+    def _ensure_refresher(self) -> None:
+        """Start the refresh thread; threads do not survive fork(), so a forked worker starts its own."""
+        if self._refresher is not None and self._refresher.is_alive():
+            return
+        with self._lock:
+            if self._refresher is None or not self._refresher.is_alive():
+                self._refresher = threading.Thread(target=self._run, name="fx-rates", daemon=True)
+                self._refresher.start()
+
+    def _run(self) -> None:
+        age = self.age()
+        # Without any rates, table() has just tried the feed
+        wait = max(self.refresh_interval - age, 0) if age is not None else min(self.refresh_interval, _RETRY_SECONDS)
+        while not self._stop.wait(wait):
+            wait = self.refresh_interval if self.refresh() else min(self.refresh_interval, _RETRY_SECONDS)
+
+
+_fx_rates = None
+_fx_rates_lock = threading.Lock()
+
+
+def get_fx_rates() -> FxRates:
+    """Get the process-wide exchange rate table."""
+    global _fx_rates
+    if _fx_rates is None:
+        with _fx_rates_lock:
+            if _fx_rates is None:
+                settings = get_settings()
+                _fx_rates = FxRates(settings.fx_base_currency, settings.fx_rates_path, settings.fx_refresh_interval)
+    return _fx_rates
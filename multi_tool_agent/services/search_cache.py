@@ -0,0 +1,236 @@
+import asyncio
+import logging
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from ..config import get_settings
+
+logger = logging.getLogger('travel_agent')
+
+
+class _LeaderCancelled(Exception):
+    """Raised to waiting callers when the search they joined was cancelled."""
+
+
+class SearchResultCache:
+    """
+    Process-wide cache for SearchAgent results.
+
+    Entries are keyed on a normalized query, expire after a TTL and are
+    evicted least-recently-used once the cache is full. Concurrent lookups
+    for a query that is already being searched wait for that search instead
+    of starting a new one.
+    """
+
+    def __init__(self, ttl_seconds: float = 900, max_entries: int = 256):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "evictions": 0,
+            "expirations": 0
+        }
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Normalize a search query so trivially different phrasings share a key."""
+        text = unicodedata.normalize("NFKC", query or "").lower()
+        text = re.sub(r"\s+", " ", text).strip()
+        return text.rstrip("?.!").strip()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for a key, or None if missing or expired."""
+        with self._lock:
+            return self._get_locked(key)
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a value, evicting the least recently used entries if needed."""
+        with self._lock:
+            self._put_locked(key, value)
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return a cached result or run fetch, sharing in-flight searches.
+
+        Args:
+            key: Normalized cache key
+            fetch: Coroutine factory that performs the actual search
+
+        Returns:
+            The cached or freshly fetched result
+        """
+        while True:
+            with self._lock:
+                value = self._get_locked(key)
+                if value is not None:
+                    self._stats["hits"] += 1
+                    return value
+
+                pending = self._inflight.get(key)
+                if pending is None:
+                    pending = Future()
+                    self._inflight[key] = pending
+                    self._stats["misses"] += 1
+                    leader = True
+                else:
+                    self._stats["coalesced"] += 1
+                    leader = False
+
+            if not leader:
+                logger.debug("Search cache waiting on in-flight query: %s", key)
+                try:
+                    # Shield so a cancelled waiter does not cancel the shared search.
+                    return await asyncio.shield(asyncio.wrap_future(pending))
+                except _LeaderCancelled:
+                    # The original caller went away; retry as a fresh lookup.
+                    continue
+
+            try:
+                value = await fetch()
+            except asyncio.CancelledError:
+                self._finish(key, pending, exception=_LeaderCancelled())
+                raise
+            except Exception as e:
+                self._finish(key, pending, exception=e)
+                raise
+
+            self._finish(key, pending, value=value)
+            return value
+
+    def get_or_compute(self, key: str, fetch: Callable[[], Any]) -> Any:
+        """
+        Blocking counterpart of get_or_fetch, for worker threads.
+
+        Concurrent callers with the same key wait for the first one's fetch.
+        Never call it from an event loop thread on a key that get_or_fetch
+        may be fetching: the wait would block the loop running that fetch.
+
+        Args:
+            key: Cache key
+            fetch: Function that performs the actual request
+
+        Returns:
+            The cached or freshly fetched result
+        """
+        with self._lock:
+            value = self._get_locked(key)
+            if value is not None:
+                self._stats["hits"] += 1
+                return value
+            pending = self._inflight.get(key)
+            if pending is None:
+                pending = Future()
+                self._inflight[key] = pending
+                self._stats["misses"] += 1
+                leader = True
+            else:
+                self._stats["coalesced"] += 1
+                leader = False
+
+        if not leader:
+            logger.debug("Cache waiting on in-flight request: %s", key)
+            return pending.result()
+
+        try:
+            value = fetch()
+        except BaseException as e:
+            self._finish(key, pending, exception=e)
+            raise
+        self._finish(key, pending, value=value)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the current hit rate."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+            stats["inflight"] = len(self._inflight)
+        lookups = stats["hits"] + stats["misses"] + stats["coalesced"]
+        stats["hit_rate"] = (stats["hits"] + stats["coalesced"]) / lookups if lookups else 0.0
+        return stats
+
+    def clear(self) -> None:
+        """Drop all cached entries (in-flight searches are left to finish)."""
+        with self._lock:
+            self._entries.clear()
+
+    def _finish(self, key: str, pending: Future, value: Any = None, exception: Optional[BaseException] = None) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+            if exception is None and value is not None:
+                self._put_locked(key, value)
+        if pending.done():
+            return
+        if exception is not None:
+            pending.set_exception(exception)
+        else:
+            pending.set_result(value)
+
+    def _get_locked(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self._stats["expirations"] += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _put_locked(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+
+_search_cache = None
+_search_cache_lock = threading.Lock()
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+def get_search_cache() -> SearchResultCache:
+    """Get the singleton search result cache shared by all agents."""
+    global _search_cache
+    if _search_cache is None:
+        with _search_cache_lock:
+            if _search_cache is None:
+                settings = get_settings()
+                _search_cache = SearchResultCache(
+                    ttl_seconds=settings.search_cache_ttl,
+                    max_entries=settings.search_cache_max_entries
+                )
+    return _search_cache
+
+def get_response_cache() -> Optional[SearchResultCache]:
+    """
+    Get the singleton cache of upstream search results, or None when disabled.
+
+    Only searches whose results are the same for every user are cached
+    (hotel lists, one-way flight searches, weather), never hotel offers or
+    confirmed prices. Cached payloads are shared between callers and must
+    not be modified.
+    """
+    global _response_cache
+    settings = get_settings()
+    if settings.upstream_cache_ttl <= 0:
+        return None
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = SearchResultCache(
+                    ttl_seconds=settings.upstream_cache_ttl,
+                    max_entries=settings.upstream_cache_max_entries
+                )
+    return _response_cache
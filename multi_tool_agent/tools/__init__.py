@@ -1,13 +1,63 @@
-from .flight_tools import get_flight_offers
-from .hotel_tools import get_hotel_offers
-from .booking_tools import simulate_booking
-from .weather_tools import get_weather
-from .datetime_tools import get_current_datetime
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .flight_tools import get_flight_offers, get_multi_city_flight_offers, confirm_flight_prices
+    from .hotel_tools import get_hotel_offers
+    from .booking_tools import simulate_booking
+    from .weather_tools import get_weather
+    from .datetime_tools import get_current_datetime
+    from .search_tools import TracedAgentTool, CachedAgentTool
+    from .context_tools import recall_tool_output
+    from .query_tools import filter_cached_flights, filter_cached_hotels, rank_cached_hotels
+    from .trip_tools import plan_trip, compare_destinations, plan_itinerary
+
+# Exported name -> submodule defining it; imported on first attribute access
+_EXPORTS = {
+    'get_flight_offers': '.flight_tools',
+    'get_multi_city_flight_offers': '.flight_tools',
+    'confirm_flight_prices': '.flight_tools',
+    'get_hotel_offers': '.hotel_tools',
+    'simulate_booking': '.booking_tools',
+    'get_weather': '.weather_tools',
+    'get_current_datetime': '.datetime_tools',
+    'TracedAgentTool': '.search_tools',
+    'CachedAgentTool': '.search_tools',
+    'recall_tool_output': '.context_tools',
+    'filter_cached_flights': '.query_tools',
+    'filter_cached_hotels': '.query_tools',
+    'rank_cached_hotels': '.query_tools',
+    'plan_trip': '.trip_tools',
+    'compare_destinations': '.trip_tools',
+    'plan_itinerary': '.trip_tools'
+}
 
 __all__ = [
     'get_flight_offers',
+    'get_multi_city_flight_offers',
+    'confirm_flight_prices',
     'get_hotel_offers',
     'simulate_booking',
     'get_weather',
-    'get_current_datetime'
-]
\ No newline at end of file
+    'get_current_datetime',
+    'TracedAgentTool',
+    'CachedAgentTool',
+    'recall_tool_output',
+    'filter_cached_flights',
+    'filter_cached_hotels',
+    'rank_cached_hotels',
+    'plan_trip',
+    'compare_destinations',
+    'plan_itinerary'
+]
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
\ No newline at end of file
@@ -0,0 +1,29 @@
+from typing import Dict, Any
+import logging
+from google.adk.tools import ToolContext
+from ..conversation_context import get_tool_output
+from ..observability.tracing import traced
+
+logger = logging.getLogger('travel_agent')
+
+@traced("tool.recall_tool_output", measure_result=True)
+def recall_tool_output(tool_context: ToolContext, handle: str) -> Dict[str, Any]:
+    """
+    Retrieve the full output of an earlier tool call that was compacted.
+    
+    Older tool results in the conversation are replaced by a short summary
+    and a handle (e.g. 'ctx-1a2b3c4d5e6f') to keep the prompt small. Use this
+    tool only when the summary is not enough to answer the user. Handles only
+    resolve within the conversation that produced them.
+    
+    Args:
+        handle: The handle shown in the compacted tool result
+        
+    Returns:
+        Dictionary containing the original tool output or error message
+    """
+    logger.info("Tool: recall_tool_output called for %s", handle)
+    stored = get_tool_output(tool_context.session.id, handle)
+    if stored is None:
+        return {"error": f"No stored output for handle {handle}; call the original tool again"}
+    return {"tool": stored["tool"], "output": stored["response"]}
\ No newline at end of file
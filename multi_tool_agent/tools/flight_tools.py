@@ -1,29 +1,148 @@
 from typing import Dict, Any, Optional, List
 import logging
+from google.adk.tools import ToolContext
 from ..services import FlightService
+from ..services.working_set import WorkingSet
+from ..streaming import report_progress
+from ..observability.tracing import traced
 
 logger = logging.getLogger('travel_agent')
 
-def get_flight_offers(origin: str, destination: str, date: str, adults: int = 1) -> Dict[str, Any]:
+@traced("tool.get_flight_offers", measure_result=True)
+def get_flight_offers(
+    origin: str,
+    destination: str,
+    date: str,
+    adults: int = 1,
+    return_date: Optional[str] = None,
+    travel_class: Optional[str] = None,
+    nonstop: bool = False,
+    max_price: Optional[float] = None,
+    currency: Optional[str] = None,
+    tool_context: Optional[ToolContext] = None
+) -> Dict[str, Any]:
     """
     Search for flight offers between two cities for a specific date.
+
+    With return_date the search returns round-trip fares (one offer covers
+    both flights). Filters are applied by the search itself, so prefer them
+    over searching everything and filtering afterwards.
     
     Args:
         origin: Origin airport IATA code (e.g., 'JFK')
         destination: Destination airport IATA code (e.g., 'LHR')
         date: Departure date in YYYY-MM-DD format
         adults: Number of adult passengers (default: 1)
+        return_date: Return date in YYYY-MM-DD format for a round trip
+        travel_class: ECONOMY, PREMIUM_ECONOMY, BUSINESS or FIRST
+        nonstop: Only nonstop flights (default: False)
+        max_price: Maximum price per traveler
+        currency: Currency code for prices (e.g., 'USD')
         
     Returns:
-        Dictionary containing flight offers or error message
+        Dictionary containing flight offers or error message. Round-trip
+        segments carry itinerary 0 (outbound) or 1 (return).
     """
-    logger.info(f"Tool: get_flight_offers called for {origin} to {destination} on {date}")
+    logger.info("Tool: get_flight_offers called for %s to %s on %s", origin, destination, date)
+    report_progress(f"Searching flights {origin} → {destination} on {date}...")
     try:
         flight_service = FlightService()
-        offers = flight_service.search_flights(origin, destination, date, adults)
-        logger.info(f"Successfully retrieved {len(offers)} flight offers")
+        if return_date or travel_class or nonstop or max_price is not None or currency:
+            origin_destinations = [{"origin": origin, "destination": destination, "date": date}]
+            if return_date:
+                origin_destinations.append({"origin": destination, "destination": origin, "date": return_date})
+            offers = flight_service.search_flight_offers(
+                origin_destinations, adults, travel_class, nonstop, max_price, currency
+            )
+        else:
+            offers = flight_service.search_flights(origin, destination, date, adults)
+        logger.info("Successfully retrieved %s flight offers", len(offers))
+        report_progress(f"Found {len(offers)} flight offers {origin} → {destination} on {date}", count=len(offers))
+        if tool_context is not None:
+            query = {"origin": origin, "destination": destination, "date": date, "adults": adults}
+            if return_date:
+                query["return_date"] = return_date
+            WorkingSet(tool_context.state).remember_flights(query, offers)
         return {"flight_offers": offers}
     except Exception as e:
         error_msg = f"Failed to get flight offers: {str(e)}"
         logger.error(error_msg, exc_info=True)
-        return {"error": error_msg} 
\ No newline at end of file
+        return {"error": error_msg} 
+
+@traced("tool.get_multi_city_flight_offers", measure_result=True)
+def get_multi_city_flight_offers(
+    flights: List[Dict[str, str]],
+    adults: int = 1,
+    travel_class: Optional[str] = None,
+    nonstop: bool = False,
+    max_price: Optional[float] = None,
+    currency: Optional[str] = None,
+    tool_context: Optional[ToolContext] = None
+) -> Dict[str, Any]:
+    """
+    Search multi-city flight offers: every flight of the trip priced together in one search.
+
+    Args:
+        flights: Flights in travel order, each {"origin": IATA code, "destination": IATA code,
+                 "date": YYYY-MM-DD}, e.g. [{"origin": "NYC", "destination": "LIS", "date": "2025-06-01"},
+                 {"origin": "LIS", "destination": "MAD", "date": "2025-06-04"}]
+        adults: Number of adult passengers (default: 1)
+        travel_class: ECONOMY, PREMIUM_ECONOMY, BUSINESS or FIRST
+        nonstop: Only nonstop flights (default: False)
+        max_price: Maximum price per traveler
+        currency: Currency code for prices (e.g., 'USD')
+
+    Returns:
+        Dictionary containing flight offers (each covers all flights; segments
+        carry the index of the flight they belong to) or error message
+    """
+    logger.info("Tool: get_multi_city_flight_offers called for %s flights", len(flights or []))
+    try:
+        for flight in flights or []:
+            missing = [field for field in ("origin", "destination", "date") if not flight.get(field)]
+            if missing:
+                return {"error": f"Every flight needs origin, destination and date; missing {', '.join(missing)} in {flight}"}
+        route = " → ".join([flights[0]["origin"]] + [flight["destination"] for flight in flights]) if flights else ""
+        report_progress(f"Searching multi-city flights {route}...")
+        offers = FlightService().search_flight_offers(flights, adults, travel_class, nonstop, max_price, currency)
+        logger.info("Successfully retrieved %s multi-city flight offers", len(offers))
+        report_progress(f"Found {len(offers)} flight offers {route}", count=len(offers))
+        if tool_context is not None:
+            WorkingSet(tool_context.state).remember_flights(
+                {
+                    "origin": flights[0]["origin"],
+                    "destination": flights[-1]["destination"],
+                    "date": flights[0]["date"],
+                    "adults": adults,
+                    "flights": flights
+                },
+                offers
+            )
+        return {"flight_offers": offers}
+    except Exception as e:
+        error_msg = f"Failed to get multi-city flight offers: {str(e)}"
+        logger.error(error_msg, exc_info=True)
+        return {"error": error_msg}
+
+@traced("tool.confirm_flight_prices", measure_result=True)
+def confirm_flight_prices(offer_ids: List[str]) -> Dict[str, Any]:
+    """
+    Confirm the current price of flight offers from an earlier search.
+
+    Use this before presenting a final shortlist or before booking; several
+    offers are confirmed with one request.
+
+    Args:
+        offer_ids: Flight offer IDs from get_flight_offers
+
+    Returns:
+        Dictionary mapping each offer ID to its confirmed price (or an error)
+    """
+    logger.info("Tool: confirm_flight_prices called for %s offers", len(offer_ids))
+    report_progress(f"Confirming prices for {len(offer_ids)} flight offers...")
+    try:
+        return {"confirmations": FlightService().confirm_prices(offer_ids)}
+    except Exception as e:
+        error_msg = f"Failed to confirm flight prices: {str(e)}"
+        logger.error(error_msg, exc_info=True)
+        return {"error": error_msg}
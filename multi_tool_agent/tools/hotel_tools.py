@@ -1,9 +1,14 @@
 from typing import Dict, List, Any, Optional
 import logging
-from ..services.hotel_service import HotelService, RadiusUnit, HotelSource, HotelAmenities
+from google.adk.tools import ToolContext
+from ..services.hotel_service import HotelService, RadiusUnit, HotelSource, HotelAmenities, top_hotels
+from ..services.working_set import HOTEL_SORT_KEYS, WorkingSet, collect_hotels
+from ..streaming import report_progress
+from ..observability.tracing import traced
 
 logger = logging.getLogger('travel_agent')
 
+@traced("tool.get_hotel_offers", measure_result=True)
 def get_hotel_offers(
     city_code: str,
     radius: int = 50,
@@ -11,10 +16,13 @@ def get_hotel_offers(
     chain_codes: Optional[List[str]] = None,
     amenities: Optional[List[str]] = None,
     ratings: Optional[List[str]] = None,
-    hotel_source: str = "ALL"
+    hotel_source: str = "ALL",
+    limit: int = 10,
+    sort_by: str = "distance",
+    tool_context: Optional[ToolContext] = None
 ) -> Dict[str, Any]:
     """
-    Search for hotels in a specific city.
+    Search for hotels in a specific city and return the best few.
     
     Args:
         city_code: IATA city or airport code (e.g., 'PAR' for Paris)
@@ -24,11 +32,14 @@ def get_hotel_offers(
         amenities: Optional list of amenities (e.g., SWIMMING_POOL, SPA, WIFI)
         ratings: Optional list of hotel star ratings (1-5)
         hotel_source: Source of hotel data - 'BEDBANK', 'DIRECTCHAIN', or 'ALL' (default: ALL)
+        limit: Maximum number of hotels to return (default: 10)
+        sort_by: 'distance' (closest first), 'rating' (highest first) or 'name' (default: distance)
         
     Returns:
-        Dictionary containing hotels or error message
+        Dictionary containing the top hotels and total_matches, or error message
     """
-    logger.info(f"Tool: get_hotel_offers called for {city_code}")
+    logger.info("Tool: get_hotel_offers called for %s", city_code)
+    report_progress(f"Searching hotels in {city_code}...")
     
     try:
         hotel_service = HotelService()
@@ -38,11 +49,15 @@ def get_hotel_offers(
             radius_unit_enum = RadiusUnit[radius_unit.upper()]
             hotel_source_enum = HotelSource[hotel_source.upper()]
         except KeyError as e:
-            logger.error(f"Invalid enum value: {str(e)}")
+            logger.error("Invalid enum value: %s", e)
             return {"error": f"Invalid value: {str(e)}"}
+        if sort_by not in HOTEL_SORT_KEYS:
+            return {"error": f"sort_by must be one of {sorted(HOTEL_SORT_KEYS)}"}
+        if limit < 1:
+            return {"error": "limit must be at least 1"}
         
         # Search for hotels
-        hotels = hotel_service.search_hotels(
+        hotels = hotel_service.iter_hotels(
             city_code=city_code,
             radius=radius,
             radius_unit=radius_unit_enum,
@@ -51,9 +66,28 @@ def get_hotel_offers(
             ratings=ratings,
             hotel_source=hotel_source_enum
         )
+        # Follow-up filters run over every hotel, not just the ones returned:
+        # each is kept, reduced to the fields they read, as it streams past
+        cached: List[Dict[str, Any]] = []
+        if tool_context is not None:
+            hotels = collect_hotels(hotels, cached)
+        top, total = top_hotels(hotels, limit, sort_by)
+        if tool_context is not None:
+            WorkingSet(tool_context.state).remember_hotels(
+                {
+                    "city_code": city_code.upper(),
+                    "radius": radius,
+                    "radius_unit": radius_unit.upper(),
+                    "chain_codes": chain_codes,
+                    "amenities": amenities,
+                    "ratings": ratings
+                },
+                cached
+            )
         
-        logger.info(f"Successfully retrieved {len(hotels)} hotels")
-        return {"hotels": hotels}
+        logger.info("Successfully retrieved %s hotels, returning %s by %s", total, len(top), sort_by)
+        report_progress(f"Found {total} hotels in {city_code}", count=total)
+        return {"hotels": top, "total_matches": total, "sort_by": sort_by}
         
     except Exception as e:
         error_msg = f"Failed to get hotels: {str(e)}"
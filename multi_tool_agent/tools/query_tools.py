@@ -0,0 +1,158 @@
+from typing import Dict, List, Any, Optional
+import logging
+from google.adk.tools import ToolContext
+from ..services.working_set import WorkingSet
+from ..observability.tracing import traced
+from ..observability.metrics import record_cache_lookup
+
+logger = logging.getLogger('travel_agent')
+
+@traced("tool.filter_cached_flights", measure_result=True)
+def filter_cached_flights(
+    tool_context: ToolContext,
+    origin: Optional[str] = None,
+    destination: Optional[str] = None,
+    date: Optional[str] = None,
+    max_price: Optional[float] = None,
+    max_stops: Optional[int] = None,
+    carriers: Optional[List[str]] = None,
+    max_duration_minutes: Optional[int] = None,
+    sort_by: str = "price",
+    fields: Optional[List[str]] = None,
+    limit: int = 10
+) -> Dict[str, Any]:
+    """
+    Filter, sort and project the flight offers already fetched in this session.
+    
+    Use this for follow-ups like "only nonstop", "under $400" or "only Air France"
+    instead of calling get_flight_offers again. No network call is made. If the
+    result has needs_search=True, call get_flight_offers instead.
+    
+    Args:
+        origin: Origin IATA code the follow-up refers to (used to check the cache matches)
+        destination: Destination IATA code the follow-up refers to
+        date: Departure date (YYYY-MM-DD) the follow-up refers to
+        max_price: Maximum total price
+        max_stops: Maximum number of stops on any leg (0 for nonstop only)
+        carriers: Allowed 2-letter airline codes (e.g., ['AF', 'KL'])
+        max_duration_minutes: Maximum flying time of any leg in minutes
+        sort_by: 'price', 'stops', 'duration' or 'departure' (default: price)
+        fields: Optional fields to return (id, price, currency, normalized_price, stops, carriers,
+                flight_numbers, departure, arrival, duration_minutes, seats_available,
+                last_ticketing_date)
+        limit: Maximum number of offers to return (default: 10)
+        
+    Returns:
+        Dictionary containing matching offers and match counts, or needs_search/error
+    """
+    logger.info("Tool: filter_cached_flights called (max_price=%s, max_stops=%s, carriers=%s)", max_price, max_stops, carriers)
+    result = WorkingSet(tool_context.state).query_flights(
+        origin=origin,
+        destination=destination,
+        date=date,
+        max_price=max_price,
+        max_stops=max_stops,
+        carriers=carriers,
+        max_duration_minutes=max_duration_minutes,
+        sort_by=sort_by,
+        fields=fields,
+        limit=limit
+    )
+    record_cache_lookup("working_set", "needs_search" not in result)
+    return result
+
+@traced("tool.filter_cached_hotels", measure_result=True)
+def filter_cached_hotels(
+    tool_context: ToolContext,
+    city_code: Optional[str] = None,
+    min_rating: Optional[float] = None,
+    amenities: Optional[List[str]] = None,
+    max_distance: Optional[float] = None,
+    chain_codes: Optional[List[str]] = None,
+    sort_by: str = "rating",
+    fields: Optional[List[str]] = None,
+    limit: int = 10
+) -> Dict[str, Any]:
+    """
+    Filter, sort and project the hotels already fetched in this session.
+    
+    Use this for follow-ups like "4-star hotels with a pool" or "within 2 km"
+    instead of calling get_hotel_offers again. No network call is made. If the
+    result has needs_search=True, call get_hotel_offers instead.
+    
+    Args:
+        city_code: IATA city code the follow-up refers to (used to check the cache matches)
+        min_rating: Minimum star rating (1-5)
+        amenities: Amenities every hotel must have (e.g., SWIMMING_POOL, SPA, WIFI)
+        max_distance: Maximum distance from the city center
+        chain_codes: Allowed 2-letter hotel chain codes
+        sort_by: 'rating', 'distance' or 'name' (default: rating)
+        fields: Optional fields to return (hotelId, name, rating, distance, distance_unit,
+                chainCode, amenities, city)
+        limit: Maximum number of hotels to return (default: 10)
+        
+    Returns:
+        Dictionary containing matching hotels and match counts, or needs_search/error
+    """
+    logger.info("Tool: filter_cached_hotels called (min_rating=%s, amenities=%s)", min_rating, amenities)
+    result = WorkingSet(tool_context.state).query_hotels(
+        city_code=city_code,
+        min_rating=min_rating,
+        amenities=amenities,
+        max_distance=max_distance,
+        chain_codes=chain_codes,
+        sort_by=sort_by,
+        fields=fields,
+        limit=limit
+    )
+    record_cache_lookup("working_set", "needs_search" not in result)
+    return result
+
+
+@traced("tool.rank_cached_hotels", measure_result=True)
+def rank_cached_hotels(
+    tool_context: ToolContext,
+    city_code: Optional[str] = None,
+    amenities: Optional[List[str]] = None,
+    min_rating: Optional[float] = None,
+    max_distance: Optional[float] = None,
+    distance_weight: float = 0.35,
+    rating_weight: float = 0.3,
+    amenity_weight: float = 0.2,
+    limit: int = 5
+) -> Dict[str, Any]:
+    """
+    Rank the hotels already fetched in this session by a weighted score.
+    
+    Use this to recommend hotels instead of comparing them yourself. Each hotel
+    scores 0-1 on closeness to the center, star rating and the share of the
+    wanted amenities it has; the weights say how much each matters (raise
+    rating_weight for "the best hotel", distance_weight for "central"). Every
+    result comes with its score and a short reason. No network call is made.
+    If the result has needs_search=True, call get_hotel_offers first.
+    
+    Args:
+        city_code: IATA city code the request refers to (used to check the cache matches)
+        amenities: Amenities the traveller wants (e.g., SWIMMING_POOL, SPA, WIFI); they raise
+                   the score, hotels lacking some are not excluded
+        min_rating: Only rank hotels with at least this star rating
+        max_distance: Only rank hotels within this distance of the center
+        distance_weight: Weight of closeness to the center (default: 0.35)
+        rating_weight: Weight of the star rating (default: 0.3)
+        amenity_weight: Weight of the amenity match (default: 0.2)
+        limit: Maximum number of hotels to return (default: 5)
+        
+    Returns:
+        Dictionary containing ranked hotels with score, score_components and why, or needs_search/error
+    """
+    logger.info("Tool: rank_cached_hotels called (amenities=%s, min_rating=%s)", amenities, min_rating)
+    result = WorkingSet(tool_context.state).rank_hotels(
+        city_code=city_code,
+        amenities=amenities,
+        min_rating=min_rating,
+        max_distance=max_distance,
+        weights={"distance": distance_weight, "rating": rating_weight, "amenities": amenity_weight},
+        limit=limit
+    )
+    record_cache_lookup("working_set", "needs_search" not in result)
+    return result
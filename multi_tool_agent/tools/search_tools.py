@@ -0,0 +1,54 @@
+from typing import Dict, Any
+import json
+import logging
+from google.adk.tools import agent_tool
+from ..services.search_cache import get_search_cache
+from ..streaming import report_progress
+from ..observability.tracing import span
+from ..observability.metrics import record_cache_lookup
+
+logger = logging.getLogger('travel_agent')
+
+class TracedAgentTool(agent_tool.AgentTool):
+    """AgentTool that records each sub-agent call as a span."""
+
+    async def run_async(self, *, args: Dict[str, Any], tool_context) -> Any:
+        with span("agent_tool." + self.agent.name, request_chars=len(json.dumps(args, default=str))) as call_span:
+            result = await super().run_async(args=args, tool_context=tool_context)
+            call_span.set(result_chars=len(result) if isinstance(result, str) else len(json.dumps(result, default=str)))
+            return result
+
+
+class CachedAgentTool(TracedAgentTool):
+    """
+    AgentTool that serves repeated requests from the shared search cache.
+
+    Every agent that wraps the same sub-agent with this tool shares one
+    process-wide cache, and identical requests issued while a search is
+    still running wait for that search instead of starting another.
+    """
+
+    async def run_async(self, *, args: Dict[str, Any], tool_context) -> Any:
+        cache = get_search_cache()
+        request = args.get("request")
+        if request is None:
+            request = json.dumps(args, ensure_ascii=False, sort_keys=True)
+        key = f"{self.agent.name}:{cache.normalize_query(request)}"
+        report_progress(f"Searching the web: {request}...")
+
+        fetched = False
+
+        async def fetch():
+            nonlocal fetched
+            fetched = True
+            logger.info("Tool: %s searching for: %s", self.agent.name, request)
+            return await super(CachedAgentTool, self).run_async(args=args, tool_context=tool_context)
+
+        with span("search_cache.lookup", agent=self.agent.name) as lookup_span:
+            result = await cache.get_or_fetch(key, fetch)
+            # Waiting on an identical in-flight search counts as a hit too
+            lookup_span.set(cache="miss" if fetched else "hit")
+        record_cache_lookup("search", not fetched)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Search cache stats: %s", cache.stats())
+        return result
@@ -0,0 +1,163 @@
+from typing import Dict, Any, List, Optional
+import logging
+from ..services import TravelPlanService
+from ..streaming import report_progress
+from ..observability.tracing import traced
+
+logger = logging.getLogger('travel_agent')
+
+@traced("tool.plan_trip", measure_result=True)
+def plan_trip(
+    origin: str,
+    destination: str,
+    start_date: str,
+    end_date: str,
+    max_budget: float,
+    adults: int = 1,
+    limit: int = 3,
+    currency: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Find the best flight + hotel combinations for a trip within a budget.
+
+    Args:
+        origin: Origin airport IATA code (e.g., 'NYC')
+        destination: Destination IATA city code (e.g., 'PAR')
+        start_date: Departure and check-in date in YYYY-MM-DD format
+        end_date: Check-out date in YYYY-MM-DD format
+        max_budget: Maximum total price of the outbound flight and the hotel stay
+        adults: Number of adult travelers (default: 1)
+        limit: Combinations to return per objective (default: 3)
+        currency: Currency of max_budget and the prices (default: USD, or the configured FX_CURRENCY)
+
+    Returns:
+        Dictionary with trip_details, weather, options (how many flights,
+        hotels and combinations fit the budget) and plans: the cheapest,
+        fastest and best_rated combinations and the pareto set (options
+        no other beats on price, flight time and hotel rating at once),
+        or error message. Prices are in trip_details.currency; an offer
+        priced in another currency also shows its own offer_price
+    """
+    logger.info("Tool: plan_trip called for %s-%s, %s to %s, budget %s", origin, destination, start_date, end_date, max_budget)
+    report_progress(f"Planning {origin} to {destination} within {max_budget}...")
+    if max_budget <= 0:
+        return {"error": "max_budget must be positive"}
+    if limit < 1:
+        return {"error": "limit must be at least 1"}
+    try:
+        plan = TravelPlanService().collect_travel_data(
+            origin, destination, start_date, end_date, max_budget, adults, limit, currency=currency
+        )
+        report_progress(
+            f"Found {plan['options']['combinations_within_budget']} combinations within budget",
+            count=plan['options']['combinations_within_budget']
+        )
+        return plan
+    except ValueError as e:
+        # Invalid arguments (unknown currency, bad dates, no destinations): no traceback needed
+        error_msg = f"Failed to plan trip: {str(e)}"
+        logger.warning(error_msg)
+        return {"error": error_msg}
+    except Exception as e:
+        error_msg = f"Failed to plan trip: {str(e)}"
+        logger.error(error_msg, exc_info=True)
+        return {"error": error_msg}
+
+
+@traced("tool.compare_destinations", measure_result=True)
+def compare_destinations(
+    origin: str,
+    destinations: List[str],
+    start_date: str,
+    end_date: str,
+    max_budget: float,
+    adults: int = 1,
+    currency: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Compare the same trip to several destinations with one call.
+
+    Searches flights, hotels and weather for every destination at once and
+    returns a comparison table, so there is no need to search each
+    destination separately.
+
+    Args:
+        origin: Origin airport IATA code (e.g., 'LON')
+        destinations: Destination IATA city codes (e.g., ['LIS', 'BCN', 'ROM'])
+        start_date: Departure and check-in date in YYYY-MM-DD format
+        end_date: Check-out date in YYYY-MM-DD format
+        max_budget: Maximum total price of the outbound flight and the hotel stay
+        adults: Number of adult travelers (default: 1)
+        currency: Currency of max_budget and the prices (default: USD, or the configured FX_CURRENCY)
+
+    Returns:
+        Dictionary with trip_details and comparison: one row per destination
+        with its cheapest, fastest and best_rated flight + hotel combination
+        within budget, combinations_within_budget and a weather summary,
+        cheapest destination first, or error message
+    """
+    logger.info("Tool: compare_destinations called for %s to %s, %s to %s", origin, destinations, start_date, end_date)
+    report_progress(f"Comparing {', '.join(destinations)} from {origin}...")
+    if max_budget <= 0:
+        return {"error": "max_budget must be positive"}
+    try:
+        comparison = TravelPlanService().compare_destinations(
+            origin, destinations, start_date, end_date, max_budget, adults, currency=currency
+        )
+        report_progress(f"Compared {len(comparison['comparison'])} destinations", count=len(comparison['comparison']))
+        return comparison
+    except ValueError as e:
+        # Invalid arguments (unknown currency, bad dates, no destinations): no traceback needed
+        error_msg = f"Failed to compare destinations: {str(e)}"
+        logger.warning(error_msg)
+        return {"error": error_msg}
+    except Exception as e:
+        error_msg = f"Failed to compare destinations: {str(e)}"
+        logger.error(error_msg, exc_info=True)
+        return {"error": error_msg}
+
+
+@traced("tool.plan_itinerary", measure_result=True)
+def plan_itinerary(
+    origin: str,
+    legs: List[Dict[str, str]],
+    adults: int = 1,
+    return_to_origin: bool = True,
+    max_budget: Optional[float] = None,
+    currency: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Plan a multi-city trip in one call: a flight into each city and a hotel for its nights.
+
+    Args:
+        origin: Origin airport IATA code (e.g., 'NYC')
+        legs: Cities in travel order, each {"city": IATA city code, "start_date": arrival
+              and check-in date (YYYY-MM-DD), "end_date": check-out date (YYYY-MM-DD)},
+              e.g. [{"city": "LIS", "start_date": "2025-06-01", "end_date": "2025-06-04"},
+                    {"city": "MAD", "start_date": "2025-06-04", "end_date": "2025-06-07"}]
+        adults: Number of adult travelers (default: 1)
+        return_to_origin: Also plan the flight home on the last check-out date (default: True)
+        max_budget: Optional budget for all flights and hotels together
+        currency: Currency of max_budget and the prices (default: USD, or the configured FX_CURRENCY)
+
+    Returns:
+        Dictionary with legs (per city: chosen flight in, hotel, alternatives and
+        weather), return_flight, totals and conflicts (e.g. a flight landing after
+        check-in day, a connection that cannot be made, nights without a hotel),
+        or error message
+    """
+    logger.info("Tool: plan_itinerary called from %s with %s legs", origin, len(legs or []))
+    report_progress(f"Planning {len(legs or [])} legs from {origin}...")
+    try:
+        plan = TravelPlanService().plan_itinerary(origin, legs, adults, return_to_origin, max_budget, currency=currency)
+        report_progress(f"Planned {len(plan['legs'])} legs with {len(plan['conflicts'])} conflicts", count=len(plan['legs']))
+        return plan
+    except ValueError as e:
+        # Invalid arguments (unknown currency, bad dates, no destinations): no traceback needed
+        error_msg = f"Failed to plan itinerary: {str(e)}"
+        logger.warning(error_msg)
+        return {"error": error_msg}
+    except Exception as e:
+        error_msg = f"Failed to plan itinerary: {str(e)}"
+        logger.error(error_msg, exc_info=True)
+        return {"error": error_msg}
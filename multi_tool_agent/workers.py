@@ -0,0 +1,346 @@
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import time
+import uuid
+import zlib
+from typing import Any, Dict, List, Optional, Set
+
+from .server import AgentServer, build_agent, request_session_id
+
+logger = logging.getLogger('travel_agent')
+
+# How much of a request the dispatcher peeks at to find the session ID
+MAX_PEEK_BYTES = 64 * 1024
+PEEK_TIMEOUT = 5.0
+
+
+class SharedLimiter:
+    """
+    Rate limit and token budget shared by every worker process.
+
+    State lives in a small shared-memory array guarded by a process-shared
+    lock. It must be created before the workers are forked so they all
+    inherit the same memory.
+
+    Args:
+        rate_limit: Agent turns allowed per second across all workers (0 = unlimited)
+        burst: Turns that may start back to back before the rate applies
+        token_budget: LLM tokens allowed per minute across all workers (0 = unlimited)
+    """
+
+    _RATE_TOKENS, _RATE_UPDATED, _BUDGET_USED, _BUDGET_WINDOW = range(4)
+
+    def __init__(self, rate_limit: float = 0.0, burst: Optional[int] = None, token_budget: int = 0):
+        self.rate_limit = rate_limit
+        self.burst = burst or max(1, int(rate_limit))
+        self.token_budget = token_budget
+        self._lock = multiprocessing.Lock()
+        self._state = multiprocessing.RawArray("d", 4)
+        now = time.monotonic()
+        self._state[self._RATE_TOKENS] = self.burst
+        self._state[self._RATE_UPDATED] = now
+        self._state[self._BUDGET_WINDOW] = now
+
+    def try_acquire(self) -> bool:
+        """Take one turn from the shared rate limit and check the token budget."""
+        with self._lock:
+            now = time.monotonic()
+            if self.token_budget:
+                self._roll_budget_window(now)
+                if self._state[self._BUDGET_USED] >= self.token_budget:
+                    return False
+            if self.rate_limit:
+                elapsed = now - self._state[self._RATE_UPDATED]
+                tokens = min(self.burst, self._state[self._RATE_TOKENS] + elapsed * self.rate_limit)
+                self._state[self._RATE_UPDATED] = now
+                if tokens < 1:
+                    self._state[self._RATE_TOKENS] = tokens
+                    return False
+                self._state[self._RATE_TOKENS] = tokens - 1
+            return True
+
+    def record_tokens(self, count: int) -> None:
+        """Charge LLM tokens used by a finished turn against the shared budget."""
+        if not self.token_budget or not count:
+            return
+        with self._lock:
+            self._roll_budget_window(time.monotonic())
+            self._state[self._BUDGET_USED] += count
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "rate_limit": self.rate_limit,
+                "rate_tokens": round(self._state[self._RATE_TOKENS], 2),
+                "token_budget": self.token_budget,
+                "tokens_used_this_minute": int(self._state[self._BUDGET_USED])
+            }
+
+    def _roll_budget_window(self, now: float) -> None:
+        if now - self._state[self._BUDGET_WINDOW] >= 60:
+            self._state[self._BUDGET_WINDOW] = now
+            self._state[self._BUDGET_USED] = 0
+
+
+def session_from_request(data: bytes) -> Optional[str]:
+    """Extract the session ID from a (possibly partial) raw HTTP request, as AgentServer reads it."""
+    head, sep, body = data.partition(b"\r\n\r\n")
+    headers = {}
+    for line in head.decode("latin-1").split("\r\n")[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    payload = None
+    if sep and body and not headers.get("x-session-id"):
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            pass
+    return request_session_id(headers, payload)
+
+
+def session_slot(session_id: str, workers: int) -> int:
+    """The worker that owns a session."""
+    return zlib.crc32(session_id.encode()) % workers
+
+
+def new_session_id(slot: int, workers: int) -> str:
+    """A fresh session ID owned by `slot`, so the session's next turns route back to it."""
+    while True:
+        session_id = uuid.uuid4().hex
+        if session_slot(session_id, workers) == slot:
+            return session_id
+
+
+def _request_complete(data: bytes) -> bool:
+    head, sep, body = data.partition(b"\r\n\r\n")
+    if not sep:
+        return False
+    for line in head.split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"content-length":
+            try:
+                return len(body) >= int(value.strip())
+            except ValueError:
+                return True
+    return True
+
+
+class PreforkServer:
+    """
+    Pre-fork worker pool for the agent server.
+
+    The parent builds the agent once, then forks the workers so they start
+    with it already in memory. The parent owns the listening socket: it
+    accepts each connection, peeks at the request for the session ID and
+    hands the connection's file descriptor to the worker that owns that
+    session (crc32(session_id) % workers), so a session always lands on the
+    same worker. Requests without a session ID are spread round-robin, and
+    the worker that takes one issues a session ID that hashes back to it.
+    Workers that die are re-forked into the same slot. Forking only
+    happens while no event loop is running: the dispatch loop returns when
+    a worker exits, the worker is re-forked, and dispatching resumes on a
+    fresh loop.
+    """
+
+    def __init__(self, args, limiter: Optional[SharedLimiter] = None):
+        self.args = args
+        self.workers = args.workers
+        self.limiter = limiter
+        self.agent = None
+        self._pids: List[Optional[int]] = [None] * self.workers
+        self._channels: List[Optional[socket.socket]] = [None] * self.workers
+        self._listener: Optional[socket.socket] = None
+        self._next = 0
+        self._stopping = False
+
+    def run(self) -> None:
+        self.agent = build_agent(self.args.stub, self.args.stub_latency)
+        listener = socket.create_server((self.args.host, self.args.port), backlog=1024)
+        listener.setblocking(False)
+        self._listener = listener
+        for slot in range(self.workers):
+            self._spawn(slot)
+        logger.info("Pre-fork server listening on %s:%s with %s workers", self.args.host, self.args.port, self.workers)
+
+        signal.signal(signal.SIGTERM, _raise_interrupt)
+        try:
+            while not self._stopping:
+                for slot in asyncio.run(self._dispatch(listener)):
+                    self._spawn(slot)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._shutdown()
+            listener.close()
+
+    def _spawn(self, slot: int) -> None:
+        parent_end, child_end = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+        pid = os.fork()
+        if pid == 0:
+            self._listener.close()
+            parent_end.close()
+            for channel in self._channels:
+                if channel is not None:
+                    channel.close()
+            try:
+                _worker_main(slot, child_end, self.agent, self.args, self.limiter)
+            finally:
+                os._exit(0)
+        child_end.close()
+        if self._channels[slot] is not None:
+            self._channels[slot].close()
+        self._channels[slot] = parent_end
+        self._pids[slot] = pid
+        logger.info("Started worker %s (pid %s)", slot, pid)
+
+    async def _dispatch(self, listener: socket.socket) -> List[int]:
+        """Hand connections over until workers exit; return their slots to re-fork."""
+        loop = asyncio.get_running_loop()
+        # The loop only keeps weak references to tasks
+        routes: Set[asyncio.Task] = set()
+        reaper = loop.create_task(self._reap())
+        accept = None
+        while True:
+            if accept is None:
+                accept = loop.create_task(loop.sock_accept(listener))
+            done, _ = await asyncio.wait({accept, reaper}, return_when=asyncio.FIRST_COMPLETED)
+            if accept in done:
+                conn, _ = accept.result()
+                accept = None
+                route = loop.create_task(self._route(conn))
+                routes.add(route)
+                route.add_done_callback(routes.discard)
+            if reaper in done:
+                break
+        if accept is not None:
+            accept.cancel()
+        # Connections being peeked at are handed over before the loop closes
+        if routes:
+            await asyncio.wait(routes)
+        return reaper.result()
+
+    async def _route(self, conn: socket.socket) -> None:
+        try:
+            data = await self._peek(conn)
+            session_id = session_from_request(data)
+            if session_id is not None:
+                slot = session_slot(session_id, self.workers)
+            else:
+                slot = self._next
+                self._next = (self._next + 1) % self.workers
+            socket.send_fds(self._channels[slot], [b"c"], [conn.fileno()])
+        except (OSError, asyncio.TimeoutError) as e:
+            logger.warning("Dropping connection before dispatch: %s", e)
+        finally:
+            conn.close()
+
+    async def _peek(self, conn: socket.socket) -> bytes:
+        """Wait until the request head (and body, if small) can be peeked."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + PEEK_TIMEOUT
+        seen = -1
+        while True:
+            ready = loop.create_future()
+            loop.add_reader(conn.fileno(), lambda: ready.done() or ready.set_result(None))
+            try:
+                await asyncio.wait_for(ready, timeout=max(0.0, deadline - loop.time()))
+            finally:
+                loop.remove_reader(conn.fileno())
+            data = conn.recv(MAX_PEEK_BYTES, socket.MSG_PEEK)
+            if not data or len(data) >= MAX_PEEK_BYTES or _request_complete(data):
+                return data
+            if len(data) == seen:
+                # Readable but nothing new yet; avoid spinning on a slow client
+                await asyncio.sleep(0.005)
+            seen = len(data)
+
+    async def _reap(self) -> List[int]:
+        """Wait for workers to exit unexpectedly and return their slots."""
+        while True:
+            await asyncio.sleep(1.0)
+            exited = []
+            for slot, pid in enumerate(self._pids):
+                if pid is None:
+                    continue
+                done, status = os.waitpid(pid, os.WNOHANG)
+                if done:
+                    logger.warning("Worker %s (pid %s) exited with status %s; restarting", slot, pid, status)
+                    self._pids[slot] = None
+                    exited.append(slot)
+            if exited:
+                return exited
+
+    def _shutdown(self) -> None:
+        if self._stopping:
+            return
+        self._stopping = True
+        for pid in self._pids:
+            if pid is not None:
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+        for pid in self._pids:
+            if pid is not None:
+                try:
+                    os.waitpid(pid, 0)
+                except ChildProcessError:
+                    pass
+        logger.info("Pre-fork server stopped")
+
+
+def _raise_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def _worker_main(slot: int, channel: socket.socket, agent, args, limiter: Optional[SharedLimiter]) -> None:
+    """Worker process: serve connections handed over by the parent."""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    async def serve() -> None:
+        loop = asyncio.get_running_loop()
+        server = AgentServer(
+            agent, args.max_concurrency, args.max_queue, args.queue_timeout, limiter=limiter,
+            new_session_id=lambda: new_session_id(slot, args.workers)
+        )
+        channel.setblocking(False)
+        # The loop only keeps weak references to tasks
+        connections: Set[asyncio.Task] = set()
+
+        def on_handoff() -> None:
+            try:
+                _, fds, _, _ = socket.recv_fds(channel, 16, 1)
+            except BlockingIOError:
+                return
+            for fd in fds:
+                conn = socket.socket(fileno=fd)
+                task = loop.create_task(_serve_socket(server, conn))
+                connections.add(task)
+                task.add_done_callback(connections.discard)
+
+        loop.add_reader(channel.fileno(), on_handoff)
+        logger.info("Worker %s (pid %s) ready", slot, os.getpid())
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+
+async def _serve_socket(server: AgentServer, conn: socket.socket) -> None:
+    conn.setblocking(False)
+    reader, writer = await asyncio.open_connection(sock=conn)
+    await server.handle_connection(reader, writer)
+
+
+def run_prefork(args) -> None:
+    """Run the agent server as a pre-forked pool of worker processes."""
+    limiter = None
+    if args.rate_limit or args.token_budget:
+        limiter = SharedLimiter(args.rate_limit, token_budget=args.token_budget)
+    PreforkServer(args, limiter).run()
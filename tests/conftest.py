@@ -0,0 +1,10 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Settings require credentials; tests never reach the real APIs
+os.environ.setdefault("AMADEUS_API_KEY", "test-key")
+os.environ.setdefault("AMADEUS_SECRET_KEY", "test-secret")
+os.environ.setdefault("WEATHER_API_KEY", "test-weather-key")
@@ -0,0 +1,136 @@
+import sqlite3
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from multi_agent_agent.services.booking_service import BookingIdGenerator, BookingLedger, BookingService
+from multi_agent_agent.services.offer_registry import get_offer_registry
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    return BookingLedger(str(tmp_path / "bookings.sqlite3"))
+
+
+@pytest.fixture
+def service(ledger):
+    # Synthetic offers cannot be re-priced with Amadeus
+    return BookingService(ledger, confirm_prices=False)
+
+
+def _flight(seats: int) -> str:
+    flight_id = f"F{uuid.uuid4().hex[:8]}"
+    get_offer_registry().register("flight", flight_id, {
+        "price": 200.0, "price_per_traveler": 100.0, "travelers": 2, "currency": "EUR",
+        "seats_available": seats, "last_ticketing_date": None
+    })
+    return flight_id
+
+
+def _ledger_rows(ledger) -> int:
+    ledger.flush()
+    with sqlite3.connect(ledger.path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM bookings").fetchone()[0]
+
+
+def test_booking_ids_are_unique_and_sorted():
+    generator = BookingIdGenerator()
+    ids = [generator.new_id() for _ in range(5000)]
+    assert len(set(ids)) == len(ids)
+    assert ids == sorted(ids)
+    assert all(len(i) == 26 for i in ids)
+
+
+def test_ledger_write_reports_stored(ledger):
+    record = {"booking_reference": "BK1", "idempotency_key": "k1", "created_at": "now", "status": "confirmed"}
+    assert ledger.write(record) is True
+    assert ledger.find_by_idempotency_key("k1")["booking_reference"] == "BK1"
+
+
+def test_booking_is_confirmed_and_recorded(service, ledger):
+    flight_id = _flight(seats=9)
+    booking = service.book(flight_id=flight_id, guests=2, idempotency_key="trip-1")
+    assert booking["status"] == "confirmed"
+    assert booking["total_price"] == 200.0 and booking["currency"] == "EUR"
+    assert booking["items"][0]["guests"] == 2 and "_units" not in booking["items"][0]
+    assert service.remaining("flight", flight_id) == 7
+    assert ledger.find_by_idempotency_key("trip-1")["booking_reference"] == booking["booking_reference"]
+
+
+def test_concurrent_bookings_never_oversell(service, ledger):
+    flight_id = _flight(seats=9)
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        results = list(pool.map(lambda i: service.book(flight_id=flight_id, idempotency_key=f"k{i}"), range(50)))
+
+    confirmed = [r for r in results if r.get("status") == "confirmed"]
+    assert len(confirmed) == 9
+    assert all("Not enough availability" in r["error"] for r in results if "error" in r)
+    assert len({r["booking_reference"] for r in confirmed}) == 9
+    assert service.remaining("flight", flight_id) == 0
+    assert _ledger_rows(ledger) == 9
+
+
+def test_concurrent_retries_of_one_key_book_once(service, ledger):
+    flight_id = _flight(seats=9)
+    start = threading.Barrier(16)
+
+    def book(_):
+        start.wait()
+        return service.book(flight_id=flight_id, idempotency_key="same-key")
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(book, range(16)))
+
+    assert len({r["booking_reference"] for r in results}) == 1
+    assert sum(1 for r in results if not r.get("idempotent_replay")) == 1
+    assert service.remaining("flight", flight_id) == 8
+    assert _ledger_rows(ledger) == 1
+
+
+def test_replay_after_restart_comes_from_the_ledger(service, ledger):
+    flight_id = _flight(seats=9)
+    first = service.book(flight_id=flight_id, idempotency_key="persisted")
+
+    restarted = BookingService(ledger, confirm_prices=False)
+    again = restarted.book(flight_id=flight_id, idempotency_key="persisted")
+    assert again["idempotent_replay"] is True
+    assert again["booking_reference"] == first["booking_reference"]
+
+
+def test_failed_ledger_write_books_nothing(service, ledger):
+    flight_id = _flight(seats=9)
+    service.book(flight_id=flight_id)
+    with sqlite3.connect(ledger.path) as conn:
+        conn.execute(
+            "CREATE TRIGGER reject BEFORE INSERT ON bookings BEGIN SELECT RAISE(ABORT, 'disk full'); END"
+        )
+
+    result = service.book(flight_id=flight_id, guests=2, idempotency_key="failed")
+    assert "could not be recorded" in result["error"]
+    # The reservation is given back and the key is free to retry
+    assert service.remaining("flight", flight_id) == 8
+
+    with sqlite3.connect(ledger.path) as conn:
+        conn.execute("DROP TRIGGER reject")
+    retry = service.book(flight_id=flight_id, guests=2, idempotency_key="failed")
+    assert retry["status"] == "confirmed" and not retry.get("idempotent_replay")
+    assert service.remaining("flight", flight_id) == 6
+
+
+def test_unacknowledged_write_is_pending_not_confirmed(service, ledger, monkeypatch):
+    flight_id = _flight(seats=9)
+    monkeypatch.setattr(ledger, "write", lambda record, timeout=5.0: None)
+
+    booking = service.book(flight_id=flight_id, idempotency_key="slow")
+    assert booking["status"] == "pending"
+    replay = service.book(flight_id=flight_id, idempotency_key="slow")
+    assert replay["idempotent_replay"] and replay["status"] == "pending"
+    assert service.remaining("flight", flight_id) == 8
+
+
+def test_invalid_requests(service):
+    assert "error" in service.book()
+    assert "error" in service.book(flight_id=_flight(seats=9), guests=0)
+    assert "unknown or expired" in service.book(flight_id="missing")["error"]
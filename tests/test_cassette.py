@@ -0,0 +1,129 @@
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from multi_agent_agent.services.cassette import REPLAYED_TOKEN, Cassette, CassetteMiss
+
+
+class _Upstream(BaseHTTPRequestHandler):
+    """Counts calls per path; issues tokens and numbered responses."""
+
+    calls = {}
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        count = self.calls[path] = self.calls.get(path, 0) + 1
+        self._reply(200, {"path": path, "call": count})
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode()
+        form = parse_qs(body)
+        self._reply(200, {
+            "access_token": f"live-token-{form['client_secret'][0]}",
+            "client_id": form["client_id"][0],
+            "expires_in": 1799
+        })
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def upstream():
+    _Upstream.calls = {}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Upstream)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _get(cassette, base, endpoint, key="secret-key", **params):
+    return cassette.request("WeatherAPIClient", "GET", base + endpoint, endpoint, params={**params, "key": key})
+
+
+def _recorded_text(directory) -> str:
+    text = ""
+    for root, _, files in os.walk(directory):
+        for name in files:
+            with open(os.path.join(root, name), encoding="utf-8") as f:
+                text += f.read()
+    return text
+
+
+def test_replay_serves_recorded_responses_without_the_network(tmp_path, upstream):
+    recorder = Cassette(str(tmp_path), "record")
+    live = _get(recorder, upstream, "/forecast.json", q="Lisbon")
+
+    replay = Cassette(str(tmp_path), "replay")
+    # Unreachable: anything not served from disk would fail
+    replayed = _get(replay, "http://127.0.0.1:9", "/forecast.json", key="other-key", q="Lisbon")
+    assert replayed.status_code == 200
+    assert replayed.json() == live.json()
+    assert replayed.url.endswith("/forecast.json?q=Lisbon&key=other-key")
+    assert b"".join(replayed.iter_content(7)) == live.content
+    assert _Upstream.calls == {"/forecast.json": 1}
+
+
+def test_unrecorded_request_is_a_miss_in_replay_mode(tmp_path, upstream):
+    _get(Cassette(str(tmp_path), "record"), upstream, "/forecast.json", q="Lisbon")
+    with pytest.raises(CassetteMiss):
+        _get(Cassette(str(tmp_path), "replay"), upstream, "/forecast.json", q="Porto")
+    assert _Upstream.calls == {"/forecast.json": 1}
+
+
+def test_repeated_requests_replay_in_order(tmp_path, upstream):
+    recorder = Cassette(str(tmp_path), "record")
+    assert [_get(recorder, upstream, "/current.json").json()["call"] for _ in range(3)] == [1, 2, 3]
+
+    replay = Cassette(str(tmp_path), "replay")
+    # The last response keeps being served once the sequence is used up
+    assert [_get(replay, upstream, "/current.json").json()["call"] for _ in range(4)] == [1, 2, 3, 3]
+
+
+def test_auto_mode_records_only_what_is_missing(tmp_path, upstream):
+    cassette = Cassette(str(tmp_path), "auto")
+    first = _get(cassette, upstream, "/forecast.json", q="Lisbon").json()
+    again = _get(Cassette(str(tmp_path), "auto"), upstream, "/forecast.json", q="Lisbon").json()
+    assert first == again
+    assert _Upstream.calls == {"/forecast.json": 1}
+
+
+def test_credentials_and_tokens_are_never_written(tmp_path, upstream):
+    form = {"grant_type": "client_credentials", "client_id": "my-client-id", "client_secret": "my-secret"}
+    recorder = Cassette(str(tmp_path), "record")
+    live = recorder.request(
+        "AmadeusClient", "POST", upstream + "/v1/security/oauth2/token", "/v1/security/oauth2/token",
+        data=form, headers={"Authorization": "Bearer old-token"}
+    )
+    assert live.json()["access_token"] == "live-token-my-secret"
+    _get(recorder, upstream, "/forecast.json", key="my-weather-key")
+
+    text = _recorded_text(tmp_path)
+    for secret in ("my-client-id", "my-secret", "live-token", "my-weather-key", "old-token"):
+        assert secret not in text
+
+    replayed = Cassette(str(tmp_path), "replay").request(
+        "AmadeusClient", "POST", upstream + "/v1/security/oauth2/token", "/v1/security/oauth2/token",
+        data={**form, "client_id": "another-id", "client_secret": "another-secret"}
+    )
+    assert replayed.json()["access_token"] == REPLAYED_TOKEN
+    assert replayed.json()["expires_in"] == 1799
+
+
+def test_invalid_mode():
+    with pytest.raises(ValueError):
+        Cassette("unused", "rewind")
@@ -0,0 +1,120 @@
+import json
+from itertools import islice
+
+import pytest
+
+from multi_agent_agent.services.codec import CodecError
+from multi_agent_agent.services.flight_service import FlightService
+from multi_agent_agent.services.json_stream import iter_members
+
+DOCUMENT = {
+    "meta": {"count": 3, "links": {"self": "https://example.test/?a=1&b=\"2\""}},
+    "data": [
+        {"id": "1", "price": {"total": "123.45"}, "tags": ["a", "b"]},
+        {"id": "2", "price": {"total": "-0.5e3"}, "name": "Zürich → 東京"},
+        {"id": "3", "empty": {}, "none": None, "flag": True}
+    ],
+    "count": 1234567890,
+    "ratio": 0.125,
+    "empty": [],
+    "dictionaries": {"carriers": {"XX": "Example Air"}}
+}
+
+
+def _chunks(data: bytes, size: int):
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 1 << 20])
+def test_members_match_a_full_decode_for_any_chunk_size(size):
+    body = json.dumps(DOCUMENT, ensure_ascii=False, indent=1).encode()
+    assert dict(iter_members(_chunks(body, size))) == DOCUMENT
+
+
+@pytest.mark.parametrize("size", [1, 5, 1 << 20])
+def test_streamed_arrays_are_yielded_element_by_element(size):
+    body = json.dumps(DOCUMENT).encode()
+    members = list(iter_members(_chunks(body, size), stream=("data", "empty")))
+    assert [value for key, value in members if key == "data"] == DOCUMENT["data"]
+    assert [key for key, _ in members] == ["meta", "data", "data", "data", "count", "ratio", "dictionaries"]
+
+
+def test_numbers_split_across_chunks_are_not_cut_short():
+    assert list(iter_members([b'{"a": 12', b"34", b'5, "b": tr', b"ue}"])) == [("a", 12345), ("b", True)]
+
+
+def test_empty_object():
+    assert list(iter_members([b" { } "])) == []
+
+
+@pytest.mark.parametrize("body", [
+    b"[1, 2]",
+    b'{"a": 1',
+    b'{"a" 1}',
+    b'{"a": 1} extra',
+    b'{1: 2}',
+    b'{"a": [1, 2',
+    b"",
+    b'{"a": "\xff"}',
+])
+def test_invalid_bodies_raise_codec_error(body):
+    with pytest.raises(CodecError):
+        list(iter_members(_chunks(body, 3), stream=("a",)))
+
+
+def test_reading_is_incremental_and_closing_releases_the_body():
+    body = json.dumps({"data": [{"n": i} for i in range(1000)]}).encode()
+    read = []
+    closed = []
+
+    def chunks():
+        try:
+            for chunk in _chunks(body, 16):
+                read.append(chunk)
+                yield chunk
+        finally:
+            closed.append(True)
+
+    members = iter_members(chunks(), stream=("data",))
+    assert [value["n"] for _, value in islice(members, 3)] == [0, 1, 2]
+    assert sum(len(chunk) for chunk in read) < 100
+    members.close()
+    assert closed == [True]
+
+
+def _offers_response(count: int) -> dict:
+    return {
+        "meta": {"count": count},
+        "data": [
+            {
+                "id": str(i + 1),
+                "price": {"total": f"{100 + i}.00", "currency": "EUR"},
+                "numberOfBookableSeats": 4,
+                "itineraries": [{"segments": [{
+                    "carrierCode": "XX", "number": str(i), "aircraft": {"code": "320"},
+                    "departure": {"iataCode": "LIS", "at": "2030-01-01T08:00"},
+                    "arrival": {"iataCode": "MAD", "at": "2030-01-01T10:00"}
+                }]}],
+                "travelerPricings": [{"travelerType": "ADULT"}]
+            }
+            for i in range(count)
+        ],
+        # Amadeus sends the dictionaries after the offers
+        "dictionaries": {"carriers": {"XX": "Example Air"}, "aircraft": {"320": "AIRBUS A320"}}
+    }
+
+
+def test_streamed_offers_match_the_full_parse():
+    response = _offers_response(20)
+    service = FlightService()
+    streamed = list(service._iter_offers(_chunks(json.dumps(response).encode(), 50)))
+    assert streamed == service._parse_flight_offers(response)
+    assert streamed[0]["segments"][0]["carrier"]["name"] == "Example Air"
+
+
+def test_stopping_early_still_names_the_offers():
+    service = FlightService()
+    offers = service._iter_offers(_chunks(json.dumps(_offers_response(50)).encode(), 50))
+    first = list(islice(offers, 2))
+    offers.close()
+    assert [segment["aircraft"]["name"] for offer in first for segment in offer["segments"]] == ["AIRBUS A320"] * 2
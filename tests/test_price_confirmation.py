@@ -0,0 +1,132 @@
+import uuid
+
+import pytest
+
+from multi_agent_agent.services.booking_service import BookingLedger, BookingService
+from multi_agent_agent.services.flight_service import FlightService
+from multi_agent_agent.services.offer_registry import get_offer_registry
+
+
+def _raw_offer(total: str, travelers: int = 1):
+    return {
+        "id": "1",
+        "price": {"total": total, "currency": "EUR"},
+        "numberOfBookableSeats": 9,
+        "lastTicketingDate": None,
+        "itineraries": [{"segments": [{"carrierCode": "XX", "number": uuid.uuid4().hex[:6]}]}],
+        "travelerPricings": [{"travelerType": "ADULT"}] * travelers
+    }
+
+
+class FakePricing:
+    """Answers pricing requests: reprices offers, drops gone ones, rejects batches with a stale one."""
+
+    def __init__(self, new_totals=None, gone=(), stale=()):
+        self.new_totals = new_totals or {}
+        self.gone = set(gone)
+        self.stale = set(stale)
+        self.batches = []
+
+    def __call__(self, method, endpoint, params=None, data=None, headers=None, schema=None, cache=False):
+        assert (method, endpoint) == ("POST", "/v1/shopping/flight-offers/pricing")
+        offers = data["data"]["flightOffers"]
+        totals = [offer["price"]["total"] for offer in offers]
+        self.batches.append(totals)
+        if any(total in self.stale for total in totals):
+            raise Exception("400 Bad Request: offer is stale")
+        return {"data": {"flightOffers": [
+            {**offer, "price": {**offer["price"], "total": self.new_totals.get(offer["price"]["total"], offer["price"]["total"])}}
+            for offer in offers if offer["price"]["total"] not in self.gone
+        ]}}
+
+
+@pytest.fixture
+def flights(monkeypatch):
+    service = FlightService()
+    pricing = FakePricing()
+    monkeypatch.setattr(service, "_make_request", pricing)
+    return service, pricing
+
+
+def _register(service, *totals, travelers=1):
+    ids = []
+    for total in totals:
+        offer_id = f"F{uuid.uuid4().hex[:8]}"
+        service._register_offer(get_offer_registry(), offer_id, _raw_offer(total, travelers))
+        ids.append(offer_id)
+    return ids
+
+
+def test_offers_are_priced_in_batches(flights):
+    service, pricing = flights
+    ids = _register(service, *(f"{100 + i}.00" for i in range(14)))
+    results = service.confirm_prices(ids)
+
+    assert [len(batch) for batch in pricing.batches] == [6, 6, 2]
+    assert all(results[i]["confirmed"] and not results[i]["price_changed"] for i in ids)
+
+
+def test_batches_are_grouped_by_traveler_count(flights):
+    service, pricing = flights
+    ids = _register(service, "100.00", "101.00") + _register(service, "300.00", travelers=2)
+    results = service.confirm_prices(ids)
+
+    assert sorted(len(batch) for batch in pricing.batches) == [1, 2]
+    assert results[ids[2]]["price_per_traveler"] == 150.0
+
+
+def test_price_changes_update_the_registry(flights):
+    service, pricing = flights
+    pricing.new_totals = {"100.00": "120.00"}
+    offer_id, unchanged = _register(service, "100.00", "200.00")
+    results = service.confirm_prices([offer_id, unchanged])
+
+    assert results[offer_id]["price_changed"] and results[offer_id]["previous_price"] == 100.0
+    assert results[offer_id]["price"] == 120.0
+    assert get_offer_registry().get("flight", offer_id)["price"] == 120.0
+    assert not results[unchanged]["price_changed"]
+
+
+def test_a_stale_offer_does_not_fail_its_batch(flights):
+    service, pricing = flights
+    pricing.stale = {"102.00"}
+    ids = _register(service, "100.00", "101.00", "102.00", "103.00")
+    results = service.confirm_prices(ids)
+
+    # One rejected batch, then each offer on its own
+    assert [len(batch) for batch in pricing.batches] == [4, 1, 1, 1, 1]
+    assert [results[i]["confirmed"] for i in ids] == [True, True, False, True]
+    assert "stale" in results[ids[2]]["error"]
+
+
+def test_offers_missing_from_the_response_are_unavailable(flights):
+    service, pricing = flights
+    pricing.gone = {"101.00"}
+    kept, gone = _register(service, "100.00", "101.00")
+    results = service.confirm_prices([kept, gone])
+
+    assert results[kept]["confirmed"]
+    assert results[gone] == {"confirmed": False, "unavailable": True, "error": "Offer is no longer available"}
+
+
+def test_recent_confirmations_are_not_sent_again(flights):
+    service, pricing = flights
+    ids = _register(service, "100.00", "101.00")
+    service.confirm_prices(ids)
+    again = service.confirm_prices(ids + ["unknown"])
+
+    assert len(pricing.batches) == 1
+    assert all(again[i]["confirmed"] for i in ids)
+    assert again["unknown"]["confirmed"] is False
+
+
+def test_booking_uses_the_confirmed_price(tmp_path, monkeypatch):
+    pricing = FakePricing(new_totals={"100.00": "110.00"}, gone={"101.00"})
+    monkeypatch.setattr(FlightService, "_make_request", lambda self, *args, **kwargs: pricing(*args, **kwargs))
+    repriced, gone = _register(FlightService(), "100.00", "101.00")
+    service = BookingService(BookingLedger(str(tmp_path / "bookings.sqlite3")), confirm_prices=True)
+
+    booking = service.book(flight_id=repriced)
+    assert booking["total_price"] == 110.0
+    assert booking["items"][0]["price_confirmed"] and booking["items"][0]["price_changed"]
+    assert "no longer available" in service.book(flight_id=gone)["error"]
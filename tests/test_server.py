@@ -0,0 +1,159 @@
+import asyncio
+import json
+
+import pytest
+
+from multi_agent_agent.server import AgentServer, StubAgent, request_session_id
+
+
+def _run(server, coro_factory):
+    """Start `server` on a free port, run the client coroutine against it, then stop."""
+    async def main():
+        listener = await server.start("127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        try:
+            return await coro_factory(port)
+        finally:
+            listener.close()
+            await listener.wait_closed()
+    return asyncio.run(main())
+
+
+async def _send(port, raw: bytes):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(raw)
+    await writer.drain()
+    data = await reader.read()
+    writer.close()
+    head, _, body = data.partition(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split(" ", 2)[1])
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    if headers.get("transfer-encoding") == "chunked":
+        body = _dechunk(body)
+    return status, headers, body
+
+
+def _dechunk(body: bytes) -> bytes:
+    out = b""
+    while body:
+        size, _, rest = body.partition(b"\r\n")
+        size = int(size, 16)
+        if size == 0:
+            break
+        out += rest[:size]
+        body = rest[size + 2:]
+    return out
+
+
+def _post(body: bytes, extra_headers: str = "", length=None) -> bytes:
+    length = len(body) if length is None else length
+    return (
+        f"POST /chat HTTP/1.1\r\nHost: test\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {length}\r\n{extra_headers}\r\n"
+    ).encode() + body
+
+
+def _events(body: bytes):
+    return [json.loads(line) for line in body.splitlines() if line]
+
+
+def test_chat_streams_events_and_issues_a_session():
+    server = AgentServer(StubAgent(latency=0.01, tokens=3))
+    status, headers, body = _run(server, lambda port: _send(port, _post(b'{"message": "hi"}')))
+    assert status == 200
+    assert headers["content-type"] == "application/x-ndjson"
+    assert headers["x-session-id"]
+    events = _events(body)
+    assert [e["type"] for e in events][-1] == "final"
+    assert events[-1]["text"] == "token0 token1 token2 "
+
+
+def test_chat_continues_the_session_from_the_header():
+    server = AgentServer(StubAgent(latency=0.01, tokens=1))
+    raw = _post(b'{"message": "hi", "session_id": "from-body"}', "X-Session-ID: from-header\r\n")
+    status, headers, _ = _run(server, lambda port: _send(port, raw))
+    assert status == 200
+    assert headers["x-session-id"] == "from-header"
+
+
+@pytest.mark.parametrize("body", [b"[1, 2]", b'"hello"', b"42", b"null"])
+def test_chat_rejects_a_body_that_is_not_an_object(body):
+    server = AgentServer(StubAgent(latency=0.01))
+    status, _, response = _run(server, lambda port: _send(port, _post(body)))
+    assert status == 400
+    assert json.loads(response) == {"error": "Body must be a JSON object"}
+    assert server.stats()["accepted"] == 0
+
+
+@pytest.mark.parametrize("body, error", [
+    (b"{not json", "Body must be JSON"),
+    (b'{"message": "  "}', "Field 'message' is required"),
+    (b'{"message": 5}', "Field 'message' is required"),
+])
+def test_chat_rejects_invalid_requests(body, error):
+    server = AgentServer(StubAgent(latency=0.01))
+    status, _, response = _run(server, lambda port: _send(port, _post(body)))
+    assert status == 400
+    assert json.loads(response)["error"] == error
+
+
+@pytest.mark.parametrize("length", ["abc", "-5"])
+def test_malformed_content_length_is_a_bad_request(length):
+    server = AgentServer(StubAgent(latency=0.01))
+    status, _, response = _run(server, lambda port: _send(port, _post(b"{}", length=length)))
+    assert status == 400
+    assert json.loads(response) == {"error": "Malformed Content-Length"}
+
+
+def test_unknown_path_and_wrong_method():
+    server = AgentServer(StubAgent(latency=0.01))
+
+    async def client(port):
+        missing = await _send(port, b"GET /nope HTTP/1.1\r\nHost: test\r\n\r\n")
+        wrong = await _send(port, b"GET /chat HTTP/1.1\r\nHost: test\r\n\r\n")
+        health = await _send(port, b"GET /health HTTP/1.1\r\nHost: test\r\n\r\n")
+        return missing, wrong, health
+
+    missing, wrong, health = _run(server, client)
+    assert missing[0] == 404
+    assert wrong[0] == 405
+    assert health[0] == 200 and json.loads(health[2])["active"] == 0
+
+
+def test_concurrent_turns_all_complete():
+    server = AgentServer(StubAgent(latency=0.05, tokens=5), max_concurrency=4, max_queue=64)
+
+    async def client(port):
+        return await asyncio.gather(*(
+            _send(port, _post(json.dumps({"message": f"turn {i}"}).encode()))
+            for i in range(40)
+        ))
+
+    results = _run(server, client)
+    assert [status for status, _, _ in results] == [200] * 40
+    assert all(_events(body)[-1]["type"] == "final" for _, _, body in results)
+    assert len({headers["x-session-id"] for _, headers, _ in results}) == 40
+    stats = server.stats()
+    assert stats["completed"] == 40 and stats["active"] == 0 and stats["queued"] == 0
+
+
+def test_turns_beyond_the_queue_are_rejected_with_429():
+    server = AgentServer(StubAgent(latency=0.3, tokens=1), max_concurrency=1, max_queue=0)
+
+    async def client(port):
+        return await asyncio.gather(*(_send(port, _post(b'{"message": "hi"}')) for _ in range(3)))
+
+    statuses = sorted(status for status, _, _ in _run(server, client))
+    assert statuses == [200, 429, 429]
+    assert server.stats()["rejected"] == 2
+
+
+def test_request_session_id_prefers_the_header():
+    assert request_session_id({"x-session-id": "a"}, {"session_id": "b"}) == "a"
+    assert request_session_id({}, {"session_id": "b"}) == "b"
+    assert request_session_id({}, {"session_id": 7}) is None
+    assert request_session_id({}, ["not", "a", "dict"]) is None
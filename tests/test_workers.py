@@ -0,0 +1,149 @@
+import http.client
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from multi_agent_agent.workers import (
+    SharedLimiter, _request_complete, new_session_id, session_from_request, session_slot
+)
+from conftest import ROOT
+
+WORKERS = 3
+
+
+def test_session_from_request_matches_the_server_rule():
+    body = b'{"message": "hi", "session_id": "from-body"}'
+    head = b"POST /chat HTTP/1.1\r\nHost: test\r\nContent-Length: %d\r\n" % len(body)
+    assert session_from_request(head + b"\r\n" + body) == "from-body"
+    assert session_from_request(head + b"X-Session-ID: from-header\r\n\r\n" + body) == "from-header"
+    # Partial or non-object bodies carry no session
+    assert session_from_request(head + b"\r\n" + body[:10]) is None
+    assert session_from_request(head + b"\r\n[1]") is None
+
+
+def test_request_complete_waits_for_the_body():
+    assert not _request_complete(b"POST /chat HTTP/1.1\r\nContent-Length: 5")
+    assert not _request_complete(b"POST /chat HTTP/1.1\r\nContent-Length: 5\r\n\r\nab")
+    assert _request_complete(b"POST /chat HTTP/1.1\r\nContent-Length: 5\r\n\r\nabcde")
+    assert _request_complete(b"GET /health HTTP/1.1\r\n\r\n")
+
+
+def test_new_session_ids_route_back_to_their_worker():
+    for slot in range(WORKERS):
+        ids = {new_session_id(slot, WORKERS) for _ in range(20)}
+        assert len(ids) == 20
+        assert {session_slot(session_id, WORKERS) for session_id in ids} == {slot}
+
+
+def test_shared_limiter_rate_and_token_budget():
+    limiter = SharedLimiter(rate_limit=1.0, burst=2)
+    assert [limiter.try_acquire() for _ in range(3)] == [True, True, False]
+
+    budget = SharedLimiter(token_budget=100)
+    assert budget.try_acquire()
+    budget.record_tokens(100)
+    assert not budget.try_acquire()
+    assert budget.stats()["tokens_used_this_minute"] == 100
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _request(port, method, path, body=None, session_id=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    headers = {"Content-Type": "application/json"}
+    if session_id:
+        headers["X-Session-ID"] = session_id
+    try:
+        conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+        response = conn.getresponse()
+        return response.status, response.getheader("X-Session-ID"), response.read()
+    finally:
+        conn.close()
+
+
+def _health_pid(port, session_id):
+    status, _, body = _request(port, "GET", "/health", session_id=session_id)
+    assert status == 200
+    return json.loads(body)["pid"]
+
+
+@pytest.fixture
+def prefork_server():
+    port = _free_port()
+    env = {**os.environ, "PYTHONPATH": ROOT, "LOG_CONSOLE_LEVEL": "WARNING"}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "multi_agent_agent.server", "--stub", "--stub-latency", "0.05",
+         "--workers", str(WORKERS), "--port", str(port)],
+        env=env, cwd=ROOT
+    )
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            _request(port, "GET", "/health")
+            break
+        except OSError:
+            if process.poll() is not None or time.monotonic() > deadline:
+                process.kill()
+                pytest.fail("Pre-fork server did not start")
+            time.sleep(0.1)
+    yield port
+    process.send_signal(signal.SIGTERM)
+    process.wait(timeout=10)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="pre-fork workers need os.fork")
+def test_prefork_serves_concurrent_turns(prefork_server):
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        results = list(pool.map(
+            lambda i: _request(prefork_server, "POST", "/chat", {"message": f"turn {i}"}),
+            range(150)
+        ))
+    assert [status for status, _, _ in results] == [200] * 150
+    for _, session_id, body in results:
+        assert session_id
+        assert json.loads(body.splitlines()[-1])["type"] == "final"
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="pre-fork workers need os.fork")
+def test_prefork_sessions_stick_to_one_worker(prefork_server):
+    sessions = [new_session_id(slot, WORKERS) for slot in range(WORKERS)]
+    pids = [_health_pid(prefork_server, session_id) for session_id in sessions]
+    assert len(set(pids)) == WORKERS
+    for _ in range(3):
+        assert [_health_pid(prefork_server, session_id) for session_id in sessions] == pids
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="pre-fork workers need os.fork")
+def test_prefork_replaces_a_dead_worker(prefork_server):
+    session_id = new_session_id(0, WORKERS)
+    pid = _health_pid(prefork_server, session_id)
+    os.kill(pid, signal.SIGKILL)
+
+    deadline = time.monotonic() + 10
+    while True:
+        try:
+            replacement = _health_pid(prefork_server, session_id)
+            if replacement != pid:
+                break
+        except (OSError, http.client.HTTPException):
+            pass
+        assert time.monotonic() < deadline, "dead worker was not re-forked"
+        time.sleep(0.2)
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        statuses = list(pool.map(
+            lambda i: _request(prefork_server, "POST", "/chat", {"message": "hi"}, session_id=f"s{i}")[0],
+            range(60)
+        ))
+    assert statuses == [200] * 60